@@ -0,0 +1,200 @@
+import random
+import hashlib
+from array import array
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Dict, Any, List, Optional, Tuple
+
+from entry_record import entry_record
+
+# --- Defaults (overridable from config.yaml duplicate_detection) ---
+DEFAULT_MIN_SIMILARITY = 0.6  # Estimated Jaccard similarity of word pairs from which articles are near-duplicates
+DEFAULT_MIN_TOKENS = 12       # Shorter title + summary texts are only matched by URL (too little text to compare)
+MAX_HASHED_TOKENS = 200       # Only the start of long (full-text) summaries is hashed
+
+# MinHash signatures are LSH_BANDS bands of LSH_ROWS values; articles sharing a band are compared in full.
+# 20 x 3 makes a pair at similarity 0.6 a candidate 99% of the time, and one at 0.3 less than half the time.
+LSH_BANDS = 20
+LSH_ROWS = 3
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed: signatures are stored in the cache and compared across runs
+_random = random.Random(1)
+_PERMUTATIONS = [
+    (_random.randrange(1, _MERSENNE_PRIME), _random.randrange(0, _MERSENNE_PRIME)) for _ in range(LSH_BANDS * LSH_ROWS)
+]
+
+# Query parameters that only track where a click came from; anything else may identify the page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref", "ref_src", "ref_url",
+    "source", "cmpid", "ito", "ncid", "sr_share", "smid"
+}
+TRACKING_PREFIXES = ("utm_", "at_", "__")
+
+
+def normalise_url(url) -> str:
+    """A URL with the parts that don't change which page it is removed.
+
+    The scheme is dropped, host lowercased without "www.", tracking parameters and the
+    fragment removed, the remaining query parameters sorted and trailing slashes stripped.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("", host, path, urlencode(query), ""))
+
+
+def canonical_link(entry) -> str:
+    """The link that best identifies an entry: the publisher's original or canonical link, its link, or a URL guid"""
+    candidates = [entry.get("feedburner_origlink")]
+    candidates += [link.get("href") for link in entry.get("links", []) or [] if link.get("rel") == "canonical"]
+    candidates += [entry.get("link"), entry.get("id")]
+    for candidate in candidates:
+        if isinstance(candidate, str) and candidate.startswith(("http://", "https://")):
+            return candidate
+    return ""
+
+
+def text_tokens(entry) -> List[str]:
+    """Lowercased word tokens of an entry's title and summary, with the HTML removed"""
+    return entry_record(entry)["tokens"]
+
+
+def minhash(tokens: List[str]) -> Tuple[int, ...]:
+    """MinHash signature of the set of word pairs in a text"""
+    tokens = tokens[:MAX_HASHED_TOKENS]
+    shingles = {f"{first} {second}" for first, second in zip(tokens, tokens[1:])} or set(tokens)
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+              for shingle in shingles]
+    return tuple(
+        min((a * value + b) % _MERSENNE_PRIME for value in hashes) & 0xFFFFFFFF for a, b in _PERMUTATIONS
+    )
+
+
+def similarity(signature, other) -> float:
+    """Estimated Jaccard similarity of the texts behind two MinHash signatures"""
+    return sum(1 for value, other_value in zip(signature, other) if value == other_value) / len(signature)
+
+
+def signature_to_blob(signature) -> bytes:
+    """A MinHash signature as stored in the cache"""
+    return array("I", signature).tobytes()
+
+
+def blob_to_signature(blob) -> Tuple[int, ...]:
+    """Inverse of signature_to_blob"""
+    signature = array("I")
+    signature.frombytes(blob)
+    return tuple(signature)
+
+
+class ArticleIdentity:
+    """Maps syndicated copies of an article onto the key of the first copy seen.
+
+    An entry whose normalised canonical link was seen before (tracking parameters, www. and
+    http/https variants included) gets that article's key. Otherwise, an entry from another
+    feed whose title and summary share at least min_similarity of their word pairs (estimated
+    by MinHash) counts as a near-duplicate. Every entry is stored with the key it resolved to
+    in the cache's article_identity table, so duplicates reuse the first copy's cached LLM results.
+
+    Near-duplicate candidates are found by locality-sensitive hashing: signatures are indexed by
+    band, and only articles sharing a band with the entry are compared.
+    """
+
+    def __init__(self, cache, near_duplicates=True, min_similarity=DEFAULT_MIN_SIMILARITY, min_tokens=DEFAULT_MIN_TOKENS):
+        self.cache = cache
+        self.near_duplicates = near_duplicates
+        self.min_similarity = min_similarity
+        self.min_tokens = min_tokens
+        self.keys: Dict[str, str] = {}         # article key -> key of the first copy
+        self.urls: Dict[str, str] = {}         # normalised link -> key of the first copy
+        self.bands: Dict[Tuple[int, Tuple[int, ...]], List[Tuple[Tuple[int, ...], str, str]]] = {}
+        self.loaded = False
+
+    @classmethod
+    def from_config(cls, cache, settings: Dict[str, Any]) -> "ArticleIdentity":
+        """Build the identity layer from the duplicate_detection section of config.yaml"""
+        return cls(
+            cache,
+            near_duplicates=settings.get("near_duplicates", True),
+            min_similarity=settings.get("min_similarity", DEFAULT_MIN_SIMILARITY),
+            min_tokens=settings.get("min_tokens", DEFAULT_MIN_TOKENS),
+        )
+
+    @staticmethod
+    def _band_keys(signature):
+        """The (band, values) pairs a signature is indexed under"""
+        return [(band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]) for band in range(LSH_BANDS)]
+
+    def _remember(self, article_key, canonical_key, url_key, signature, feed_url):
+        self.keys[article_key] = canonical_key
+        if url_key:
+            self.urls.setdefault(url_key, canonical_key)
+        if signature is not None:
+            for band_key in self._band_keys(signature):
+                self.bands.setdefault(band_key, []).append((signature, canonical_key, feed_url))
+
+    def _load(self):
+        """Read the identities stored by earlier runs (oldest first, so the first copy wins)"""
+        for article_key, canonical_key, url_key, blob, feed_url in self.cache.get_article_identities():
+            signature = blob_to_signature(blob) if blob else None
+            if signature is not None and len(signature) != LSH_BANDS * LSH_ROWS:
+                signature = None
+            self._remember(article_key, canonical_key, url_key, signature, feed_url)
+        self.loaded = True
+
+    def _find_near(self, signature, feed_url) -> Optional[str]:
+        """Key of the most similar stored article from another feed, if it is similar enough"""
+        best_key, best_similarity = None, self.min_similarity
+        for band_key in self._band_keys(signature):
+            for other_signature, canonical_key, other_feed in self.bands.get(band_key, []):
+                if other_feed == feed_url:
+                    continue
+                score = similarity(signature, other_signature)
+                if score >= best_similarity:
+                    best_key, best_similarity = canonical_key, score
+        return best_key
+
+    def resolve(self, entry, feed_url) -> str:
+        """Set entry["article_key"] to the key of the article it is a copy of (or its own).
+
+        Returns how it was resolved: "known", "url_duplicate", "near_duplicate" or "new".
+        """
+        if not self.loaded:
+            self._load()
+        article_key = self.cache._get_article_key(entry)
+        if article_key in self.keys:
+            entry["article_key"] = self.keys[article_key]
+            return "known"
+
+        url_key = normalise_url(canonical_link(entry))
+        signature = None
+        canonical_key = self.urls.get(url_key) if url_key else None
+        resolution = "url_duplicate"
+        if self.near_duplicates:
+            tokens = text_tokens(entry)
+            if len(tokens) >= self.min_tokens:
+                signature = minhash(tokens)
+                if canonical_key is None:
+                    canonical_key = self._find_near(signature, feed_url)
+                    resolution = "near_duplicate"
+        if canonical_key is None:
+            canonical_key = article_key
+            resolution = "new"
+
+        self._remember(article_key, canonical_key, url_key, signature, feed_url)
+        self.cache.store_article_identity(
+            article_key, canonical_key, url_key, None if signature is None else signature_to_blob(signature), feed_url
+        )
+        entry["article_key"] = canonical_key
+        return resolution
@@ -0,0 +1,54 @@
+import re
+import html
+import hashlib
+from typing import Dict, Any
+
+from topic_writer import published_epoch
+
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+
+def article_key(title, link) -> str:
+    """An article's own cache key (before ArticleIdentity maps copies onto the first one)"""
+    return hashlib.md5(f"{title}|{link}".encode()).hexdigest()
+
+
+def build_record(entry) -> Dict[str, Any]:
+    """Everything later stages derive from an entry's title and summary, worked out in one pass.
+
+    - article_key: md5 of title and link
+    - published_ts: publish (or update) time as an integer UTC epoch
+    - summary_text: the summary with HTML tags removed, entities decoded and whitespace collapsed
+    - summary_html: the original summary if it was HTML, else None
+    - title_lower, summary_lower: lowercased title and original summary, as keywords are matched
+    - tokens: lowercased word tokens of the title and summary text, in order
+    """
+    title = entry.get("title", "") or ""
+    link = entry.get("link", "") or ""
+    summary = entry.get("summary", "") or ""
+    summary_html = None
+    summary_text = summary
+    if _HTML_TAG.search(summary):
+        summary_html = summary
+        summary_text = re.sub(r'\s+', ' ', html.unescape(_HTML_TAG.sub(' ', summary))).strip()
+    return {
+        "article_key": article_key(title, link),
+        "published_ts": published_epoch(entry.get("published_parsed") or entry.get("updated_parsed")),
+        "summary_text": summary_text,
+        "summary_html": summary_html,
+        "title_lower": title.lower(),
+        "summary_lower": summary.lower(),
+        "tokens": re.findall(r"\w+", f"{title} {summary_text}".lower()),
+    }
+
+
+def entry_record(entry) -> Dict[str, Any]:
+    """An entry's normalised record, built the first time it is asked for and kept on the entry.
+
+    The feed fetcher builds it for every entry as the feed is parsed, and make_job_entry copies
+    it into LLM jobs, so each article is normalised once however many topics and stages read it.
+    """
+    record = entry.get("record")
+    if record is None:
+        record = entry["record"] = build_record(entry)
+    return record
@@ -1,84 +1,113 @@
-import sqlite3
 import json
 from pathlib import Path
-import sys
-import time
 import yaml
 
+from sqlite_cache import SQLiteProcessingCache
+from llm_tasks import MODEL_REVISION
+from generate_news_digest import get_topic_hash
+from topic_writer import TopicWriter, DEFAULT_SHARD_SIZE
+
+def _export_state_key(topic):
+    """cache_metadata key holding a topic's export high-water mark"""
+    return f"export_hwm:{topic}"
+
+def _load_export_state(cache, topic):
+    """The high-water mark stored by the last export of a topic, or None"""
+    value = cache.get_metadata(_export_state_key(topic))
+    try:
+        return json.loads(value) if value else None
+    except ValueError:
+        return None
+
+def _needs_rebuild(cache, topic, topic_hash, state, output_dir):
+    """Whether a topic's existing output can't simply be extended with its new rows"""
+    # Marks from before change numbers followed rowids, which miss rows updated in place
+    if not state or "seq" not in state:
+        return True
+    if (state.get("output_dir"), state.get("pipeline_version"), state.get("topic_hash")) != \
+            (output_dir, cache.pipeline_version, topic_hash):
+        return True
+    # Rows the last export saw were aged out of the cache since
+    return cache.get_topic_deleted_seq(topic) > state["seq"]
+
 def export_json_from_cache(
     db_path="backend/processing_cache.db",
     config_path="backend/config.yaml",
-    output_dir="backend/topics"
+    output_dir="backend/topics",
+    incremental=False
 ):
+    """Write the topic shards from the cached results of the current pipeline version.
+
+    Each topic's high-water mark (the cache's change number when it was exported) is kept in
+    cache_metadata. With incremental=True only rows inserted or updated since are decoded and
+    merged into the existing output, replacing the earlier version of the same article, and
+    topics without changed rows are left as they are. A topic whose config or pipeline version
+    changed, or which lost cached rows since, is rebuilt from its cached rows instead.
+    """
     # Load config for topic names and descriptions
     with open(config_path, "r") as f:
         config = yaml.safe_load(f)
     topics = config["topics"]
+    topic_hashes = {topic: get_topic_hash(topic_config) for topic, topic_config in topics.items()}
+    resolved_output_dir = str(Path(output_dir).resolve())
+
+    cache = SQLiteProcessingCache(Path(db_path).resolve(), model_revision=config.get("model_revision", MODEL_REVISION))
+    # Rows changed while the export runs are past this mark, so the next export picks them up again
+    change_seq = cache.get_change_seq()
+    states = {topic: _load_export_state(cache, topic) for topic in topics} if incremental else {}
+    rebuild_topics = {
+        topic for topic, topic_hash in topic_hashes.items()
+        if not incremental or _needs_rebuild(cache, topic, topic_hash, states[topic], resolved_output_dir)
+    }
 
-    # Connect to SQLite cache
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    # Only topics that get new rows merged into them have their existing articles read back
+    writer = TopicWriter(output_dir, topics.keys(), keep_previous=incremental,
+                         shard_size=config.get("topic_shard_size", DEFAULT_SHARD_SIZE),
+                         previous_topics=[topic for topic in topics if topic not in rebuild_topics])
 
-    # Fetch all articles with topic assignments
-    cursor.execute("SELECT result_json FROM article_cache WHERE topic IS NOT NULL AND topic != ''")
-    rows = cursor.fetchall()
+    exported = {}
+    new_states = {}
+    for topic, topic_hash in topic_hashes.items():
+        state = states.get(topic)
+        # Output written by something else since (or deleted) can't be merged into either
+        rebuild = topic in rebuild_topics or topic not in writer.shards
+        after_seq = 0 if rebuild else state["seq"]
 
-    # Organize articles by topic
-    matched = {topic: [] for topic in topics}
-    for (result_json,) in rows:
-        try:
-            cache_data = json.loads(result_json)
-            topic = cache_data.get("topic")
-            article_data = cache_data.get("article_data")
-            if topic and article_data and topic in matched:
-                matched[topic].append(article_data)
-        except Exception as e:
-            print(f"Error parsing cache row: {e}")
+        rows = cache.get_topic_results_since(topic, topic_hash, after_seq)
+        if not rows and not rebuild:
             continue
 
-    # Sort articles by date (newest first)
-    def get_sort_key(article):
-        published = article.get('published_parsed')
-        if not published:
-            return time.struct_time((1970, 1, 1, 0, 0, 0, 0, 0, 0))
-        if isinstance(published, (list, tuple)) and len(published) >= 6:
-            try:
-                return time.struct_time(tuple(published[:9]) + (0,) * (9 - len(published)))
-            except Exception:
-                return time.struct_time((1970, 1, 1, 0, 0, 0, 0, 0, 0))
-        return published
-    for topic in matched:
-        matched[topic].sort(key=get_sort_key, reverse=True)
+        for seq, article_key, result in rows:
+            if result is None:
+                print(f"Error parsing cache row {article_key}")
+                continue
+            # The key lets a later merge replace this article when its row is updated
+            writer.add(topic, {**result["article_data"], "article_key": article_key})
+        # Topics left without articles are still (re)written as empty files
+        writer.rewrite(topic, keep_previous=not rebuild)
 
-    # Prepare output directory
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
+        exported[topic] = (len(rows), "rebuilt" if rebuild else "merged")
+        new_states[topic] = json.dumps({
+            "seq": change_seq,
+            "pipeline_version": cache.pipeline_version,
+            "topic_hash": topic_hash,
+            "output_dir": resolved_output_dir
+        })
 
-    # Create topics index
-    topics_index = {
-        "topics": list(topics.keys()),
-        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-        "summary": {
-            "total_topics": len(matched),
-            "total_articles": sum(len(articles) for articles in matched.values()),
-            "articles_by_topic": {topic: len(articles) for topic, articles in matched.items()}
-        }
-    }
-    with open(Path(output_dir) / "index.json", "w") as f:
-        json.dump(topics_index, f, indent=2, default=str)
+    if exported:
+        writer.flush()
+    # Only record the high-water marks once the files they describe are on disk
+    for topic, state in new_states.items():
+        cache.set_metadata(_export_state_key(topic), state)
+    cache.close()
 
-    # Write per-topic files
-    for topic, articles in matched.items():
-        topic_filename = f"{topic.lower().replace(' ', '_')}.json"
-        topic_path = Path(output_dir) / topic_filename
-        topic_data = {
-            "topic": topic,
-            "articles": articles,
-            "total_articles": len(articles),
-            "generated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-        }
-        with open(topic_path, "w") as f:
-            json.dump(topic_data, f, indent=2, default=str)
-        print(f"  {topic}: exported {len(articles)} articles to {topic_path}")
+    for topic in topics:
+        if topic in exported:
+            rows, mode = exported[topic]
+            print(f"  {topic}: {mode} {rows} cached results, {writer.count(topic, include_previous=True)} articles "
+                  f"in {len(writer.shards[topic])} shard(s)")
+        else:
+            print(f"  {topic}: unchanged")
     print(f"\nTopic files exported to: {output_dir}")
     print(f"Topics index exported to: {Path(output_dir) / 'index.json'}")
 
@@ -88,5 +117,7 @@ if __name__ == "__main__":
     parser.add_argument("--db", default="backend/processing_cache.db", help="Path to SQLite cache DB")
     parser.add_argument("--config", default="backend/config.yaml", help="Path to config.yaml")
     parser.add_argument("--output", default="backend/topics", help="Output directory for JSON files")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only decode rows changed since the last export and leave unchanged topics alone")
     args = parser.parse_args()
-    export_json_from_cache(args.db, args.config, args.output)
+    export_json_from_cache(args.db, args.config, args.output, incremental=args.incremental)
@@ -0,0 +1,89 @@
+import re
+import math
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, List
+
+from keyword_index import KeywordIndex
+
+# Words too common to say anything about what a sentence is about
+STOPWORDS = {
+    "a", "about", "after", "all", "also", "an", "and", "any", "are", "as", "at", "be", "been", "before",
+    "being", "but", "by", "can", "could", "did", "do", "does", "for", "from", "had", "has", "have", "he",
+    "her", "his", "how", "i", "if", "in", "into", "is", "it", "its", "just", "more", "most", "new", "no",
+    "not", "of", "on", "one", "or", "our", "out", "over", "said", "says", "she", "so", "some", "than",
+    "that", "the", "their", "them", "then", "there", "these", "they", "this", "to", "up", "was", "we",
+    "were", "what", "when", "which", "who", "will", "with", "would", "you", "your"
+}
+KEYWORD_WEIGHT = 2.0    # How much a topic keyword in a sentence counts, relative to its term frequency score
+LEAD_BONUS = 0.25       # News summaries tend to lead with the main point, so the first sentence gets a head start
+MIN_SENTENCE_WORDS = 4  # Shorter fragments ("Read more.", bylines) are never picked
+
+# A sentence ends at . ! or ? (optionally followed by a closing quote or bracket) before whitespace
+_SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]?\s+')
+
+
+def split_sentences(text) -> List[str]:
+    """A plain-text summary split into sentences"""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text or "") if sentence.strip()]
+
+
+def _terms(text) -> List[str]:
+    return [word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS and len(word) > 1]
+
+
+@lru_cache(maxsize=128)
+def _keyword_index(keywords) -> KeywordIndex:
+    """A KeywordIndex over one topic's keywords (a tuple), shared by every summary written for that topic"""
+    return KeywordIndex({"topic": {"keywords": list(keywords)}})
+
+
+def _fit(text, max_chars) -> str:
+    """Cut text at a word boundary so that it, with a closing ellipsis, fits in max_chars"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars - 1]
+    if " " in cut:
+        cut = cut[:cut.rfind(" ")]
+    return cut.rstrip(" ,;:-") + "…"
+
+
+def extractive_summary(text, max_chars, keywords: Iterable[str] = ()) -> str:
+    """The sentences of a summary that best cover what it is about, in their original order.
+
+    Each sentence is scored by how often its terms occur across the whole text (words that recur
+    are what it is about), normalised by sentence length, plus KEYWORD_WEIGHT for every topic
+    keyword it contains as a whole word (matched as KeywordIndex does, so "ai" doesn't count in
+    "said"). The best sentences are taken while they fit in max_chars; if not even the best one
+    fits, it is cut at a word boundary. The result is never longer than max_chars.
+    """
+    text = re.sub(r"\s+", " ", text or "").strip()
+    if len(text) <= max_chars:
+        return text
+    sentences = split_sentences(text)
+    term_counts = Counter(_terms(text))
+    keyword_index = _keyword_index(tuple(keyword for keyword in keywords if keyword))
+
+    scored = []
+    for position, sentence in enumerate(sentences):
+        terms = _terms(sentence)
+        if len(sentence.split()) < MIN_SENTENCE_WORDS or not terms:
+            continue
+        score = sum(term_counts[term] for term in set(terms)) / math.sqrt(len(terms))
+        score += KEYWORD_WEIGHT * len(keyword_index.find(sentence))
+        if position == 0:
+            score *= 1 + LEAD_BONUS
+        scored.append((score, position, sentence))
+    if not scored:
+        return _fit(text, max_chars)
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    chosen, length = [], 0
+    for _, position, sentence in scored:
+        added = len(sentence) + (1 if chosen else 0)
+        if length + added <= max_chars:
+            chosen.append((position, sentence))
+            length += added
+    if not chosen:
+        return _fit(scored[0][2], max_chars)
+    return " ".join(sentence for _, sentence in sorted(chosen))
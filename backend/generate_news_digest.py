@@ -1,289 +1,36 @@
-import feedparser
 import yaml
 from pathlib import Path
-import requests
-from gpt4all import GPT4All
-import re
 import time
 import json
-import html
-from html.parser import HTMLParser
-import os
 import hashlib
 
-# --- Load config ---
-config_dir = Path(__file__).parent
-custom_config_path = config_dir / "custom_config.yaml"
-default_config_path = config_dir / "config.yaml"
-config_path = custom_config_path if custom_config_path.exists() else default_config_path
-with open(config_path, "r") as f:
-    config = yaml.safe_load(f)
-
-feeds = config["feeds"]
-topics = config["topics"]
-max_processing_time = config.get("max_processing_time", 0)  # In seconds, 0 means unlimited
-
-# --- Initialize processing cache ---
-cache_db_path = config_dir / ("custom_processing_cache.db" if (config_dir / "custom_processing_cache.db").exists() else "processing_cache.db")
-from sqlite_cache import SQLiteProcessingCache
-cache = SQLiteProcessingCache(str(cache_db_path))
-print(f"Cache stats: {cache.get_cache_stats()} (using {cache_db_path.name})")
-
-model_path = Path(Path(__file__).parent.parent / "models")
-
-# --- Setup LLM for topic classification ---
-print("Loading GPT4All model...")
-llm = GPT4All(
-    model_name="phi-2.Q4_0.gguf",
-    model_path=model_path,
-    device='cpu',
-    verbose=False
-)
-print("Model loaded successfully!")
-
-# --- Configuration ---
-SUMMARY_LENGTH_THRESHOLD = 200  # Characters above which to generate LLM summary
-LLM_SUMMARY_TARGET_LENGTH = 150  # Target length for LLM-generated summaries in words (more aggressive)
-LLM_SUMMARY_MAX_CHARS = 200     # Maximum character limit for LLM summaries (more restrictive)
+from sqlite_cache import SQLiteProcessingCache, LLM_RESPONSE_CACHE_ENTRIES
+from keyword_index import KeywordIndex
+from article_identity import ArticleIdentity
+from feed_fetcher import FeedFetcher
+import llm_tasks
+from llm_tasks import make_job_entry, run_assessment_job, run_summary_job
+from llm_workers import LLMWorkerPool
+from scheduler import AssessmentScheduler
+from run_metrics import RunMetrics, PREVIOUS_REPORT_KEY
+from topic_writer import TopicWriter, DEFAULT_SHARD_SIZE, article_timestamp
+
+CONFIG_DIR = Path(__file__).parent
+DEFAULT_LLM_SUMMARY_TOP_N = 5  # Articles per topic and run whose extractive summary the LLM rewrites
 
 # --- Helper functions ---
 
-def match_topic(entry, keywords):
-    """Check if article matches topic keywords with word boundaries"""
-    title = entry.title or ""
-    summary = entry.get('summary', '')
-    
-    keyword_matches = {}
-    matched_keywords = []
-    
-    for keyword in keywords:
-        # Create regex pattern with word boundaries
-        # \b ensures the keyword is matched as a complete word
-        pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-        
-        # Check title and summary separately
-        title_match = re.search(pattern, title.lower())
-        summary_match = re.search(pattern, summary.lower())
-        
-        if title_match or summary_match:
-            matched_keywords.append(keyword)
-            
-            # Track where the keyword was found
-            found_in = []
-            if title_match:
-                found_in.append("title")
-            if summary_match:
-                found_in.append("summary")
-                
-            keyword_matches[keyword] = {
-                "found_in": found_in,
-                "title_text": title if title_match else None,
-                "summary_text": summary if summary_match else None
-            }
-    
-    return matched_keywords, keyword_matches
-
-def llm_classify_article(entry, topic, topic_description):
-    """Use LLM to determine if an article truly belongs to a topic"""
-    # Truncate summary to avoid context window issues
-    summary = entry.get('summary', 'No summary available')
-    if len(summary) > 500:  # Limit summary length
-        summary = summary[:500] + "..."
-    
-    prompt = f"""
-Task: Determine if this news article belongs to the topic "{topic}".
-
-Topic Description: {topic_description}
-
-Article Title: {entry.title}
-Article Summary: {summary}
-
-Question: Does this article belong to the "{topic}" topic based on the description above?
-
-Answer with only "YES" or "NO" followed by a brief reason.
-"""
-    
-    try:
-        response = llm.generate(prompt, max_tokens=50)
-        original_response = response.strip()
-        response = response.strip().upper()
-        
-        # Check if response starts with YES or NO
-        if response.startswith("YES"):
-            return True, original_response.lower()
-        elif response.startswith("NO"):
-            return False, original_response.lower()
-        else:
-            # Fallback - if unclear response, be conservative and include it
-            print(f"Unclear LLM response for '{entry.title}': {response}")
-            return True, f"unclear response: {original_response.lower()}"
-    except Exception as e:
-        print(f"Error classifying article '{entry.title}': {e}")
-        return True, f"llm error: {str(e).lower()}"  # Fallback to include article if LLM fails
-
-def get_entry_summary(entry):
-    """Extract and process article summary, handling both HTML and plain text"""
-    summary = entry.get("summary", "No summary available")
-    
-    # Check if the summary contains HTML tags
-    html_pattern = r'<[^>]+>'
-    if re.search(html_pattern, summary):
-        # It's HTML - clean it up
-        # Remove HTML tags but preserve the text content
-        clean_summary = re.sub(r'<[^>]+>', '', summary)
-        # Decode HTML entities like &amp; &lt; etc.
-        clean_summary = html.unescape(clean_summary)
-        # Clean up extra whitespace and newlines
-        clean_summary = re.sub(r'\s+', ' ', clean_summary).strip()
-        
-        # Store both versions
-        return {
-            "text": clean_summary,
-            "html": summary,
-            "is_html": True
-        }
-    else:
-        # Plain text summary
-        return {
-            "text": summary,
-            "html": None,
-            "is_html": False
-        }
+def load_config(config_dir=CONFIG_DIR):
+    """Load custom_config.yaml if present, otherwise config.yaml"""
+    custom_config_path = config_dir / "custom_config.yaml"
+    default_config_path = config_dir / "config.yaml"
+    config_path = custom_config_path if custom_config_path.exists() else default_config_path
+    with open(config_path, "r") as f:
+        return yaml.safe_load(f)
 
-def llm_generate_summary(title, original_summary, target_length_words=50):
-    """Use LLM to generate a concise summary when the original is too long"""
-    # Truncate the original summary to avoid context window issues
-    if len(original_summary) > 800:
-        original_summary = original_summary[:800] + "..."
-    
-    prompt = f"""
-Task: Create an extremely short, one-sentence summary for a news digest.
-
-Article Title: {title}
-
-Original Summary: {original_summary}
-
-Instructions:
-- Write ONLY one short sentence
-- Maximum {target_length_words} words total
-- Focus on the main point only
-- No details, examples, or background
-- Simple, clear language
-- No HTML, markdown, quotes, or formatting
-- End with a period
-
-Summary:
-"""
-    
-    try:
-        response = llm.generate(prompt, max_tokens=100)  # Reduced token limit
-        
-        # Clean up the response aggressively
-        summary = response.strip()
-        
-        # Remove model artifacts and tokens
-        summary = re.sub(r'<\|.*?\|>', '', summary)
-        summary = re.sub(r'<\|.*?>', '', summary)   
-        summary = re.sub(r'\|.*?>', '', summary)    
-        summary = re.sub(r'<.*?>', '', summary)     
-        
-        # Remove common stopping patterns more aggressively
-        stop_patterns = [
-            'about me:', 'tech stack:', 'conclusion:', 'in conclusion:',
-            'hope you found', 'happy coding', 'github:', 'source:',
-            'the article', 'this article', 'the author', 'in summary:',
-            'to summarize:', 'overall:', 'finally:', 'additionally:'
-        ]
-        
-        summary_lower = summary.lower()
-        for pattern in stop_patterns:
-            if pattern in summary_lower:
-                idx = summary_lower.find(pattern)
-                summary = summary[:idx].strip()
-                break
-        
-        # Clean up formatting
-        summary = re.sub(r'\n+', ' ', summary)
-        summary = re.sub(r'\s+', ' ', summary)
-        summary = summary.strip()
-        
-        # Take only the first sentence or two if it's still too long
-        if len(summary) > LLM_SUMMARY_MAX_CHARS:
-            # Split into sentences
-            sentences = re.split(r'[.!?]+', summary)
-            if len(sentences) > 1:
-                # Take first sentence and add period if missing
-                summary = sentences[0].strip()
-                if summary and not summary[-1] in '.!?':
-                    summary += '.'
-            else:
-                # Truncate to character limit
-                summary = summary[:LLM_SUMMARY_MAX_CHARS].strip()
-                if not summary[-1] in '.!?':
-                    summary = summary[:summary.rfind(' ')] + '.'
-        
-        # Ensure proper sentence ending
-        if summary and not summary[-1] in '.!?':
-            summary += '.'
-        
-        # Final aggressive truncation if still too long
-        if len(summary) > LLM_SUMMARY_MAX_CHARS:
-            # Force truncate at word boundary
-            words = summary.split()
-            truncated = []
-            current_length = 0
-            for word in words:
-                if current_length + len(word) + 1 > LLM_SUMMARY_MAX_CHARS - 1:  # Leave room for period
-                    break
-                truncated.append(word)
-                current_length += len(word) + 1
-            summary = ' '.join(truncated)
-            if not summary.endswith('.'):
-                summary += '.'
-        
-        # Final validation
-        if len(summary) < 10:  # Too short
-            return None
-            
-        return summary
-        
-    except Exception as e:
-        print(f"Error generating LLM summary: {e}")
-        return None
-
-def llm_relevance_percent(entry, topic, topic_description, user_interest):
-    """Use LLM to rate article relevance to user interest as a percentage (0-100) and provide a reason"""
-    summary = entry.get('summary', 'No summary available')
-    if len(summary) > 500:
-        summary = summary[:500] + "..."
-    prompt = f'''
-Task: Rate how relevant this article is to the user's interest in the topic "{topic}".
-
-Topic Description: {topic_description}
-User Interest: {user_interest}
-Article Title: {entry.title}
-Article Summary: {summary}
-
-Question: On a scale from 0% (not relevant) to 100% (perfectly relevant), what percentage best represents how well this article matches the user's interest? Answer with a single number (0-100) followed by a brief reason.
-'''
-    try:
-        response = llm.generate(prompt, max_tokens=50).strip()
-        import re
-        match = re.match(r"(\d{1,3})\s*[%]?[\s:.,-]+(.*)", response)
-        if match:
-            percent = int(match.group(1))
-            percent = max(0, min(percent, 100))
-            reason = match.group(2).strip()
-            return percent, reason
-        # Fallback: try to extract a number
-        numbers = re.findall(r"\d{1,3}", response)
-        percent = int(numbers[0]) if numbers else None
-        if percent is not None:
-            percent = max(0, min(percent, 100))
-        return percent, response
-    except Exception as e:
-        print(f"Error scoring relevance for '{entry.title}': {e}")
-        return None, f"llm error: {str(e).lower()}"
+def get_cache_path(config_dir=CONFIG_DIR):
+    """Use custom_processing_cache.db if present, otherwise processing_cache.db"""
+    return config_dir / ("custom_processing_cache.db" if (config_dir / "custom_processing_cache.db").exists() else "processing_cache.db")
 
 def get_topic_hash(topic_config):
     """Hash the topic's keywords, description, and user_interest for cache validation."""
@@ -294,218 +41,535 @@ def get_topic_hash(topic_config):
     }, sort_keys=True)
     return hashlib.sha256(hash_input.encode('utf-8')).hexdigest()
 
-# --- Parse and collect matches with two-stage filtering ---
-matched = {topic: [] for topic in topics}
-all_keywords_used = {topic: set() for topic in topics}
-
-processed_count = 0
-cached_count = 0
-new_count = 0
-
-start_time = time.time()
-
-for url in feeds:
-    feed = feedparser.parse(url)
-    print(f"\nProcessing feed: {url}")
-    
-    for entry in feed.entries:
-        # Check time limit before processing each article
-        if max_processing_time and (time.time() - start_time) > max_processing_time:
-            print(f"\nMax processing time of {max_processing_time} seconds reached. Stopping early and saving progress.")
-            break
-        processed_count += 1
-        print(f"Processing entry {processed_count}: {entry.title}")
-        
-        article_processed = False
-        for topic_name, topic_config in topics.items():
-            topic_hash = get_topic_hash(topic_config)
+
+class DigestPipeline:
+    """One run of the digest: fetch every feed, filter and classify its entries, collect matches per topic.
+
+    Entries are resolved from the cache and keywords feed by feed; those that need the LLM are
+    collected across all feeds and then assessed in the order AssessmentScheduler picks, so the
+    time limit is spent on the most valuable articles. The LLM is only touched once an article
+    actually needs it, so a run answered entirely from the cache never loads the model.
+    """
+
+    def __init__(self, config, cache, writer=None):
+        self.config = config
+        self.cache = cache
+        self.writer = writer  # Optional TopicWriter that gets articles as soon as they are confirmed
+        self.feeds = config["feeds"]
+        self.topics = config["topics"]
+        self.max_processing_time = config.get("max_processing_time", 0)  # In seconds, 0 means unlimited
+
+        # --- Build the keyword index once for all topics ---
+        self.keyword_index = KeywordIndex(self.topics)
+        # --- Setup concurrent feed fetching ---
+        self.fetcher = FeedFetcher.from_config(config)
+
+        # --- LLM settings (the model itself is loaded lazily, see llm_tasks.get_model) ---
+        llm_tasks.configure_model(n_threads=config.get("llm_threads_per_worker"))
+        # Prompts answered before (duplicates, retries, topics re-assessed after a keyword change) skip the model
+        self.response_cache = cache if (config.get("llm_response_cache") or {}).get("enabled", True) else None
+        llm_tasks.configure_response_cache(self.response_cache, cache.model_version)
+        self.llm_workers = config.get("llm_workers", 1) or 1
+        self.llm_pool = None  # Started on the first article that needs the LLM
+        self.scheduler = AssessmentScheduler(cache, workers=self.llm_workers)
+        self.metrics = RunMetrics()  # Stage timings and counters for the run report
+        topic_assignment = config.get("topic_assignment", "first_match")  # "first_match" or "all_matches"
+        if topic_assignment not in ("first_match", "all_matches"):
+            raise ValueError(f"Unknown topic_assignment '{topic_assignment}', expected 'first_match' or 'all_matches'")
+        self.first_match = topic_assignment == "first_match"
+        summary_settings = config.get("summaries") or {}
+        summary_mode = summary_settings.get("mode", "extractive")  # "extractive" or "llm"
+        if summary_mode not in ("extractive", "llm"):
+            raise ValueError(f"Unknown summaries mode '{summary_mode}', expected 'extractive' or 'llm'")
+        self.llm_summary_top_n = summary_settings.get("llm_top_n", DEFAULT_LLM_SUMMARY_TOP_N) or 0
+        self.llm_settings = {
+            "combined_prompt": config.get("llm_combined_prompt", False),  # One LLM call for verdict, relevance and summary
+            "multi_topic": config.get("multi_topic_classification", False),  # One classify call for all candidate topics
+            "topic_assignment": topic_assignment,
+            "summary_mode": summary_mode  # Who shortens long summaries: key sentences, or the LLM for every article
+        }
+
+        self.topic_hashes = {topic_name: get_topic_hash(topic_config) for topic_name, topic_config in self.topics.items()}
+
+        # --- Syndicated copies and near-duplicates share the first copy's cache key and results ---
+        duplicate_settings = config.get("duplicate_detection") or {}
+        self.identity = None
+        if duplicate_settings.get("enabled", True):
+            self.identity = ArticleIdentity.from_config(cache, duplicate_settings)
+
+        # --- Optional Stage 1.5: embedding similarity between articles and topics ---
+        semantic_settings = config.get("semantic_prefilter") or {}
+        self.semantic_filter = None
+        if semantic_settings.get("enabled"):
+            from semantic_filter import SemanticPrefilter
+            print("Loading embedding model for semantic prefilter...")
+            self.semantic_filter = SemanticPrefilter.from_config(cache, self.topics, self.topic_hashes, semantic_settings)
+
+        # Feed validators are only reused if the feed was last processed with the same stage versions and topic config
+        self.feed_state_hash = hashlib.sha256(json.dumps({
+            "stage_versions": cache.stage_versions,
+            "topics": self.topic_hashes
+        }, sort_keys=True).encode('utf-8')).hexdigest()
+
+        # --- Parse and collect matches with two-stage filtering ---
+        self.matched = {topic: [] for topic in self.topics}
+        self.assessed = {topic: [] for topic in self.topics}  # (article key, article) accepted by the LLM in this run
+        self.all_keywords_used = {topic: set() for topic in self.topics}
+        self.processed_count = 0
+        self.cached_count = 0
+        self.new_count = 0
+        self.start_time = None
+        self.deadline = None
+        self.planned_keys = set()  # Entries already planned in this run
+        self.pending_jobs = {}     # Feed url -> LLM jobs not yet applied
+        self.fetch_results = {}    # Feed url -> fetch result, for feeds waiting on their LLM jobs
+
+    def time_exceeded(self):
+        """True once max_processing_time has been used up"""
+        return bool(self.max_processing_time) and (time.time() - self.start_time) > self.max_processing_time
+
+    def add_article(self, topic_name, article_data):
+        """Add an article to the output for its topic"""
+        self.matched[topic_name].append(article_data)
+        self.all_keywords_used[topic_name].update(article_data["matched_keywords"])
+        if self.writer is not None:
+            self.writer.add(topic_name, article_data)
+
+    def add_cached_result(self, topic_name, cached_result):
+        """Add a cached article to the output for its topic"""
+        self.add_article(topic_name, cached_result["article_data"])
+        self.cached_count += 1
+        print(f"  ✓ Using cached result for {topic_name}")
+
+    def restore_unchanged_feed(self, url):
+        """Reuse a feed's cached results without parsing it"""
+        restored_count = 0
+        restored_keys = set()
+        for cached_result in self.cache.get_cached_results_for_feed(url, self.topic_hashes):
+            if cached_result["article_key"] in self.planned_keys:
+                # A copy of this article from another feed is already in the output
+                continue
+            topic_name = cached_result.get('topic')
+            if topic_name in self.matched and cached_result.get("article_data"):
+                self.add_article(topic_name, cached_result["article_data"])
+                restored_keys.add(cached_result["article_key"])
+                restored_count += 1
+        self.planned_keys.update(restored_keys)
+        self.cached_count += restored_count
+        print(f"  ✓ Feed unchanged, using {restored_count} cached articles")
+
+    def plan_entry(self, entry):
+        """Resolve an entry from the cache, keywords and semantic prefilter as far as possible.
+
+        Cached results are added to the output straight away. Returns (candidates, cached_fallback):
+        the keyword-matched topics that still need the LLM, as
+        (topic_name, topic_config, matched_keywords, keyword_matches, known_verdict, cached) in config
+        order, and a cached assignment that only applies if none of them is accepted. cached is set
+        for results cached under an older relevance or summary prompt (see llm_tasks.assess_topic).
+        """
+        entry_keyword_matches = None  # All topics' keyword hits, computed on the first cache miss
+        entry_similarities = None  # Semantic similarity to every keyword-matched topic, computed on first use
+        candidates = []
+        cached_fallback = None
+        for topic_name, topic_config in self.topics.items():
+            topic_hash = self.topic_hashes[topic_name]
             # Check if we should process this article for this topic+hash
-            should_process, reason = cache.should_process_article(entry, topic=topic_name, topic_hash=topic_hash)
+            with self.metrics.stage("cache_lookup"):
+                should_process, reason = self.cache.should_process_article(entry, topic=topic_name, topic_hash=topic_hash)
+            self.metrics.count("cache_misses" if should_process else "cache_hits")
+            cached = None
+            if reason == "stages_updated":
+                # The verdict stands; only the relevance score or summary from an older prompt is redone
+                with self.metrics.stage("cache_lookup"):
+                    cached_result = self.cache.get_cached_result(entry, topic=topic_name, topic_hash=topic_hash)
+                    stale = self.cache.stale_stages(entry, topic_name, topic_hash)
+                if cached_result:
+                    cached = {"article_data": cached_result["article_data"], "stale": stale}
             if not should_process:
+                if reason != "already_processed":
+                    # Cached rejection or keyword miss for this topic config
+                    continue
                 # Use cached result for this topic
-                cached_result = cache.get_cached_result(entry, topic=topic_name, topic_hash=topic_hash)
+                with self.metrics.stage("cache_lookup"):
+                    cached_result = self.cache.get_cached_result(entry, topic=topic_name, topic_hash=topic_hash)
                 if cached_result and cached_result.get('topic') == topic_name:
-                    matched[topic_name].append(cached_result["article_data"])
-                    all_keywords_used[topic_name].update(cached_result["article_data"]["matched_keywords"])
-                    cached_count += 1
-                    print(f"  ✓ Using cached result for {topic_name}")
-                    article_processed = True
-                    break  # Only assign to one topic
+                    if candidates and self.first_match:
+                        # Earlier topics still need a verdict; only fall back to this one if they all say no
+                        cached_fallback = (topic_name, cached_result)
+                        break
+                    self.add_cached_result(topic_name, cached_result)
+                    if self.first_match:
+                        break  # Only assign to one topic
                 continue
             else:
-                new_count += 1
+                self.new_count += 1
+                self.metrics.count(f"cache_misses_{reason}")
                 print(f"  🔄 Processing {topic_name} ({reason})")
-            # --- Process the article (existing logic) ---
-            keywords = topic_config['keywords']
-            description = topic_config['description']
-            user_interest = topic_config.get('user_interest', '')
-            
-            # Stage 1: Keyword pre-filtering
-            matched_keywords, keyword_matches = match_topic(entry, keywords)
-            
-            if matched_keywords:
-                print(f"  Keywords matched for {topic_name}: {', '.join(matched_keywords[:3])}...")
-                
-                # Stage 2: LLM topic validation
-                print(f"  Checking with LLM if article belongs to {topic_name}...")
-                is_relevant, ai_reasoning = llm_classify_article(entry, topic_name, description)
-                
-                if is_relevant:
-                    summary_data = get_entry_summary(entry)
-                    
-                    # Check if summary is too long and generate LLM summary if needed
-                    llm_summary = None
-                    original_summary = summary_data["text"]
-                    final_summary = original_summary
-                    
-                    if len(original_summary) > SUMMARY_LENGTH_THRESHOLD:
-                        print(f"  📝 Summary too long ({len(original_summary)} chars), generating LLM summary...")
-                        llm_summary = llm_generate_summary(entry.title, original_summary, LLM_SUMMARY_TARGET_LENGTH)
-                        if llm_summary:
-                            print(f"  ✓ LLM summary generated ({len(llm_summary)} chars)")
-                            final_summary = llm_summary
-                        else:
-                            print(f"  ⚠️ LLM summary generation failed, using placeholder")
-                            # Fallback: use placeholder for failed summarization
-                            final_summary = "-"
-                    
-                    # Get publication date
-                    published_time = getattr(entry, 'published_parsed', None)
-                    if not published_time:
-                        published_time = getattr(entry, 'updated_parsed', None)
-                    
-                    # LLM relevance percent for user interest
-                    relevance_percent, relevance_reason = llm_relevance_percent(entry, topic_name, description, user_interest)
-                    
-                    article_data = {
-                        "title": entry.title,
-                        "link": entry.link,
-                        "summary": final_summary,  # Use LLM summary, fallback truncation, or original
-                        "summary_original": summary_data["text"],  # Keep original summary
-                        "summary_html": summary_data["html"],  # Original HTML if present
-                        "is_html_summary": summary_data["is_html"],  # Flag for frontend
-                        "has_llm_summary": llm_summary is not None,  # Flag indicating LLM summary was used
-                        "has_placeholder_summary": (llm_summary is None and len(original_summary) > SUMMARY_LENGTH_THRESHOLD),  # Flag indicating placeholder was used due to failed summarization
-                        "from_feed": url,
-                        "published_parsed": published_time,
-                        "published": getattr(entry, 'published', 'Date not available'),
-                        "matched_keywords": matched_keywords,
-                        "keyword_matches": keyword_matches,
-                        "ai_reasoning": ai_reasoning,
-                        "relevance_percent": relevance_percent,
-                        "relevance_reason": relevance_reason
-                    }
-                    
-                    matched[topic_name].append(article_data)
-                    all_keywords_used[topic_name].update(matched_keywords)
-                    
-                    # Cache the result for this topic+hash
-                    cache_data = {
-                        "topic": topic_name,
-                        "topic_hash": topic_hash,
-                        "article_data": article_data,
-                        "keywords_matched": matched_keywords,
-                        "ai_reasoning": ai_reasoning
-                    }
-                    cache.mark_article_processed(entry, cache_data, topic=topic_name, topic_hash=topic_hash)
-                    
-                    print(f"  ✓ Article confirmed for {topic_name}")
-                    article_processed = True
-                    break  # Only assign to one topic
-                else:
-                    print(f"  ✗ Article rejected for {topic_name} - Reason: {ai_reasoning}")
+
+            # Stage 1: Keyword pre-filtering (one scan of the entry covers every topic)
+            if entry_keyword_matches is None:
+                with self.metrics.stage("keyword_match"):
+                    entry_keyword_matches = self.keyword_index.match_entry(entry)
+            matched_keywords, keyword_matches = entry_keyword_matches[topic_name]
+
+            if not matched_keywords:
+                self.metrics.count("keyword_misses")
+                # Remember keyword misses too, so reruns skip this topic without re-matching
+                self.cache.mark_article_rejected(entry, topic_name, topic_hash, "no_keywords")
+                continue
+            print(f"  Keywords matched for {topic_name}: {', '.join(matched_keywords[:3])}...")
+
+            # Stage 1.5: semantic prefilter drops clear false positives and settles clear matches
+            known_verdict = None
+            if cached is not None:
+                known_verdict = (True, cached["article_data"]["ai_reasoning"])
+            elif self.semantic_filter is not None:
+                if entry_similarities is None:
+                    # One article vector and one matrix-vector product cover all of the entry's topics
+                    matched_topics = [name for name, (keywords, _) in entry_keyword_matches.items() if keywords]
+                    with self.metrics.stage("semantic_prefilter"):
+                        entry_similarities = self.semantic_filter.similarities(entry, matched_topics)
+                similarity = entry_similarities[topic_name]
+                semantic_verdict = self.semantic_filter.classify(similarity)
+                self.metrics.count(f"semantic_{semantic_verdict}")
+                if semantic_verdict == "reject":
+                    reason = f"semantic similarity {similarity:.2f} below {self.semantic_filter.reject_below}"
+                    print(f"  ✗ Article rejected for {topic_name} - Reason: {reason}")
+                    self.cache.mark_article_rejected(entry, topic_name, topic_hash, "semantic_rejected", reason)
+                    continue
+                if semantic_verdict == "accept":
+                    known_verdict = (True, f"semantic match: similarity {similarity:.2f}")
+
+            candidates.append((topic_name, topic_config, matched_keywords, keyword_matches, known_verdict, cached))
+        return candidates, cached_fallback
+
+    def apply_assessment(self, entry, outcomes, cached_fallback=None):
+        """Record the LLM outcomes for an entry in the output and the cache.
+
+        Returns True if the article was accepted for any topic (including the cached fallback).
+        """
+        article_processed = False
+        for outcome in outcomes:
+            topic_name = outcome["topic"]
+            topic_hash = self.topic_hashes[topic_name]
+            if not outcome["accepted"]:
+                print(f"  ✗ Article rejected for {topic_name} - Reason: {outcome['ai_reasoning']}")
+                self.cache.mark_article_rejected(entry, topic_name, topic_hash, "rejected", outcome["ai_reasoning"])
+                continue
+
+            article_data = outcome["article_data"]
+            self.add_article(topic_name, article_data)
+            self.assessed[topic_name].append((self.cache._get_article_key(entry), article_data))
+
+            # Cache the result for this topic+hash
+            cache_data = {
+                "topic": topic_name,
+                "topic_hash": topic_hash,
+                "article_data": article_data,
+                "keywords_matched": article_data["matched_keywords"],
+                "ai_reasoning": outcome["ai_reasoning"]
+            }
+            self.cache.mark_article_processed(entry, cache_data, topic=topic_name, topic_hash=topic_hash)
+
+            print(f"  ✓ Article confirmed for {topic_name}")
+            article_processed = True
+
+        if cached_fallback and not article_processed:
+            self.add_cached_result(*cached_fallback)
+            article_processed = True
         # If article wasn't processed by any topic, do not mark as globally processed; only per-topic+hash
-        # (No global cache.mark_article_processed call here)
-    # If time limit reached, stop processing further feeds
-    if max_processing_time and (time.time() - start_time) > max_processing_time:
-        break
-
-# Sort articles by date (newest first) within each topic
-def get_sort_key(article):
-    """Get a consistent sort key for article dates"""
-    published = article.get('published_parsed')
-    
-    if not published:
-        # No date available, use epoch time
-        return time.struct_time((1970, 1, 1, 0, 0, 0, 0, 0, 0))
-    
-    # Handle different types of date formats
-    if isinstance(published, time.struct_time):
-        return published
-    elif isinstance(published, (list, tuple)) and len(published) >= 6:
-        # Convert list/tuple to struct_time
+        return article_processed
+
+    def get_llm_pool(self):
+        """The LLM worker pool, started on first use (None when the LLM runs in this process)"""
+        if self.llm_pool is None and self.llm_workers > 1:
+            self.llm_pool = LLMWorkerPool.from_config(self.config, response_cache=self.response_cache)
+            print(f"Started {self.llm_pool.workers} LLM workers ({self.llm_pool.threads_per_worker} threads each)")
+        return self.llm_pool
+
+    def queue_entry(self, url, entry, queued_at=None):
+        """Plan an entry and queue its LLM job, if it needs one, with the scheduler"""
+        article_key = self.cache._get_article_key(entry)
+        if article_key in self.planned_keys:
+            # Already handled in this run, possibly as a copy from another feed
+            return
+        self.planned_keys.add(article_key)
+        self.processed_count += 1
+        print(f"Processing entry {self.processed_count}: {entry.title}")
+
+        candidates, cached_fallback = self.plan_entry(entry)
+        if not candidates:
+            return
+
+        # Stage 2: LLM topic validation, relevance and summary (see llm_tasks.run_assessment_job)
+        job = {
+            "entry": make_job_entry(entry),
+            "url": url,
+            "candidates": candidates,
+            "settings": self.llm_settings,
+            "deadline": self.deadline
+        }
+        self.scheduler.add(url, entry, job, cached_fallback, queued_at=queued_at)
+        self.pending_jobs[url] = self.pending_jobs.get(url, 0) + 1
+
+    def queue_leftover_entries(self):
+        """Plan the entries the previous run ran out of time for"""
+        queued = [(url, entry, queued_at) for url, entry, queued_at in self.scheduler.load_queue() if url in self.feeds]
+        if not queued:
+            return
+        print(f"\nResuming {len(queued)} entries queued by the previous run")
+        self.cache.prefetch([entry for _, entry, _ in queued], self.topic_hashes)
+        for url, entry, queued_at in queued:
+            self.queue_entry(url, entry, queued_at=queued_at)
+
+    def process_feed(self, url, feed):
+        """Filter one parsed feed, queueing the entries that need the LLM. Returns False if the time limit cut it short."""
+        # Map syndicated copies onto the article they duplicate before anything is looked up
+        if self.identity is not None:
+            with self.metrics.stage("identity"):
+                for entry in feed.entries:
+                    resolution = self.identity.resolve(entry, url)
+                    self.metrics.count(f"identity_{resolution}")
+                    if resolution in ("url_duplicate", "near_duplicate"):
+                        print(f"  ↺ {entry.get('title', '')} is a {resolution.replace('_', ' ')} of an earlier article")
+
+        # Load all cached verdicts for this feed's entries in one go
+        with self.metrics.stage("cache_prefetch"):
+            self.cache.prefetch(feed.entries, self.topic_hashes)
+
+        for entry in feed.entries:
+            # Check time limit before processing each article
+            if self.time_exceeded():
+                print(f"\nMax processing time of {self.max_processing_time} seconds reached. Stopping early and saving progress.")
+                return False
+            self.queue_entry(url, entry)
+        return True
+
+    def complete_feed(self, url):
+        """Record a feed whose every entry has been handled: validators, cache and output"""
+        fetch_result = self.fetch_results.pop(url)
+        # Only remember validators once every entry has been seen, so a partial run re-reads the feed
+        if fetch_result["status"] == 200:
+            self.cache.update_feed_validators(
+                url, fetch_result["etag"], fetch_result["last_modified"], fetch_result["body_hash"],
+                self.feed_state_hash
+            )
+        # Commit this feed's results in a single transaction
+        self.cache.flush()
+        self.flush_output(url)
+
+    def run_scheduled_jobs(self):
+        """Assess the queued entries in scheduler order, within the time limit. Returns the jobs left over."""
+        if not len(self.scheduler):
+            return []
+        budget = self.deadline - time.time() if self.deadline else None
+        selected, deferred = self.scheduler.select(budget)
+        print(f"\nAssessing {len(selected)} of {len(self.scheduler)} articles with the LLM "
+              f"(estimated {self.scheduler.estimate(selected):.0f}s at {self.scheduler.seconds_per_call:.1f}s per call)")
+        if not selected:
+            return deferred
+
+        started = time.time()
+        calls = 0
+        load_seconds = 0.0
+        if self.get_llm_pool() is not None:
+            # The jobs run across the worker pool; results are applied in scheduled order
+            results = self.llm_pool.run([item["job"] for item in selected], self.deadline)
+        else:
+            results = (run_assessment_job(item["job"]) for item in selected)
+        for item, result in zip(selected, results):
+            if result is None:
+                # Time limit reached before this article was assessed
+                deferred.append(item)
+                continue
+            # Only generations count towards the per-call time estimate, not answers from the response cache
+            calls += sum(1 for call in result["llm_calls"] if call["type"] != "model_load" and not call["cached"])
+            # ... and the first job's model load is taken out of the measured time
+            load_seconds += sum(call["seconds"] for call in result["llm_calls"] if call["type"] == "model_load")
+            self.metrics.count("llm_jobs")
+            self.metrics.add_llm_calls(result["llm_calls"])
+            self.cache.record_llm_calls(result["llm_calls"])
+            self.apply_assessment(item["entry"], result["outcomes"], item["cached_fallback"])
+            url = item["url"]
+            self.pending_jobs[url] -= 1
+            if not self.pending_jobs[url] and url in self.fetch_results:
+                self.complete_feed(url)
+        self.scheduler.record(calls, time.time() - started, load_seconds)
+        self.metrics.count("llm_jobs_deferred", len(deferred))
+        return deferred
+
+    def summarise_top_articles(self):
+        """Have the LLM rewrite the extractive summaries of each topic's most relevant new articles.
+
+        With summary_mode "extractive" the LLM stages leave summaries to extractive_summary; the
+        llm_summary_top_n articles per topic with the highest relevance among those accepted in
+        this run then get an LLM summary, as far as the time limit allows.
+        """
+        if self.llm_settings["summary_mode"] != "extractive" or not self.llm_summary_top_n:
+            return
+        picked = []
+        for topic_name, articles in self.assessed.items():
+            ranked = sorted(articles, key=lambda item: item[1].get("relevance_percent") or 0, reverse=True)
+            picked.extend(
+                (topic_name, article_key, article) for article_key, article in ranked[:self.llm_summary_top_n]
+                if article.get("has_extractive_summary")
+            )
+        if not picked or self.time_exceeded():
+            return
+        print(f"\nWriting LLM summaries for the {len(picked)} most relevant new articles")
+        jobs = [
+            {"title": article["title"], "text": article["summary_original"], "deadline": self.deadline}
+            for _, _, article in picked
+        ]
+        if self.get_llm_pool() is not None:
+            results = self.llm_pool.run(jobs, self.deadline, task=run_summary_job)
+        else:
+            results = (run_summary_job(job) for job in jobs)
+        for (topic_name, article_key, article), result in zip(picked, results):
+            if result is None:
+                continue  # Time limit reached, the extractive summary stays
+            self.metrics.add_llm_calls(result["llm_calls"])
+            self.cache.record_llm_calls(result["llm_calls"])
+            if not result["summary"]:
+                continue
+            article.update(summary=result["summary"], has_llm_summary=True, has_extractive_summary=False)
+            self.cache.update_article_summary(article_key, topic_name, self.topic_hashes[topic_name], article)
+            if self.writer is not None:
+                self.writer.replace(topic_name, article)
+            self.metrics.count("llm_summaries")
+
+    def flush_output(self, url):
+        """Bring the topic files up to date after a feed has been handled"""
+        if self.writer is not None:
+            with self.metrics.stage("output_write"):
+                self.writer.finish_feed(url)
+                self.writer.flush()
+
+    def run(self):
+        """Process every feed and return the matched articles per topic, newest first"""
+        self.start_time = time.time()
+        # LLM jobs check this themselves, so queued work is dropped once the time limit is reached
+        self.deadline = self.start_time + self.max_processing_time if self.max_processing_time else None
+        feed_validators = self.cache.get_feed_validators(self.feed_state_hash)
+
         try:
-            return time.struct_time(tuple(published[:9]) + (0,) * (9 - len(published)))
-        except (ValueError, TypeError):
-            return time.struct_time((1970, 1, 1, 0, 0, 0, 0, 0, 0))
-    else:
-        # Fallback for other types
-        return time.struct_time((1970, 1, 1, 0, 0, 0, 0, 0, 0))
-
-for topic in matched:
-    matched[topic].sort(key=get_sort_key, reverse=True)
-
-# Clean up old cache entries (older than 30 days) and optimize database
-old_entries_removed = cache.clean_old_entries(max_age_days=30)
-if old_entries_removed > 0:
-    print(f"Cleaned up {old_entries_removed} old cache entries")
-    cache.vacuum_database()
-    print("Database optimized")
-
-# Print final results
-print(f"\nProcessing Summary:")
-print(f"  Total entries processed: {processed_count}")
-print(f"  Cached entries used: {cached_count}")
-print(f"  New entries processed: {new_count}")
-print(f"\nFinal results:")
-for topic, articles in matched.items():
-    print(f"  {topic}: {len(articles)} articles")
-
-# Save results to JSON files - one per topic in a separate directory
-output_dir = Path(Path(__file__).parent)
-topics_dir = output_dir / "topics"
-topics_dir.mkdir(exist_ok=True)
-
-# Create topics index for React app
-topics_index = {
-    "topics": list(topics.keys()),
-    "generated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
-    "summary": {
-        "total_topics": len(matched),
-        "total_articles": sum(len(articles) for articles in matched.values()),
-        "articles_by_topic": {topic: len(articles) for topic, articles in matched.items()}
-    }
-}
-
-# Save topics index
-index_path = topics_dir / "index.json"
-with open(index_path, "w") as f:
-    json.dump(topics_index, f, indent=2, default=str)
-
-# Save individual topic files
-for topic, articles in matched.items():
-    topic_filename = f"{topic.lower().replace(' ', '_')}.json"
-    topic_path = topics_dir / topic_filename
-    
-    topic_data = {
-        "topic": topic,
-        "articles": articles,
-        "total_articles": len(articles),
-        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
-    }
-    
-    with open(topic_path, "w") as f:
-        json.dump(topic_data, f, indent=2, default=str)
-    print(f"  {topic}: saved {len(articles)} articles to topics/{topic_filename}")
-
-print(f"\nTopic files saved to: {topics_dir}")
-print(f"Topics index saved to: {index_path}")
-
-# Show updated cache stats
-final_stats = cache.get_cache_stats()
-print(f"\nFinal cache stats:")
-print(f"  Database size: {final_stats['cache_size_mb']} MB")
-print(f"  Total cached articles: {final_stats['total_cached_articles']}")
-print(f"  Current version articles: {final_stats['current_version_articles']}")
-if final_stats['articles_by_topic']:
-    print(f"  Articles by topic: {final_stats['articles_by_topic']}")
+            self.queue_leftover_entries()
+            # Feeds are downloaded in parallel and handed over as each one completes
+            fetch_and_plan_start = time.time()
+            for fetch_result in self.fetcher.fetch_all(self.feeds, feed_validators):
+                url = fetch_result["url"]
+                feed = fetch_result["feed"]
+                print(f"\nProcessing feed: {url} (fetched in {fetch_result['elapsed']:.1f}s)")
+                self.metrics.add_sample("feed_fetch", fetch_result["elapsed"] - fetch_result["parse_elapsed"])
+                if fetch_result["not_modified"]:
+                    # Nothing new in this feed, reuse its cached results without parsing
+                    self.metrics.count("feeds_not_modified")
+                    with self.metrics.stage("cache_restore"):
+                        self.restore_unchanged_feed(url)
+                    self.flush_output(url)
+                    continue
+                if feed is None:
+                    self.metrics.count("feeds_failed")
+                    print(f"  ⚠️ Failed to fetch feed: {fetch_result['error']}")
+                    continue
+                self.metrics.count("feeds_parsed")
+                self.metrics.add_sample("feed_parse", fetch_result["parse_elapsed"])
+
+                with self.metrics.stage("feed_plan"):
+                    feed_planned = self.process_feed(url, feed)
+                if not feed_planned:
+                    # Time limit reached while planning, stop processing further feeds
+                    break
+                self.fetch_results[url] = fetch_result
+                if not self.pending_jobs.get(url):
+                    self.complete_feed(url)
+            self.metrics.add_sample("fetch_and_plan", time.time() - fetch_and_plan_start)
+
+            # Then spend the LLM time on the queued entries, best first
+            with self.metrics.stage("llm_assessment"):
+                deferred = self.run_scheduled_jobs()
+            with self.metrics.stage("llm_summaries"):
+                self.summarise_top_articles()
+            if deferred:
+                print(f"  {len(deferred)} articles left for the next run")
+            self.scheduler.save(deferred)
+            self.cache.flush()
+        finally:
+            if self.llm_pool is not None:
+                self.llm_pool.shutdown()
+
+        # Sort articles by date (newest first) within each topic
+        for topic in self.matched:
+            self.matched[topic].sort(key=article_timestamp, reverse=True)
+        self.metrics.count("entries", self.processed_count)
+        self.metrics.count("articles_matched", sum(len(articles) for articles in self.matched.values()))
+        return self.matched
+
+
+def main():
+    config = load_config()
+
+    # --- Initialize processing cache ---
+    cache_db_path = get_cache_path()
+    cache = SQLiteProcessingCache(str(cache_db_path), model_revision=config.get("model_revision", llm_tasks.MODEL_REVISION))
+    print(f"Cache stats: {cache.get_cache_stats()} (using {cache_db_path.name})")
+
+    # Topic files are rewritten after every feed, so an interrupted run still leaves valid output
+    topics_dir = CONFIG_DIR / "topics"
+    writer = TopicWriter(topics_dir, config["topics"].keys(), shard_size=config.get("topic_shard_size", DEFAULT_SHARD_SIZE))
+    pipeline = DigestPipeline(config, cache, writer=writer)
+    matched = pipeline.run()
+
+    # Clean up old cache entries (older than 30 days) and optimize database
+    with pipeline.metrics.stage("cache_maintenance"):
+        old_entries_removed = cache.clean_old_entries(max_age_days=30)
+        max_responses = (config.get("llm_response_cache") or {}).get("max_entries", LLM_RESPONSE_CACHE_ENTRIES)
+        evicted = cache.evict_llm_responses(max_responses)
+        if evicted:
+            print(f"Evicted {evicted} least recently used LLM responses")
+        if old_entries_removed > 0:
+            print(f"Cleaned up {old_entries_removed} old cache entries")
+            cache.vacuum_database()
+            print("Database optimized")
+
+    # Print final results
+    print(f"\nProcessing Summary:")
+    print(f"  Total entries processed: {pipeline.processed_count}")
+    print(f"  Cached entries used: {pipeline.cached_count}")
+    print(f"  New entries processed: {pipeline.new_count}")
+    print(f"\nFinal results:")
+    for topic, articles in matched.items():
+        print(f"  {topic}: {len(articles)} articles")
+
+    # Save results to JSON files - one per topic in a separate directory
+    with pipeline.metrics.stage("output_write"):
+        writer.close()
+    for topic, articles in matched.items():
+        print(f"  {topic}: saved {len(articles)} articles in {len(writer.shards[topic])} shard(s)")
+    print(f"\nTopic files saved to: {topics_dir}")
+    print(f"Topics index saved to: {topics_dir / 'index.json'}")
+
+    # Show updated cache stats
+    final_stats = cache.get_cache_stats()
+    print(f"\nFinal cache stats:")
+    print(f"  Database size: {final_stats['cache_size_mb']} MB")
+    print(f"  Total cached articles: {final_stats['total_cached_articles']}")
+    print(f"  Current version articles: {final_stats['current_version_articles']}")
+    if final_stats['articles_by_topic']:
+        print(f"  Articles by topic: {final_stats['articles_by_topic']}")
+
+    # Machine-readable run report: per-stage timings, LLM calls and tokens, hit ratios
+    report_name = config.get("run_report", "run_report.json")
+    if report_name:
+        previous = cache.get_metadata(PREVIOUS_REPORT_KEY)
+        report = pipeline.metrics.report(cache_stats=final_stats, previous=json.loads(previous) if previous else None)
+        pipeline.metrics.write(CONFIG_DIR / report_name, report)
+        # The cache is committed by the workflow, so the next run can compare against these totals
+        cache.set_metadata(PREVIOUS_REPORT_KEY, json.dumps({key: report[key] for key in ("started_at", "wall_time_s", "stages")}))
+        print(f"\nRun report saved to: {CONFIG_DIR / report_name} ({report['wall_time_s']:.0f}s wall time)")
+
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import re
+from typing import Dict, Any, List, Tuple
+
+from entry_record import entry_record
+
+
+def _is_word_char(char):
+    """Mirror the regex \\w class used by the original per-keyword \\b patterns"""
+    return char.isalnum() or char == '_'
+
+
+class KeywordIndex:
+    """All topics' keywords compiled once into a single word-boundary regex.
+
+    One scan of an entry's title and summary finds every keyword for every topic, with
+    the same semantics as searching for r'\\b<keyword>\\b' against the lowercased text.
+    """
+
+    def __init__(self, topics: Dict[str, Dict[str, Any]]):
+        # Keep each topic's own keyword order (including duplicates) so output is unchanged
+        self.topic_keywords = {
+            topic_name: list(topic_config.get('keywords', []))
+            for topic_name, topic_config in topics.items()
+        }
+        unique_keywords = {
+            keyword.lower()
+            for keywords in self.topic_keywords.values()
+            for keyword in keywords
+            if keyword
+        }
+
+        # Longest first, so at each position the regex reports the longest keyword there;
+        # any shorter keyword matching at the same position must be one of its prefixes
+        ordered = sorted(unique_keywords, key=len, reverse=True)
+        self.prefixes = {
+            keyword: [other for other in ordered if other != keyword and keyword.startswith(other)]
+            for keyword in ordered
+        }
+        if ordered:
+            alternation = "|".join(re.escape(keyword) for keyword in ordered)
+            # A zero-width lookahead lets finditer try every position, so overlapping
+            # keywords ("machine learning" and "learning") are all found
+            self.pattern = re.compile(r'(?=\b(' + alternation + r')\b)')
+        else:
+            self.pattern = None
+
+    def find(self, text) -> set:
+        """Return the set of (lowercased) keywords present in text"""
+        return self.find_lowered(text.lower() if text else text)
+
+    def find_lowered(self, text) -> set:
+        """find() for text that is already lowercased"""
+        if not text or self.pattern is None:
+            return set()
+        found = set()
+        for match in self.pattern.finditer(text):
+            keyword = match.group(1)
+            found.add(keyword)
+            start = match.start()
+            for prefix in self.prefixes[keyword]:
+                end = start + len(prefix)
+                # Same \b rule as the regex: word/non-word transition at the end of the prefix
+                before = _is_word_char(text[end - 1])
+                after = end < len(text) and _is_word_char(text[end])
+                if before != after:
+                    found.add(prefix)
+        return found
+
+    def match_entry(self, entry) -> Dict[str, Tuple[List[str], Dict[str, Any]]]:
+        """Match an entry against every topic in one pass.
+
+        Returns {topic: (matched_keywords, keyword_matches)} in the same shape match_topic
+        used to return per topic.
+        """
+        title = entry.title or ""
+        summary = entry.get('summary', '')
+        record = entry_record(entry)
+        title_found = self.find_lowered(record["title_lower"])
+        summary_found = self.find_lowered(record["summary_lower"])
+
+        results = {}
+        for topic_name, keywords in self.topic_keywords.items():
+            results[topic_name] = self._topic_matches(keywords, title, summary, title_found, summary_found)
+        return results
+
+    def _topic_matches(self, keywords, title, summary, title_found, summary_found):
+        """Build matched_keywords/keyword_matches for one topic from the pre-scanned keyword sets"""
+        keyword_matches = {}
+        matched_keywords = []
+        for keyword in keywords:
+            lowered = keyword.lower()
+            title_match = lowered in title_found
+            summary_match = lowered in summary_found
+            if title_match or summary_match:
+                matched_keywords.append(keyword)
+
+                # Track where the keyword was found
+                found_in = []
+                if title_match:
+                    found_in.append("title")
+                if summary_match:
+                    found_in.append("summary")
+
+                keyword_matches[keyword] = {
+                    "found_in": found_in,
+                    "title_text": title if title_match else None,
+                    "summary_text": summary if summary_match else None
+                }
+        return matched_keywords, keyword_matches
@@ -0,0 +1,649 @@
+import re
+import json
+import time
+import hashlib
+from pathlib import Path
+
+from run_metrics import estimate_tokens
+from extractive_summary import extractive_summary
+from entry_record import entry_record
+
+# --- Configuration ---
+SUMMARY_LENGTH_THRESHOLD = 200  # Characters above which a summary is shortened (extractively or by the LLM)
+LLM_SUMMARY_TARGET_LENGTH = 150  # Target length for LLM-generated summaries in words (more aggressive)
+LLM_SUMMARY_MAX_CHARS = 200     # Maximum character limit for LLM summaries (more restrictive)
+
+# Version of each LLM stage's prompt and answer parsing. Cached results remember the versions (and
+# model) that produced them, so bumping one only redoes that stage for already cached articles:
+#   classifier - llm_classify_article, llm_classify_multi_topic and the VERDICT/REASON lines of llm_assess_article
+#   relevance  - llm_relevance_percent and the RELEVANCE line of llm_assess_article
+#   summary    - llm_generate_summary, the SUMMARY line of llm_assess_article and clean_llm_summary
+PROMPT_VERSIONS = {"classifier": 1, "relevance": 1, "summary": 1}
+
+MODEL_NAME = "phi-2.Q4_0.gguf"
+MODEL_PATH = Path(Path(__file__).parent.parent / "models")
+# Identifies the build of MODEL_NAME in cached results and LLM responses (model_revision in config.yaml).
+# Bump it when the model file is replaced by a different one; the file itself is never read for this.
+MODEL_REVISION = "1"
+
+# The model used by every llm_* helper in this process, loaded on first use (see get_model)
+llm = None
+# Model loads and generations in this process since the last take_call_log(), for the run report
+call_log = []
+_model_settings = {"model_name": MODEL_NAME, "model_path": MODEL_PATH, "n_threads": None}
+# Where generate() looks up responses to prompts it has seen before (see configure_response_cache)
+_response_cache = {"store": None, "model_version": MODEL_NAME}
+
+def configure_model(model_name=MODEL_NAME, model_path=MODEL_PATH, n_threads=None):
+    """Choose the model get_model() will load, without loading it"""
+    _model_settings.update(model_name=model_name, model_path=model_path, n_threads=n_threads)
+
+def configure_response_cache(store, model_version=MODEL_NAME):
+    """Answer repeated prompts from store, or always generate when store is None.
+
+    store is anything with get_llm_response(key) -> response or None: the processing cache in
+    the main process, a read-only LLMResponseReader in worker processes. model_version (the
+    model's name and revision) is part of every key, so another model never reuses answers.
+    """
+    _response_cache.update(store=store, model_version=model_version)
+
+def response_key(prompt, max_tokens):
+    """Content address of a generation: the model, the generation parameters and the prompt"""
+    return hashlib.sha256(json.dumps({
+        "model": _response_cache["model_version"],
+        "max_tokens": max_tokens,
+        "prompt": prompt
+    }, sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_model():
+    """Return this process's GPT4All model, loading it on the first call.
+
+    Runs where every article is answered from the cache never get here, so they never
+    read the model file. llama.cpp memory-maps the GGUF weights, so loading only pages
+    in what inference touches. Callers fetch the model outside their own try blocks so
+    that a missing model stops the run instead of being reported as an LLM error.
+    """
+    global llm
+    if llm is None:
+        # Imported here too, so importing this module stays cheap
+        from gpt4all import GPT4All
+        print("Loading GPT4All model...")
+        start = time.perf_counter()
+        llm = GPT4All(
+            model_name=_model_settings["model_name"],
+            model_path=_model_settings["model_path"],
+            device='cpu',
+            n_threads=_model_settings["n_threads"],
+            verbose=False
+        )
+        call_log.append({"type": "model_load", "seconds": time.perf_counter() - start})
+        print("Model loaded successfully!")
+    return llm
+
+def generate(model, call_type, prompt, max_tokens):
+    """Run one generation, or answer it from the response cache, and log it under call_type.
+
+    Log records carry the prompt's response cache key and whether it was answered from the
+    cache; generated responses are in the record too, so the process owning the cache can
+    store what worker processes generated.
+    """
+    store = _response_cache["store"]
+    key = response_key(prompt, max_tokens) if store is not None else None
+    if key is not None:
+        response = store.get_llm_response(key)
+        if response is not None:
+            call_log.append({"type": call_type, "cached": True, "key": key})
+            return response
+    start = time.perf_counter()
+    response = model.generate(prompt, max_tokens=max_tokens)
+    call_log.append({
+        "type": call_type,
+        "seconds": time.perf_counter() - start,
+        "prompt_tokens": estimate_tokens(prompt),
+        "response_tokens": estimate_tokens(response),
+        "cached": False,
+        "key": key,
+        "response": response
+    })
+    return response
+
+def take_call_log():
+    """Return the calls logged in this process so far and start a new log"""
+    global call_log
+    calls, call_log = call_log, []
+    return calls
+
+class JobEntry(dict):
+    """Picklable stand-in for a feedparser entry, carrying only what the LLM stages read"""
+    
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+def make_job_entry(entry):
+    """Copy the fields of a feedparser entry needed to assess it (possibly in another process)"""
+    return JobEntry(
+        title=entry.title,
+        link=entry.link,
+        summary=entry.get('summary', 'No summary available'),
+        published=getattr(entry, 'published', 'Date not available'),
+        published_parsed=getattr(entry, 'published_parsed', None),
+        updated_parsed=getattr(entry, 'updated_parsed', None),
+        published_ts=entry_record(entry)["published_ts"],
+        article_key=entry.get('article_key'),
+        record=entry_record(entry),
+    )
+
+# --- LLM helper functions ---
+
+def llm_classify_article(entry, topic, topic_description):
+    """Use LLM to determine if an article truly belongs to a topic"""
+    # Truncate summary to avoid context window issues
+    summary = entry.get('summary', 'No summary available')
+    if len(summary) > 500:  # Limit summary length
+        summary = summary[:500] + "..."
+    
+    prompt = f"""
+Task: Determine if this news article belongs to the topic "{topic}".
+
+Topic Description: {topic_description}
+
+Article Title: {entry.title}
+Article Summary: {summary}
+
+Question: Does this article belong to the "{topic}" topic based on the description above?
+
+Answer with only "YES" or "NO" followed by a brief reason.
+"""
+    
+    model = get_model()
+    
+    try:
+        response = generate(model, "classify", prompt, max_tokens=50)
+        original_response = response.strip()
+        response = response.strip().upper()
+        
+        # Check if response starts with YES or NO
+        if response.startswith("YES"):
+            return True, original_response.lower()
+        elif response.startswith("NO"):
+            return False, original_response.lower()
+        else:
+            # Fallback - if unclear response, be conservative and include it
+            print(f"Unclear LLM response for '{entry.title}': {response}")
+            return True, f"unclear response: {original_response.lower()}"
+    except Exception as e:
+        print(f"Error classifying article '{entry.title}': {e}")
+        return True, f"llm error: {str(e).lower()}"  # Fallback to include article if LLM fails
+
+def get_entry_summary(entry):
+    """Article summary as plain text, plus the original if it was HTML (read from the entry's record)"""
+    if "summary" not in entry:
+        return {"text": "No summary available", "html": None, "is_html": False}
+    record = entry_record(entry)
+    return {
+        "text": record["summary_text"],
+        "html": record["summary_html"],
+        "is_html": record["summary_html"] is not None
+    }
+
+def llm_generate_summary(title, original_summary, target_length_words=50):
+    """Use LLM to generate a concise summary when the original is too long"""
+    # Truncate the original summary to avoid context window issues
+    if len(original_summary) > 800:
+        original_summary = original_summary[:800] + "..."
+    
+    prompt = f"""
+Task: Create an extremely short, one-sentence summary for a news digest.
+
+Article Title: {title}
+
+Original Summary: {original_summary}
+
+Instructions:
+- Write ONLY one short sentence
+- Maximum {target_length_words} words total
+- Focus on the main point only
+- No details, examples, or background
+- Simple, clear language
+- No HTML, markdown, quotes, or formatting
+- End with a period
+
+Summary:
+"""
+    
+    model = get_model()
+    
+    try:
+        response = generate(model, "summary", prompt, max_tokens=100)  # Reduced token limit
+        return clean_llm_summary(response)
+        
+    except Exception as e:
+        print(f"Error generating LLM summary: {e}")
+        return None
+
+def clean_llm_summary(response):
+    """Strip model artifacts and trim an LLM summary to LLM_SUMMARY_MAX_CHARS (None if unusable)"""
+    # Clean up the response aggressively
+    summary = response.strip()
+    
+    # Remove model artifacts and tokens
+    summary = re.sub(r'<\|.*?\|>', '', summary)
+    summary = re.sub(r'<\|.*?>', '', summary)   
+    summary = re.sub(r'\|.*?>', '', summary)    
+    summary = re.sub(r'<.*?>', '', summary)     
+    
+    # Remove common stopping patterns more aggressively
+    stop_patterns = [
+        'about me:', 'tech stack:', 'conclusion:', 'in conclusion:',
+        'hope you found', 'happy coding', 'github:', 'source:',
+        'the article', 'this article', 'the author', 'in summary:',
+        'to summarize:', 'overall:', 'finally:', 'additionally:'
+    ]
+    
+    summary_lower = summary.lower()
+    for pattern in stop_patterns:
+        if pattern in summary_lower:
+            idx = summary_lower.find(pattern)
+            summary = summary[:idx].strip()
+            break
+    
+    # Clean up formatting
+    summary = re.sub(r'\n+', ' ', summary)
+    summary = re.sub(r'\s+', ' ', summary)
+    summary = summary.strip()
+    
+    # Take only the first sentence or two if it's still too long
+    if len(summary) > LLM_SUMMARY_MAX_CHARS:
+        # Split into sentences
+        sentences = re.split(r'[.!?]+', summary)
+        if len(sentences) > 1:
+            # Take first sentence and add period if missing
+            summary = sentences[0].strip()
+            if summary and not summary[-1] in '.!?':
+                summary += '.'
+        else:
+            # Truncate to character limit
+            summary = summary[:LLM_SUMMARY_MAX_CHARS].strip()
+            if not summary[-1] in '.!?':
+                summary = summary[:summary.rfind(' ')] + '.'
+    
+    # Ensure proper sentence ending
+    if summary and not summary[-1] in '.!?':
+        summary += '.'
+    
+    # Final aggressive truncation if still too long
+    if len(summary) > LLM_SUMMARY_MAX_CHARS:
+        # Force truncate at word boundary
+        words = summary.split()
+        truncated = []
+        current_length = 0
+        for word in words:
+            if current_length + len(word) + 1 > LLM_SUMMARY_MAX_CHARS - 1:  # Leave room for period
+                break
+            truncated.append(word)
+            current_length += len(word) + 1
+        summary = ' '.join(truncated)
+        if not summary.endswith('.'):
+            summary += '.'
+    
+    # Final validation
+    if len(summary) < 10:  # Too short
+        return None
+        
+    return summary
+
+def llm_relevance_percent(entry, topic, topic_description, user_interest):
+    """Use LLM to rate article relevance to user interest as a percentage (0-100) and provide a reason"""
+    summary = entry.get('summary', 'No summary available')
+    if len(summary) > 500:
+        summary = summary[:500] + "..."
+    prompt = f'''
+Task: Rate how relevant this article is to the user's interest in the topic "{topic}".
+
+Topic Description: {topic_description}
+User Interest: {user_interest}
+Article Title: {entry.title}
+Article Summary: {summary}
+
+Question: On a scale from 0% (not relevant) to 100% (perfectly relevant), what percentage best represents how well this article matches the user's interest? Answer with a single number (0-100) followed by a brief reason.
+'''
+    model = get_model()
+    try:
+        response = generate(model, "relevance", prompt, max_tokens=50).strip()
+        return parse_relevance_response(response)
+    except Exception as e:
+        print(f"Error scoring relevance for '{entry.title}': {e}")
+        return None, f"llm error: {str(e).lower()}"
+
+def parse_relevance_response(response):
+    """Parse "<percent> <reason>" from an LLM answer into (percent or None, reason)"""
+    match = re.match(r"(\d{1,3})\s*[%]?[\s:.,-]+(.*)", response)
+    if match:
+        percent = int(match.group(1))
+        percent = max(0, min(percent, 100))
+        reason = match.group(2).strip()
+        return percent, reason
+    # Fallback: try to extract a number
+    numbers = re.findall(r"\d{1,3}", response)
+    percent = int(numbers[0]) if numbers else None
+    if percent is not None:
+        percent = max(0, min(percent, 100))
+    return percent, response
+
+def llm_assess_article(entry, topic, topic_description, user_interest, needs_summary, target_length_words=50,
+                       include_verdict=True):
+    """Classify, score and (optionally) summarise an article with a single LLM call.
+
+    Returns a dict with is_relevant, ai_reasoning, relevance_percent, relevance_reason and
+    summary, or None if the answer could not be parsed (callers then use the separate prompts).
+    With include_verdict=False the article is already known to belong to the topic and only
+    relevance and summary are asked for.
+    """
+    summary = entry.get('summary', 'No summary available')
+    if len(summary) > 800:
+        summary = summary[:800] + "..."
+    summary_instruction = (
+        f"SUMMARY: <one short sentence of at most {target_length_words} words, plain text, ending with a period>\n"
+        if needs_summary else ""
+    )
+    verdict_instruction = (
+        "VERDICT: <YES or NO, does the article belong to the topic>\nREASON: <brief reason>\n"
+        if include_verdict else ""
+    )
+    prompt = f"""
+Task: Assess this news article for the topic "{topic}".
+
+Topic Description: {topic_description}
+User Interest: {user_interest}
+
+Article Title: {entry.title}
+Article Summary: {summary}
+
+Answer using exactly these lines and nothing else:
+{verdict_instruction}RELEVANCE: <number from 0 to 100 for how well it matches the user's interest>, <brief reason>
+{summary_instruction}"""
+    
+    model = get_model()
+    
+    try:
+        response = generate(model, "assess", prompt, max_tokens=160 if needs_summary else 80)
+        if not include_verdict:
+            response = "VERDICT: YES\n" + response
+        return parse_assessment_response(response, needs_summary)
+    except Exception as e:
+        print(f"Error assessing article '{entry.title}': {e}")
+        return None
+
+def parse_assessment_response(response, needs_summary):
+    """Parse the structured VERDICT/REASON/RELEVANCE/SUMMARY answer of llm_assess_article"""
+    fields = {}
+    for match in re.finditer(r'^\s*(VERDICT|REASON|RELEVANCE|SUMMARY)\s*:\s*(.*)$', response, re.MULTILINE | re.IGNORECASE):
+        # Keep the first occurrence; models sometimes repeat the template
+        fields.setdefault(match.group(1).upper(), match.group(2).strip())
+    
+    verdict = fields.get("VERDICT", "").upper()
+    if verdict.startswith("YES"):
+        is_relevant = True
+    elif verdict.startswith("NO"):
+        is_relevant = False
+    else:
+        return None
+    
+    reason = fields.get("REASON", "")
+    assessment = {
+        "is_relevant": is_relevant,
+        "ai_reasoning": f"{verdict.split()[0]}: {reason}".lower() if reason else verdict.lower(),
+        "relevance_percent": None,
+        "relevance_reason": None,
+        "summary": None,
+    }
+    if not is_relevant:
+        # Nothing else is used for rejected articles
+        return assessment
+    
+    if "RELEVANCE" not in fields:
+        return None
+    assessment["relevance_percent"], assessment["relevance_reason"] = parse_relevance_response(fields["RELEVANCE"])
+    if assessment["relevance_percent"] is None:
+        return None
+    
+    if needs_summary:
+        if not fields.get("SUMMARY"):
+            return None
+        assessment["summary"] = clean_llm_summary(fields["SUMMARY"])
+        if assessment["summary"] is None:
+            return None
+    return assessment
+
+def llm_classify_multi_topic(entry, candidate_topics):
+    """Ask the LLM which of several candidate topics an article belongs to, in one call.
+
+    candidate_topics maps topic name -> description. Returns {topic: (is_relevant, reason)} for
+    every topic the answer covered; topics missing from the answer are left out.
+    """
+    summary = entry.get('summary', 'No summary available')
+    if len(summary) > 500:
+        summary = summary[:500] + "..."
+    topic_lines = "\n".join(
+        f"- {topic_name}: {description}" for topic_name, description in candidate_topics.items()
+    )
+    prompt = f"""
+Task: Decide which of these topics, if any, this news article belongs to.
+
+Topics:
+{topic_lines}
+
+Article Title: {entry.title}
+Article Summary: {summary}
+
+Answer with exactly one line per topic, in this format:
+<topic name>: YES or NO - <brief reason>
+"""
+    
+    model = get_model()
+    
+    try:
+        response = generate(model, "classify_multi_topic", prompt, max_tokens=30 * len(candidate_topics) + 20)
+        return parse_multi_topic_response(response, candidate_topics)
+    except Exception as e:
+        print(f"Error classifying article '{entry.title}' against multiple topics: {e}")
+        return {}
+
+def parse_multi_topic_response(response, candidate_topics):
+    """Parse "<topic>: YES/NO - reason" lines into {topic: (is_relevant, reason)}"""
+    verdicts = {}
+    for topic_name in candidate_topics:
+        pattern = r'^[\s\-\*\d\.]*' + re.escape(topic_name) + r'\s*:\s*(YES|NO)\b[\s\-:,.]*(.*)$'
+        match = re.search(pattern, response, re.MULTILINE | re.IGNORECASE)
+        if match:
+            verdict = match.group(1).upper()
+            reason = match.group(2).strip()
+            verdicts[topic_name] = (verdict == "YES", f"{verdict}: {reason}".lower() if reason else verdict.lower())
+    return verdicts
+
+def assess_topic(entry, url, topic_name, topic_config, matched_keywords, keyword_matches, settings,
+                 known_verdict=None, cached=None):
+    """Run the LLM stages for one keyword-matched topic.
+
+    known_verdict is an (is_relevant, reason) pair already decided elsewhere (multi-topic call,
+    semantic prefilter or the cache). cached is {"article_data", "stale"} for an article cached
+    under older stage versions: only the stages listed in stale are run again, the relevance
+    score and summary of the others are reused. Returns {"topic", "accepted", "ai_reasoning", "article_data"}.
+    """
+    description = topic_config['description']
+    user_interest = topic_config.get('user_interest', '')
+    
+    summary_data = get_entry_summary(entry)
+    long_summary = len(summary_data["text"]) > SUMMARY_LENGTH_THRESHOLD
+    # With summary_mode "extractive" long summaries are shortened without the LLM here
+    needs_llm_summary = long_summary and settings["summary_mode"] == "llm"
+    reused = cached["article_data"] if cached else None
+    reuse_relevance = reused is not None and "relevance" not in cached["stale"]
+    reuse_summary = reused is not None and "summary" not in cached["stale"] and bool(reused.get("has_llm_summary"))
+    assessment = None
+    if known_verdict is not None:
+        is_relevant, ai_reasoning = known_verdict
+        if is_relevant and settings["combined_prompt"] and not reuse_relevance:
+            # Verdict is settled, one generation for relevance and (unless it is reused) summary
+            assessment = llm_assess_article(
+                entry, topic_name, description, user_interest, needs_llm_summary and not reuse_summary,
+                LLM_SUMMARY_TARGET_LENGTH, include_verdict=False
+            )
+    else:
+        if settings["combined_prompt"]:
+            # One generation for verdict, relevance and summary
+            print(f"  Assessing with LLM (combined prompt) for {topic_name}...")
+            assessment = llm_assess_article(
+                entry, topic_name, description, user_interest, needs_llm_summary, LLM_SUMMARY_TARGET_LENGTH
+            )
+            if assessment is None:
+                print(f"  ⚠️ Could not parse combined LLM answer, falling back to separate prompts")
+        
+        if assessment is not None:
+            is_relevant, ai_reasoning = assessment["is_relevant"], assessment["ai_reasoning"]
+        else:
+            print(f"  Checking with LLM if article belongs to {topic_name}...")
+            is_relevant, ai_reasoning = llm_classify_article(entry, topic_name, description)
+    
+    outcome = {"topic": topic_name, "accepted": is_relevant, "ai_reasoning": ai_reasoning, "article_data": None}
+    if not is_relevant:
+        return outcome
+    
+    # Check if summary is too long and generate LLM summary if needed
+    llm_summary = None
+    original_summary = summary_data["text"]
+    final_summary = original_summary
+    
+    if long_summary and reuse_summary:
+        llm_summary = reused["summary"] if reused.get("has_llm_summary") else None
+    elif needs_llm_summary:
+        if assessment is not None:
+            llm_summary = assessment["summary"]
+        else:
+            print(f"  📝 Summary too long ({len(original_summary)} chars), generating LLM summary...")
+            llm_summary = llm_generate_summary(entry.title, original_summary, LLM_SUMMARY_TARGET_LENGTH)
+        if llm_summary:
+            print(f"  ✓ LLM summary generated ({len(llm_summary)} chars)")
+        else:
+            print(f"  ⚠️ LLM summary generation failed, using extractive summary")
+    if llm_summary:
+        final_summary = llm_summary
+    elif long_summary:
+        # The feed summary's key sentences, picked without the LLM
+        final_summary = extractive_summary(original_summary, LLM_SUMMARY_MAX_CHARS, topic_config.get('keywords', []))
+    
+    # Get publication date
+    published_time = getattr(entry, 'published_parsed', None)
+    if not published_time:
+        published_time = getattr(entry, 'updated_parsed', None)
+    published_ts = entry_record(entry)["published_ts"]
+    
+    # LLM relevance percent for user interest
+    if reuse_relevance:
+        relevance_percent, relevance_reason = reused.get("relevance_percent"), reused.get("relevance_reason")
+    elif assessment is not None:
+        relevance_percent, relevance_reason = assessment["relevance_percent"], assessment["relevance_reason"]
+    else:
+        relevance_percent, relevance_reason = llm_relevance_percent(entry, topic_name, description, user_interest)
+    
+    outcome["article_data"] = {
+        "title": entry.title,
+        "link": entry.link,
+        "summary": final_summary,  # LLM summary, extractive summary, or the original if short enough
+        "summary_original": summary_data["text"],  # Keep original summary
+        "summary_html": summary_data["html"],  # Original HTML if present
+        "is_html_summary": summary_data["is_html"],  # Flag for frontend
+        "has_llm_summary": llm_summary is not None,  # Flag indicating LLM summary was used
+        "has_extractive_summary": llm_summary is None and long_summary,  # Flag indicating key sentences were picked instead
+        "from_feed": url,
+        "published_parsed": published_time,
+        "published_ts": published_ts,
+        "published": getattr(entry, 'published', 'Date not available'),
+        "matched_keywords": matched_keywords,
+        "keyword_matches": keyword_matches,
+        "ai_reasoning": ai_reasoning,
+        "relevance_percent": relevance_percent,
+        "relevance_reason": relevance_reason
+    }
+    return outcome
+
+def estimate_llm_calls(job):
+    """Rough number of LLM generations run_assessment_job makes for a job, used to schedule work.
+
+    Assumes the expensive case: the first candidate is accepted (every candidate with all_matches).
+    """
+    settings = job["settings"]
+    candidates = job["candidates"]
+    assessed = candidates[:1] if settings["topic_assignment"] == "first_match" else candidates
+    needs_llm_summary = (settings["summary_mode"] == "llm"
+                         and len(get_entry_summary(job["entry"])["text"]) > SUMMARY_LENGTH_THRESHOLD)
+    multi_topic = settings["multi_topic"] and sum(1 for candidate in candidates if candidate[4] is None) > 1
+    calls = 1 if multi_topic else 0
+    for candidate in assessed:
+        cached = candidate[5]
+        redo_relevance = cached is None or "relevance" in cached["stale"]
+        redo_summary = needs_llm_summary and (cached is None or "summary" in cached["stale"])
+        if settings["combined_prompt"] and redo_relevance:
+            calls += 1
+        else:
+            if candidate[4] is None and not multi_topic:
+                calls += 1  # Classification
+            calls += int(redo_relevance) + int(redo_summary)
+    return calls
+
+def run_assessment_job(job):
+    """Assess one article against its candidate topics and return the outcomes in evaluation order.
+
+    job holds the entry (a JobEntry), its feed url, the candidates as
+    (topic_name, topic_config, matched_keywords, keyword_matches, known_verdict, cached) tuples in
+    config order, the settings (combined_prompt, multi_topic, topic_assignment, summary_mode) and an
+    optional deadline.
+    Returns {"outcomes", "llm_calls"} (llm_calls being this job's call_log records, so they reach
+    the run report from worker processes too), or None without doing any work if the deadline
+    has already passed.
+    """
+    if job.get("deadline") and time.time() > job["deadline"]:
+        return None
+    entry = job["entry"]
+    settings = job["settings"]
+    first_match = settings["topic_assignment"] == "first_match"
+    candidates = job["candidates"]
+    
+    verdicts = {}
+    if settings["multi_topic"]:
+        undecided = {}
+        for topic_name, topic_config, _, _, known_verdict, _ in candidates:
+            if known_verdict is not None and first_match:
+                break  # Nothing after an already settled match can be assigned
+            if known_verdict is None:
+                undecided[topic_name] = topic_config['description']
+        if len(undecided) > 1:
+            # One LLM call decides between all keyword-matched topics
+            print(f"  Checking with LLM which of {', '.join(undecided)} the article belongs to...")
+            verdicts = llm_classify_multi_topic(entry, undecided)
+    
+    outcomes = []
+    for topic_name, topic_config, matched_keywords, keyword_matches, known_verdict, cached in candidates:
+        outcome = assess_topic(
+            entry, job["url"], topic_name, topic_config, matched_keywords, keyword_matches, settings,
+            known_verdict=known_verdict or verdicts.get(topic_name), cached=cached
+        )
+        outcomes.append(outcome)
+        if outcome["accepted"] and first_match:
+            break  # Only assign to one topic
+    return {"outcomes": outcomes, "llm_calls": take_call_log()}
+
+def run_summary_job(job):
+    """Write the LLM summary of an article that was given an extractive one.
+
+    job holds the article's title, its original summary text and an optional deadline.
+    Returns {"summary", "llm_calls"} (summary being None if generation failed), or None
+    without doing any work if the deadline has already passed.
+    """
+    if job.get("deadline") and time.time() > job["deadline"]:
+        return None
+    summary = llm_generate_summary(job["title"], job["text"], LLM_SUMMARY_TARGET_LENGTH)
+    return {"summary": summary, "llm_calls": take_call_log()}
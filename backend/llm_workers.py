@@ -0,0 +1,77 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+import llm_tasks
+from sqlite_cache import LLMResponseReader
+
+DEFAULT_LLM_WORKERS = 1  # 1 = run the LLM in the main process, as before
+
+
+def _init_worker(model_name, model_path, n_threads, response_cache_file, model_version):
+    """Load this worker's own copy of the model, once, when the process starts"""
+    llm_tasks.configure_model(model_name, model_path, n_threads=n_threads)
+    if response_cache_file:
+        llm_tasks.configure_response_cache(LLMResponseReader(response_cache_file), model_version)
+    llm_tasks.get_model()
+
+
+class LLMWorkerPool:
+    """A pool of processes, each holding its own GPT4All model, that assess articles in parallel.
+
+    Jobs are the picklable dicts built for llm_tasks.run_assessment_job. Results are handed back
+    in submission order so the caller can write them to the cache and output deterministically.
+    """
+
+    def __init__(self, workers, threads_per_worker=None, model_name=llm_tasks.MODEL_NAME,
+                 model_path=llm_tasks.MODEL_PATH, response_cache=None):
+        self.workers = max(1, int(workers))
+        # Split the cores between the workers instead of letting every model grab all of them
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        # Spawned rather than forked: the pool is only created once an article needs the LLM,
+        # by which time the feed fetcher's threads are running
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            # Workers look repeated prompts up in the processing cache's llm_responses table
+            initargs=(model_name, model_path, self.threads_per_worker,
+                      str(response_cache.db_file) if response_cache is not None else None,
+                      response_cache.model_version if response_cache is not None else None),
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], response_cache=None) -> Optional["LLMWorkerPool"]:
+        """Build a pool from llm_workers / llm_threads_per_worker, or None when running inline.
+
+        response_cache is the SQLiteProcessingCache whose stored LLM responses the workers reuse.
+        """
+        workers = config.get("llm_workers", DEFAULT_LLM_WORKERS) or DEFAULT_LLM_WORKERS
+        if workers <= 1:
+            return None
+        return cls(workers, threads_per_worker=config.get("llm_threads_per_worker"), response_cache=response_cache)
+
+    def run(self, jobs: Iterable[Dict[str, Any]], deadline=None,
+            task=llm_tasks.run_assessment_job) -> Iterator[Optional[list]]:
+        """Run jobs across the pool, yielding each job's result in submission order.
+
+        task is the llm_tasks function each job is passed to (run_assessment_job or run_summary_job).
+
+        Once the deadline has passed, jobs that have not started are cancelled and yield None,
+        like jobs that see the deadline themselves. Jobs already running are allowed to finish.
+        """
+        futures = [self.executor.submit(task, job) for job in jobs]
+        for future in futures:
+            if deadline and time.time() > deadline:
+                for pending in futures:
+                    pending.cancel()
+            if future.cancelled():
+                yield None
+            else:
+                yield future.result()
+
+    def shutdown(self):
+        """Stop the workers, dropping any queued jobs"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
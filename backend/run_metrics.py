@@ -0,0 +1,132 @@
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+# GPT4All's Python API doesn't expose its tokenizer, so token counts are estimated from text length
+CHARS_PER_TOKEN = 4
+# cache_metadata key holding the last run's totals, which the next report is compared against
+PREVIOUS_REPORT_KEY = "last_run_report"
+
+
+def estimate_tokens(text) -> int:
+    """Approximate token count of a prompt or response"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0 if there are none)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = min(len(ordered), max(1, math.ceil(fraction * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Count, total and latency percentiles of a list of durations in seconds"""
+    return {
+        "count": len(samples),
+        "total_s": round(sum(samples), 3),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        "max_ms": round(max(samples, default=0.0) * 1000, 2)
+    }
+
+
+def _ratio(hits, misses):
+    """hits / (hits + misses), or None when there was nothing to count"""
+    return round(hits / (hits + misses), 4) if hits + misses else None
+
+
+class RunMetrics:
+    """Wall time, counts and latencies of each pipeline stage during one run.
+
+    Stages are timed with stage() (or add_sample() for durations measured elsewhere, such as in
+    the fetcher threads), events are tallied with count(), and LLM calls are added from the
+    per-call records llm_tasks keeps. report() turns it all into the JSON written after a run.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.samples: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.llm_calls: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of code as one sample of a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_sample(name, time.perf_counter() - start)
+
+    def add_sample(self, name, seconds):
+        """Record one duration (in seconds) for a stage"""
+        self.samples.setdefault(name, []).append(seconds)
+
+    def count(self, name, amount=1):
+        """Add to a counter"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_llm_calls(self, calls: Iterable[Dict[str, Any]]):
+        """Add llm_tasks call records ({"type", "seconds", "prompt_tokens", "response_tokens", "cached", "key"})"""
+        for call in calls:
+            if call["type"] == "model_load":
+                self.add_sample("model_load", call["seconds"])
+                continue
+            if call["cached"]:
+                self.count("llm_response_cache_hits")
+                continue
+            if call["key"]:
+                self.count("llm_response_cache_misses")
+            stats = self.llm_calls.setdefault(call["type"], {"seconds": [], "prompt_tokens": 0, "response_tokens": 0})
+            stats["seconds"].append(call["seconds"])
+            stats["prompt_tokens"] += call["prompt_tokens"]
+            stats["response_tokens"] += call["response_tokens"]
+
+    def report(self, cache_stats: Optional[Dict[str, Any]] = None, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """The run report: per-stage timings, LLM calls, counters and cache hit ratios"""
+        counters = self.counters
+        llm_calls = {}
+        for call_type, stats in sorted(self.llm_calls.items()):
+            llm_calls[call_type] = summarize(stats["seconds"])
+            llm_calls[call_type].update(prompt_tokens=stats["prompt_tokens"], response_tokens=stats["response_tokens"])
+        report = {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_time_s": round(time.perf_counter() - self.start, 3),
+            "stages": {name: summarize(samples) for name, samples in sorted(self.samples.items())},
+            "llm_calls": llm_calls,
+            "llm_tokens_estimated_at_chars_per_token": CHARS_PER_TOKEN,
+            "counters": dict(sorted(counters.items())),
+            "hit_ratios": {
+                "article_cache": _ratio(counters.get("cache_hits", 0), counters.get("cache_misses", 0)),
+                "feed_not_modified": _ratio(counters.get("feeds_not_modified", 0), counters.get("feeds_parsed", 0)),
+                "llm_response_cache": _ratio(counters.get("llm_response_cache_hits", 0),
+                                             counters.get("llm_response_cache_misses", 0))
+            }
+        }
+        if cache_stats is not None:
+            report["cache"] = cache_stats
+        if previous:
+            # Totals of the last run, to spot regressions without digging up its report
+            report["previous_run"] = {
+                "started_at": previous.get("started_at"),
+                "wall_time_s": previous.get("wall_time_s"),
+                "stage_total_s": {name: stats["total_s"] for name, stats in previous.get("stages", {}).items()}
+            }
+        return report
+
+    def write(self, path: Path, report: Dict[str, Any]):
+        """Write a report as indented JSON, replacing the file atomically"""
+        path = Path(path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        os.replace(tmp_path, path)
@@ -0,0 +1,126 @@
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from llm_tasks import JobEntry, estimate_llm_calls
+
+DEFAULT_SECONDS_PER_CALL = 20.0  # First guess for one LLM generation on a CPU runner, refined after every run
+ESTIMATE_SMOOTHING = 0.5         # Weight of the latest run's measurement in the stored estimate
+ESTIMATE_KEY = "llm_seconds_per_call"
+
+
+def keyword_strength(candidates) -> int:
+    """Keyword hits of an entry across its candidate topics (a keyword in title and summary counts twice)"""
+    return sum(
+        len(match.get("found_in", [])) if isinstance(match, dict) else len(match)
+        for _, _, _, keyword_matches, _, _ in candidates
+        for match in keyword_matches.values()
+    )
+
+
+def _priority(item):
+    """Newest first, then strongest keyword match"""
+    return (-item["published_ts"], -item["strength"])
+
+
+class AssessmentScheduler:
+    """Decides which articles get the LLM when a run can't assess all of them.
+
+    Jobs from every feed are collected before any is run. They are then ordered round-robin
+    across feeds, each feed's jobs newest first and then by keyword-hit strength, so no feed
+    starves because of where it sits in config.yaml. select() keeps as many as the estimated
+    LLM cost fits in the remaining time; the rest are persisted in the cache's llm_queue and
+    planned again at the start of the next run.
+    """
+
+    def __init__(self, cache, workers=1):
+        self.cache = cache
+        self.workers = max(1, int(workers))
+        stored = cache.get_metadata(ESTIMATE_KEY)
+        self.seconds_per_call = float(stored) if stored else DEFAULT_SECONDS_PER_CALL
+        self.items: List[Dict[str, Any]] = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, url, entry, job, cached_fallback=None, queued_at=None):
+        """Queue one entry's assessment job (see llm_tasks.run_assessment_job)"""
+        self.items.append({
+            "url": url,
+            "entry": entry,
+            "job": job,
+            "cached_fallback": cached_fallback,
+            "key": self.cache._get_article_key(entry),
+            "published_ts": job["entry"].get("published_ts") or 0,
+            "strength": keyword_strength(job["candidates"]),
+            "calls": estimate_llm_calls(job),
+            "queued_at": queued_at
+        })
+
+    def estimate(self, items) -> float:
+        """Estimated wall time in seconds for a list of jobs across the workers"""
+        return sum(item["calls"] for item in items) * self.seconds_per_call / self.workers
+
+    def ordered(self) -> List[Dict[str, Any]]:
+        """All queued jobs, round-robin across feeds in priority order"""
+        by_feed = {}
+        for item in self.items:
+            by_feed.setdefault(item["url"], []).append(item)
+        for items in by_feed.values():
+            items.sort(key=_priority)
+
+        ordered = []
+        rounds = max((len(items) for items in by_feed.values()), default=0)
+        for position in range(rounds):
+            # Each round takes the next job of every feed, best first
+            ordered.extend(sorted(
+                (items[position] for items in by_feed.values() if position < len(items)), key=_priority
+            ))
+        return ordered
+
+    def select(self, budget: Optional[float] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split the ordered jobs into those that fit in budget seconds (all of them if None) and the rest"""
+        ordered = self.ordered()
+        if budget is None:
+            return ordered, []
+        capacity = max(0.0, budget) * self.workers
+        selected, deferred = [], []
+        for item in ordered:
+            cost = item["calls"] * self.seconds_per_call
+            if cost <= capacity:
+                selected.append(item)
+                capacity -= cost
+            else:
+                # A cheaper job further down may still fit
+                deferred.append(item)
+        return selected, deferred
+
+    def record(self, calls, elapsed, load_seconds=0.0):
+        """Refine the per-call estimate from a run's measured LLM wall time.
+
+        load_seconds is the time spent loading the model (summed over the workers) within elapsed,
+        which a run that already has the model loaded doesn't pay per call.
+        """
+        busy = elapsed * self.workers - load_seconds
+        if calls <= 0 or busy <= 0:
+            return
+        measured = busy / calls
+        self.seconds_per_call = (1 - ESTIMATE_SMOOTHING) * self.seconds_per_call + ESTIMATE_SMOOTHING * measured
+
+    def load_queue(self) -> List[Tuple[str, JobEntry, Any]]:
+        """Entries left over by the previous run as (feed url, entry, queued_at), oldest first"""
+        queued = []
+        for url, entry_json, queued_at in self.cache.get_llm_queue():
+            try:
+                queued.append((url, JobEntry(json.loads(entry_json)), queued_at))
+            except (ValueError, TypeError):
+                continue
+        return queued
+
+    def save(self, deferred):
+        """Persist the jobs this run didn't get to and the refined cost estimate"""
+        self.cache.set_metadata(ESTIMATE_KEY, f"{self.seconds_per_call:.2f}")
+        self.cache.replace_llm_queue([
+            (item["key"], item["url"], json.dumps(item["job"]["entry"], default=list), item["queued_at"] or datetime.now())
+            for item in deferred
+        ])
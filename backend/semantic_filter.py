@@ -0,0 +1,83 @@
+import re
+from typing import Dict, Any, Iterable
+
+import numpy as np
+from gpt4all import Embed4All
+
+from entry_record import entry_record
+
+# --- Defaults (overridable from config.yaml semantic_prefilter) ---
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2.gguf2.f16.gguf"
+DEFAULT_REJECT_BELOW = 0.20   # Cosine similarity under which a keyword match is treated as a false positive
+DEFAULT_ACCEPT_ABOVE = 0.60   # Cosine similarity over which classification is skipped
+MAX_EMBED_CHARS = 1000        # Title + summary text is truncated to this before embedding
+
+
+def _embedding_text(entry):
+    """Plain text of an entry's title and summary, as sent to the embedding model"""
+    text = f"{entry.title or ''}. {entry_record(entry)['summary_text']}"
+    return re.sub(r'\s+', ' ', text).strip()[:MAX_EMBED_CHARS]
+
+
+class SemanticPrefilter:
+    """Stage 1.5: cosine similarity between an article and its keyword-matched topics.
+
+    Topic vectors (description + user_interest) are embedded once per topic config and
+    article vectors once per article; both are persisted in the processing cache.
+    """
+
+    def __init__(self, cache, topics: Dict[str, Dict[str, Any]], topic_hashes: Dict[str, str],
+                 model_name=DEFAULT_EMBEDDING_MODEL, reject_below=DEFAULT_REJECT_BELOW,
+                 accept_above=DEFAULT_ACCEPT_ABOVE):
+        self.cache = cache
+        self.model_name = model_name
+        self.reject_below = reject_below
+        self.accept_above = accept_above
+        self.embedder = Embed4All(model_name=model_name)
+
+        self.topic_names = list(topics.keys())
+        self.topic_index = {topic_name: i for i, topic_name in enumerate(self.topic_names)}
+        vectors = []
+        for topic_name in self.topic_names:
+            topic_config = topics[topic_name]
+            text = f"{topic_config.get('description', '')} {topic_config.get('user_interest', '')}".strip()
+            vectors.append(self._get_vector(f"topic:{topic_hashes[topic_name]}", text))
+        # Rows are unit length, so a matrix-vector product gives every cosine similarity at once
+        self.topic_matrix = np.vstack(vectors)
+
+    @classmethod
+    def from_config(cls, cache, topics, topic_hashes, settings: Dict[str, Any]) -> "SemanticPrefilter":
+        """Build a prefilter from the semantic_prefilter section of config.yaml"""
+        return cls(
+            cache, topics, topic_hashes,
+            model_name=settings.get("model", DEFAULT_EMBEDDING_MODEL),
+            reject_below=settings.get("reject_below", DEFAULT_REJECT_BELOW),
+            accept_above=settings.get("accept_above", DEFAULT_ACCEPT_ABOVE),
+        )
+
+    def _get_vector(self, key, text):
+        """Load a normalised embedding from the cache, computing and storing it on a miss"""
+        blob = self.cache.get_embedding(key, self.model_name)
+        if blob is not None:
+            return np.frombuffer(blob, dtype=np.float32)
+        vector = np.asarray(self.embedder.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        self.cache.store_embedding(key, self.model_name, vector.tobytes())
+        return vector
+
+    def similarities(self, entry, topic_names: Iterable[str]) -> Dict[str, float]:
+        """Cosine similarity between an entry and each of the given topics"""
+        article_key = self.cache._get_article_key(entry)
+        vector = self._get_vector(f"article:{article_key}", _embedding_text(entry))
+        scores = self.topic_matrix @ vector
+        return {topic_name: float(scores[self.topic_index[topic_name]]) for topic_name in topic_names}
+
+    def classify(self, similarity) -> str:
+        """Bucket a similarity into "reject", "accept" or "uncertain" (needs the LLM)"""
+        if similarity < self.reject_below:
+            return "reject"
+        if similarity >= self.accept_above:
+            return "accept"
+        return "uncertain"
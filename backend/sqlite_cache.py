@@ -1,204 +1,974 @@
+import atexit
 import sqlite3
 import hashlib
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Iterable
+
+from topic_writer import published_epoch, article_timestamp
+from entry_record import entry_record
+from llm_tasks import PROMPT_VERSIONS, MODEL_NAME, MODEL_REVISION
+
+# Bump when the table layout changes and add a matching _migrate_to_v<N> method
+SCHEMA_VERSION = 5
+
+# cache_metadata flag, set once the last script-hash generation of results has moved to the stage versions
+ADOPTED_KEY = "stage_versions_adopted"
+
+# cache_metadata counter behind article_cache.updated_seq (see _next_change_seq)
+CHANGE_SEQ_KEY = "article_cache_seq"
+
+# Writes are committed in batches of this many rows (and on flush()/close())
+WRITE_BATCH_SIZE = 500
+
+# Keep IN (...) lists comfortably under SQLite's bound-parameter limit
+PREFETCH_CHUNK_SIZE = 500
+
+# LLM responses kept by default; the least recently used beyond this are evicted after a run
+LLM_RESPONSE_CACHE_ENTRIES = 20000
+
+# article_data fields kept in their own article_cache columns, and the bulky ones kept in article_html;
+# everything else goes into details_json
+COLUMN_FIELDS = (
+    "title", "link", "summary", "from_feed", "matched_keywords", "ai_reasoning", "relevance_percent", "published_ts"
+)
+HTML_FIELDS = ("summary_html", "summary_original")
+
+# What a cached result is rebuilt from (see _result_from_row). The HTML is only joined in
+# when there is no summary to show instead, which is the only time the frontend uses it.
+RESULT_COLUMNS = '''
+    c.topic, c.topic_hash, c.title, c.link, c.summary, c.relevance_percent, c.ai_reasoning,
+    c.matched_keywords, c.from_feed, c.published_at, c.details_json,
+    CASE WHEN c.summary IS NULL OR c.summary IN ('', '-') THEN h.summary_html END
+'''
+RESULT_TABLES = 'article_cache c LEFT JOIN article_html h ON h.article_key = c.article_key'
+
+def details_json(article_data: Dict[str, Any]) -> str:
+    """The article_data fields without a column of their own, as JSON.
+    
+    keyword_matches is reduced to where each keyword was found: its title/summary
+    text is a copy of fields stored once already.
+    """
+    details = {key: value for key, value in article_data.items() if key not in COLUMN_FIELDS + HTML_FIELDS}
+    if details.get("keyword_matches"):
+        details["keyword_matches"] = {
+            keyword: match.get("found_in", []) if isinstance(match, dict) else match
+            for keyword, match in details["keyword_matches"].items()
+        }
+    return json.dumps(details)
+
+def _result_from_row(row) -> Optional[Dict[str, Any]]:
+    """Rebuild a cached result ({topic, topic_hash, article_data, ...}) from RESULT_COLUMNS"""
+    (topic, topic_hash, title, link, summary, relevance_percent, ai_reasoning,
+     matched_keywords, from_feed, published_at, details, summary_html) = row
+    try:
+        article_data = json.loads(details) if details else {}
+        matched_keywords = json.loads(matched_keywords) if matched_keywords else []
+    except json.JSONDecodeError:
+        return None
+    article_data.update(
+        title=title, link=link, summary=summary, from_feed=from_feed, matched_keywords=matched_keywords,
+        ai_reasoning=ai_reasoning, relevance_percent=relevance_percent, published_ts=published_at or 0
+    )
+    if summary_html:
+        article_data["summary_html"] = summary_html
+    return {
+        "topic": topic,
+        "topic_hash": topic_hash,
+        "article_data": article_data,
+        "keywords_matched": matched_keywords,
+        "ai_reasoning": ai_reasoning
+    }
 
 class SQLiteProcessingCache:
-    def __init__(self, db_file="processing_cache.db"):
+    def __init__(self, db_file="processing_cache.db", write_batch_size=WRITE_BATCH_SIZE, model_revision=MODEL_REVISION):
         self.db_file = Path(Path(__file__).parent, db_file)
-        self.script_version = self._get_script_version()
+        self.write_batch_size = write_batch_size
+        self._pending_writes = 0
+        # Results loaded by prefetch(): (article_key, topic, topic_hash) -> (verdict, result_json)
+        self._prefetched = {}
+        self._prefetched_keys = set()
+        self._prefetched_history = {}
+        self._prefetched_stale = {}
+        self.conn = self._connect()
         self._init_database()
+        # The model is identified by its name and configured revision, never by reading the file, so
+        # opening the cache (exports, fully cached runs) doesn't touch the multi-GB model
+        self.model_revision = str(model_revision)
+        self.model_version = f"{MODEL_NAME}@{self.model_revision}"
+        # LLM stage -> version. Rows are keyed on the classifier's (which also covers keyword and
+        # rejection verdicts) and record the relevance and summary versions in their own columns
+        previous_versions = json.loads(self.get_metadata("stage_versions") or "{}")
+        self.stage_versions = self._get_stage_versions()
+        self.pipeline_version = self.stage_versions["classifier"]
+        self._adopt_script_version_results()
+        self._adopt_model_hash_versions(previous_versions)
+        atexit.register(self.close)
     
-    def _init_database(self):
-        """Initialize the SQLite database with required tables"""
+    def _connect(self):
+        """Open the long-lived connection used for the lifetime of the cache"""
         conn = sqlite3.connect(self.db_file)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')     # Safe with WAL, fsyncs only at checkpoints
+        conn.execute('PRAGMA cache_size=-65536')      # 64 MB page cache
+        conn.execute('PRAGMA mmap_size=268435456')    # Memory-map up to 256 MB of the database
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    def close(self):
+        """Commit pending writes and fold the WAL back into the database file.
+        
+        The database is committed to git by the workflow, so it must be self-contained on disk.
+        """
+        if self.conn is None:
+            return
+        self.conn.commit()
+        try:
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.conn.execute('PRAGMA journal_mode=DELETE')
+        except sqlite3.OperationalError:
+            # Another connection is still open; the last one to close checkpoints the WAL
+            pass
+        self.conn.close()
+        self.conn = None
+    
+    def flush(self):
+        """Commit any batched writes"""
+        if self._pending_writes:
+            self.conn.commit()
+            self._pending_writes = 0
+    
+    def _record_write(self):
+        """Count a write and commit once a full batch has accumulated"""
+        self._pending_writes += 1
+        if self._pending_writes >= self.write_batch_size:
+            self.flush()
+    
+    def _init_database(self):
+        """Initialize the SQLite database, migrating older layouts to SCHEMA_VERSION"""
+        conn = self.conn
         cursor = conn.cursor()
         
-        # Create articles cache table
+        # Create metadata table for schema and stage versions and stats
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache_metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                updated_at TIMESTAMP
+            )
+        ''')
+        
+        schema_version = self._get_schema_version(cursor)
+        if schema_version < SCHEMA_VERSION:
+            # Run all migration steps in one transaction so a failure leaves the old layout intact
+            cursor.execute('BEGIN')
+        for version in range(schema_version + 1, SCHEMA_VERSION + 1):
+            print(f"Migrating processing cache schema to v{version}...")
+            getattr(self, f"_migrate_to_v{version}")(cursor)
+        
+        self._create_tables(cursor)
+        cursor.execute('''
+            INSERT OR REPLACE INTO cache_metadata (key, value, updated_at) VALUES ('schema_version', ?, ?)
+        ''', (str(SCHEMA_VERSION), datetime.now()))
+        cursor.execute('''
+            INSERT OR IGNORE INTO cache_metadata (key, value, updated_at)
+            SELECT ?, COALESCE(MAX(updated_seq), 0), ? FROM article_cache
+        ''', (CHANGE_SEQ_KEY, datetime.now()))
+        
+        conn.commit()
+    
+    def _get_schema_version(self, cursor) -> int:
+        """Read the stored schema version (databases from before versioning count as v1)"""
+        cursor.execute("SELECT value FROM cache_metadata WHERE key = 'schema_version'")
+        row = cursor.fetchone()
+        if row:
+            return int(row[0])
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'article_cache'")
+        # A brand new database has nothing to migrate
+        return 1 if cursor.fetchone() else SCHEMA_VERSION
+    
+    def _create_tables(self, cursor):
+        """Create the current (SCHEMA_VERSION) tables and indexes if they do not exist"""
+        # Create articles cache table, one row per article per topic config per pipeline version.
+        # Fields that are sorted, filtered or shown get typed columns; the rest is in details_json
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS article_cache (
-                article_key TEXT PRIMARY KEY,
+                article_key TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                topic_hash TEXT NOT NULL,
+                pipeline_version TEXT NOT NULL,
                 title TEXT,
                 link TEXT,
-                script_version TEXT,
                 processed_at TIMESTAMP,
-                result_json TEXT,
-                topic TEXT,
+                published_at INTEGER,
+                relevance_percent INTEGER,
+                verdict TEXT,
+                summary TEXT,
+                ai_reasoning TEXT,
                 matched_keywords TEXT,
-                from_feed TEXT
+                from_feed TEXT,
+                details_json TEXT,
+                relevance_version TEXT,
+                summary_version TEXT,
+                updated_seq INTEGER,
+                PRIMARY KEY (article_key, topic, topic_hash, pipeline_version)
             )
         ''')
         
-        # Create metadata table for script versions and stats
+        # Create HTML table for the original summaries, stored once per article rather than per topic
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cache_metadata (
-                key TEXT PRIMARY KEY,
-                value TEXT,
+            CREATE TABLE IF NOT EXISTS article_html (
+                article_key TEXT PRIMARY KEY,
+                summary_html TEXT,
+                summary_original TEXT,
                 updated_at TIMESTAMP
             )
         ''')
         
-        # Create index for faster lookups
+        # Create verdict table so rejected articles are not re-sent to the LLM
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_verdicts (
+                article_key TEXT,
+                topic TEXT,
+                topic_hash TEXT,
+                pipeline_version TEXT,
+                verdict TEXT,
+                reason TEXT,
+                processed_at TIMESTAMP,
+                PRIMARY KEY (article_key, topic, topic_hash, pipeline_version)
+            )
+        ''')
+        
+        # Create feed cache table for conditional GET validators
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_script_version 
-            ON article_cache(script_version)
+            CREATE TABLE IF NOT EXISTS feed_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT,
+                state_hash TEXT,
+                fetched_at TIMESTAMP
+            )
         ''')
         
+        # Create embedding table for the optional semantic prefilter (article and topic vectors)
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_processed_at 
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT,
+                model TEXT,
+                vector BLOB,
+                created_at TIMESTAMP,
+                PRIMARY KEY (key, model)
+            )
+        ''')
+        
+        # Create queue table for LLM work a time-limited run didn't get to (see scheduler.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_queue (
+                article_key TEXT PRIMARY KEY,
+                feed_url TEXT,
+                entry_json TEXT,
+                queued_at TIMESTAMP
+            )
+        ''')
+        
+        # Create identity table mapping syndicated copies onto the first copy's key (see article_identity.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS article_identity (
+                article_key TEXT PRIMARY KEY,
+                canonical_key TEXT NOT NULL,
+                url_key TEXT,
+                minhash BLOB,
+                from_feed TEXT,
+                created_at TIMESTAMP
+            )
+        ''')
+        
+        # Create response table answering prompts the LLM has seen before (see llm_tasks.generate)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                prompt_key TEXT PRIMARY KEY,
+                call_type TEXT,
+                response TEXT,
+                created_at TIMESTAMP,
+                last_used_at TIMESTAMP
+            )
+        ''')
+        
+        # Per-article lookups are served by the primary keys; these cover the bulk queries
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_cache_version_topic 
+            ON article_cache(pipeline_version, topic, topic_hash, published_at)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_cache_feed 
+            ON article_cache(from_feed, pipeline_version, topic, topic_hash)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_cache_processed_at 
             ON article_cache(processed_at)
         ''')
         
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_topic 
-            ON article_cache(topic)
+            CREATE INDEX IF NOT EXISTS idx_article_cache_topic_seq 
+            ON article_cache(pipeline_version, topic, topic_hash, updated_seq)
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_verdicts_processed_at 
+            ON article_verdicts(processed_at)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_embeddings_created_at 
+            ON embeddings(created_at)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_article_identity_created_at 
+            ON article_identity(created_at)
+        ''')
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used_at 
+            ON llm_responses(last_used_at)
+        ''')
     
-    def _get_script_version(self):
-        """Generate a version hash based on the main script content"""
-        script_path = Path(Path(__file__).parent, "generate_news_digest.py")
-        try:
-            with open(script_path, 'r') as f:
-                content = f.read()
-            
-            # Include key parts that affect processing logic
-            # Remove comments and whitespace to focus on actual logic
-            import re
-            # Remove comments
-            content = re.sub(r'#.*', '', content)
-            # Remove extra whitespace
-            content = re.sub(r'\s+', ' ', content).strip()
-            
-            return hashlib.md5(content.encode()).hexdigest()[:12]
-        except FileNotFoundError:
-            return "unknown"
+    def _migrate_to_v2(self, cursor):
+        """v1 keyed article_cache on article_key alone, so per-topic results overwrote each other"""
+        cursor.execute("PRAGMA table_info(article_verdicts)")
+        if "script_version" in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE article_verdicts RENAME COLUMN script_version TO pipeline_version')
+        
+        for index_name in ("idx_script_version", "idx_processed_at", "idx_topic", "idx_from_feed"):
+            cursor.execute(f'DROP INDEX IF EXISTS {index_name}')
+        cursor.execute('ALTER TABLE article_cache RENAME TO article_cache_v1')
+        # The v2 layout; _migrate_to_v3 moves it to the current one
+        cursor.execute('''
+            CREATE TABLE article_cache (
+                article_key TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                topic_hash TEXT NOT NULL,
+                pipeline_version TEXT NOT NULL,
+                title TEXT,
+                link TEXT,
+                processed_at TIMESTAMP,
+                result_json TEXT,
+                matched_keywords TEXT,
+                from_feed TEXT,
+                PRIMARY KEY (article_key, topic, topic_hash, pipeline_version)
+            )
+        ''')
+        
+        # topic_hash was only ever stored inside result_json
+        cursor.execute('''
+            INSERT OR REPLACE INTO article_cache 
+            (article_key, topic, topic_hash, pipeline_version, title, link, processed_at, result_json, matched_keywords, from_feed)
+            SELECT article_key, topic,
+                   COALESCE(CASE WHEN json_valid(result_json) THEN json_extract(result_json, '$.topic_hash') END, ''),
+                   script_version, title, link, processed_at, result_json, matched_keywords, from_feed
+            FROM article_cache_v1
+            WHERE topic IS NOT NULL AND topic != '' AND script_version IS NOT NULL
+        ''')
+        cursor.execute('DROP TABLE article_cache_v1')
+    
+    def _migrate_to_v3(self, cursor):
+        """v2 stored each result as one result_json blob, with the HTML summary and keyword context inside"""
+        self.conn.create_function("published_epoch", 1, lambda value: published_epoch(json.loads(value)) if value else None)
+        self.conn.create_function("details_json", 1, lambda value: details_json(json.loads(value)) if value else None)
+        
+        for index_name in ("idx_article_cache_version_topic", "idx_article_cache_feed", "idx_article_cache_processed_at"):
+            cursor.execute(f'DROP INDEX IF EXISTS {index_name}')
+        cursor.execute('ALTER TABLE article_cache RENAME TO article_cache_v2')
+        self._create_tables(cursor)
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO article_html (article_key, summary_html, summary_original, updated_at)
+            SELECT article_key, json_extract(result_json, '$.article_data.summary_html'),
+                   json_extract(result_json, '$.article_data.summary_original'), MAX(processed_at)
+            FROM article_cache_v2
+            WHERE json_valid(result_json)
+            GROUP BY article_key
+            -- Like mark_article_processed, only articles that have HTML get a row
+            HAVING MAX(NULLIF(json_extract(result_json, '$.article_data.summary_html'), '')) IS NOT NULL
+                OR MAX(NULLIF(json_extract(result_json, '$.article_data.summary_original'), '')) IS NOT NULL
+        ''')
+        cursor.execute('''
+            INSERT OR REPLACE INTO article_cache 
+            (article_key, topic, topic_hash, pipeline_version, title, link, processed_at, published_at,
+             relevance_percent, verdict, summary, ai_reasoning, matched_keywords, from_feed, details_json)
+            SELECT article_key, topic, topic_hash, pipeline_version, title, link, processed_at,
+                   published_epoch(json_extract(result_json, '$.article_data.published_parsed')),
+                   json_extract(result_json, '$.article_data.relevance_percent'),
+                   'accepted',
+                   json_extract(result_json, '$.article_data.summary'),
+                   COALESCE(json_extract(result_json, '$.ai_reasoning'), json_extract(result_json, '$.article_data.ai_reasoning')),
+                   matched_keywords, from_feed,
+                   details_json(json_extract(result_json, '$.article_data'))
+            FROM article_cache_v2
+            WHERE json_valid(result_json)
+        ''')
+        cursor.execute('DROP TABLE article_cache_v2')
+    
+    def _migrate_to_v4(self, cursor):
+        """v3 had no record of the relevance and summary prompt versions behind a result"""
+        cursor.execute('PRAGMA table_info(article_cache)')
+        columns = [row[1] for row in cursor.fetchall()]
+        # Databases coming through _migrate_to_v3 already have the current layout
+        for column in ("relevance_version", "summary_version"):
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE article_cache ADD COLUMN {column} TEXT')
+    
+    def _migrate_to_v5(self, cursor):
+        """v4 had no change number, so the incremental export followed rowids, which in-place updates keep"""
+        cursor.execute('PRAGMA table_info(article_cache)')
+        if "updated_seq" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE article_cache ADD COLUMN updated_seq INTEGER')
+        # Rows are numbered in the order they were last inserted; the counter continues from there
+        cursor.execute('UPDATE article_cache SET updated_seq = rowid WHERE updated_seq IS NULL')
+    
+    def _get_stage_versions(self) -> Dict[str, str]:
+        """A version hash per LLM stage, from its prompt version (llm_tasks.PROMPT_VERSIONS) and the model"""
+        model_version = self.model_version
+        stage_versions = {
+            stage: hashlib.md5(f"{stage}:{prompt_version}:{model_version}".encode()).hexdigest()[:12]
+            for stage, prompt_version in PROMPT_VERSIONS.items()
+        }
+        # What the hashes stand for, for anyone inspecting the database
+        self.set_metadata("stage_versions", json.dumps({
+            "prompt_versions": PROMPT_VERSIONS, "model": model_version, "model_revision": self.model_revision,
+            "versions": stage_versions
+        }))
+        self.flush()
+        return stage_versions
+    
+    def _adopt_script_version_results(self):
+        """Carry the results of the last whole-script version over to the stage versions, once.
+        
+        Before stage versions, rows were keyed on a hash of the pipeline scripts. The most recently
+        written of those were produced by the current prompts, so they are moved to the current
+        versions instead of all going back to the LLM. Older generations are left to age out.
+        """
+        if self.get_metadata(ADOPTED_KEY):
+            return
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT pipeline_version FROM article_cache WHERE relevance_version IS NULL
+            GROUP BY pipeline_version ORDER BY MAX(processed_at) DESC LIMIT 1
+        ''')
+        row = cursor.fetchone()
+        if row is not None:
+            script_version = row[0]
+            print("Moving cached results to per-stage versions...")
+            cursor.execute('''
+                UPDATE OR REPLACE article_cache
+                SET pipeline_version = ?, relevance_version = ?,
+                    summary_version = CASE WHEN json_extract(details_json, '$.has_llm_summary') THEN ?
+                                           -- A "-" placeholder left by a failed summary prompt is stale, so it gets rewritten
+                                           WHEN json_extract(details_json, '$.has_placeholder_summary') THEN '' END
+                WHERE pipeline_version = ? AND relevance_version IS NULL
+            ''', (self.pipeline_version, self.stage_versions["relevance"], self.stage_versions["summary"], script_version))
+            cursor.execute('''
+                UPDATE OR REPLACE article_verdicts SET pipeline_version = ? WHERE pipeline_version = ?
+            ''', (self.pipeline_version, script_version))
+        self.set_metadata(ADOPTED_KEY, datetime.now().isoformat(timespec="seconds"))
+        self.flush()
+    
+    def _adopt_model_hash_versions(self, previous):
+        """Carry results keyed on the model file's hash over to the model revision, once.
+        
+        Stage versions used to combine the prompt versions with a sha256 of the model file. Results
+        of stages whose prompt version hasn't changed since are moved to the current versions
+        instead of going back to the LLM. previous is the stage_versions metadata before this open.
+        """
+        if not previous or previous.get("model_revision") or previous.get("model", "").split(":")[0] != MODEL_NAME:
+            return
+        old_versions = previous.get("versions", {})
+        renames = {
+            stage: old_versions[stage] for stage, prompt_version in previous.get("prompt_versions", {}).items()
+            if stage in old_versions and PROMPT_VERSIONS.get(stage) == prompt_version
+        }
+        if not renames:
+            return
+        print("Moving cached results from the model file hash to the model revision...")
+        cursor = self.conn.cursor()
+        for stage, column in (("classifier", "pipeline_version"), ("relevance", "relevance_version"),
+                              ("summary", "summary_version")):
+            if stage in renames:
+                cursor.execute(f'UPDATE OR REPLACE article_cache SET {column} = ? WHERE {column} = ?',
+                               (self.stage_versions[stage], renames[stage]))
+        if "classifier" in renames:
+            cursor.execute('UPDATE OR REPLACE article_verdicts SET pipeline_version = ? WHERE pipeline_version = ?',
+                           (self.pipeline_version, renames["classifier"]))
+        self.flush()
+    
+    def _next_change_seq(self) -> int:
+        """A new article_cache change number, higher than any handed out before (even to rows deleted since).
+        
+        Taken from the counter in cache_metadata in the writer's transaction, so it is committed
+        together with the row it numbers.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            UPDATE cache_metadata SET value = CAST(value AS INTEGER) + 1, updated_at = ? WHERE key = ?
+        ''', (datetime.now(), CHANGE_SEQ_KEY))
+        cursor.execute('SELECT value FROM cache_metadata WHERE key = ?', (CHANGE_SEQ_KEY,))
+        return int(cursor.fetchone()[0])
+    
+    def get_change_seq(self) -> int:
+        """The last article_cache change number handed out"""
+        return int(self.get_metadata(CHANGE_SEQ_KEY) or 0)
+    
+    def _stale_stages(self, relevance_version, summary_version) -> list:
+        """Stages of an accepted result that older prompts or another model produced ([] if it is current)"""
+        stale = []
+        if relevance_version != self.stage_versions["relevance"]:
+            stale.append("relevance")
+        # Without a summary version the summary is the feed's own, which no prompt touched
+        if summary_version is not None and summary_version != self.stage_versions["summary"]:
+            stale.append("summary")
+        return stale
     
     def _get_article_key(self, entry):
-        """Generate unique key for an article"""
-        title = getattr(entry, 'title', '') or ''
-        link = getattr(entry, 'link', '') or ''
-        return hashlib.md5(f"{title}|{link}".encode()).hexdigest()
+        """Generate unique key for an article (the first copy's key once ArticleIdentity has resolved it)"""
+        if entry.get("article_key"):
+            return entry["article_key"]
+        return entry_record(entry)["article_key"]
+    
+    def prefetch(self, entries: Iterable, topic_hashes: Dict[str, str]):
+        """Load every cached verdict for a batch of entries (typically one feed) in a few IN (...) queries.
+        
+        Afterwards should_process_article/get_cached_result answer from memory for these entries.
+        Each call replaces the previous prefetch so memory stays bounded to one batch.
+        """
+        self._prefetched = {}
+        self._prefetched_keys = set()
+        self._prefetched_history = {}
+        self._prefetched_stale = {}
+        article_keys = list({self._get_article_key(entry) for entry in entries})
+        cursor = self.conn.cursor()
+        for i in range(0, len(article_keys), PREFETCH_CHUNK_SIZE):
+            chunk = article_keys[i:i + PREFETCH_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            cursor.execute(f'''
+                SELECT article_key, topic, topic_hash, pipeline_version, verdict FROM article_verdicts 
+                WHERE article_key IN ({placeholders})
+                UNION ALL
+                SELECT article_key, topic, topic_hash, pipeline_version, NULL FROM article_cache 
+                WHERE article_key IN ({placeholders})
+            ''', [*chunk, *chunk])
+            for article_key, topic, topic_hash, pipeline_version, verdict in cursor.fetchall():
+                current = pipeline_version == self.pipeline_version
+                if verdict is not None and current and topic_hashes.get(topic) == topic_hash:
+                    self._prefetched[(article_key, topic, topic_hash)] = (verdict, None)
+                # Remember which topics have rows, and under which classifier, so cache misses report the right reason
+                self._prefetched_history.setdefault(article_key, set()).add((topic, current))
+            cursor.execute(f'''
+                SELECT c.article_key, c.relevance_version, c.summary_version, {RESULT_COLUMNS} FROM {RESULT_TABLES} 
+                WHERE c.pipeline_version = ? AND c.article_key IN ({placeholders})
+            ''', [self.pipeline_version, *chunk])
+            for article_key, relevance_version, summary_version, *row in cursor.fetchall():
+                topic, topic_hash = row[0], row[1]
+                if topic_hashes.get(topic) == topic_hash:
+                    self._prefetched[(article_key, topic, topic_hash)] = ("accepted", row)
+                    stale = self._stale_stages(relevance_version, summary_version)
+                    if stale:
+                        self._prefetched_stale[(article_key, topic, topic_hash)] = stale
+            self._prefetched_keys.update(chunk)
+    
+    def _prefetched_miss_reason(self, article_key, topic) -> str:
+        """Reason for a cache miss, worked out from prefetched row history"""
+        history = self._prefetched_history.get(article_key, set())
+        if (topic, True) in history:
+            return "topic_updated"
+        if (topic, False) in history:
+            return "classifier_updated"
+        # Cached for other topics only, e.g. first_match stopped at an earlier topic or this one is new
+        return "not_evaluated" if history else "new_article"
     
     def should_process_article(self, entry, topic=None, topic_hash=None) -> Tuple[bool, str]:
-        """Check if article needs processing for a given topic and topic_hash (for per-topic cache)"""
+        """Check if article needs processing for a given topic and topic_hash (for per-topic cache).
+        
+        An accepted result whose relevance score or summary came from an older prompt or model
+        is reported as (True, "stages_updated"); stale_stages() says which stages to redo.
+        """
         article_key = self._get_article_key(entry)
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        if topic is not None and topic_hash is not None and article_key in self._prefetched_keys:
+            cached = self._prefetched.get((article_key, topic, topic_hash))
+            if cached is None:
+                return True, self._prefetched_miss_reason(article_key, topic)
+            if cached[0] == "accepted":
+                if (article_key, topic, topic_hash) in self._prefetched_stale:
+                    return True, "stages_updated"
+                return False, "already_processed"
+            return False, f"cached_{cached[0]}"
+        
+        cursor = self.conn.cursor()
         if topic is not None and topic_hash is not None:
-            # Per-topic+hash cache (future-proof, not used in current schema)
+            # A recorded rejection for this exact topic config means there is nothing to redo
             cursor.execute('''
-                SELECT script_version FROM article_cache 
-                WHERE article_key = ? AND topic = ? AND script_version = ?
-            ''', (article_key, topic, self.script_version))
+                SELECT verdict FROM article_verdicts 
+                WHERE article_key = ? AND topic = ? AND topic_hash = ? AND pipeline_version = ?
+            ''', (article_key, topic, topic_hash, self.pipeline_version))
+            verdict = cursor.fetchone()
+            if verdict is not None:
+                return False, f"cached_{verdict[0]}"
+            cursor.execute('''
+                SELECT relevance_version, summary_version FROM article_cache 
+                WHERE article_key = ? AND topic = ? AND topic_hash = ? AND pipeline_version = ?
+            ''', (article_key, topic, topic_hash, self.pipeline_version))
         else:
             cursor.execute('''
-                SELECT script_version FROM article_cache 
-                WHERE article_key = ? AND script_version = ?
-            ''', (article_key, self.script_version))
-        result = cursor.fetchone()
-        conn.close()
-        if result is None:
-            # Check if article exists but with old version
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            cursor.execute('SELECT script_version FROM article_cache WHERE article_key = ?', (article_key,))
-            old_result = cursor.fetchone()
-            conn.close()
-            if old_result:
-                return True, "script_updated"
-            else:
-                return True, "new_article"
-        return False, "already_processed"
+                SELECT relevance_version, summary_version FROM article_cache 
+                WHERE article_key = ? AND pipeline_version = ?
+            ''', (article_key, self.pipeline_version))
+        row = cursor.fetchone()
+        if row is not None:
+            if topic is not None and self._stale_stages(*row):
+                return True, "stages_updated"
+            return False, "already_processed"
+        
+        # Work out why it is a miss: a different topic config, an older classifier, a topic the
+        # article was never evaluated for, or brand new
+        if topic is not None:
+            cursor.execute('''
+                SELECT pipeline_version = ? FROM article_cache WHERE article_key = ? AND topic = ?
+                UNION
+                SELECT pipeline_version = ? FROM article_verdicts WHERE article_key = ? AND topic = ?
+            ''', (self.pipeline_version, article_key, topic, self.pipeline_version, article_key, topic))
+            is_current = {row[0] for row in cursor.fetchall()}
+            if 1 in is_current:
+                return True, "topic_updated"
+            if is_current:
+                return True, "classifier_updated"
+        cursor.execute('''
+            SELECT 1 FROM article_cache WHERE article_key = ?
+            UNION ALL
+            SELECT 1 FROM article_verdicts WHERE article_key = ? LIMIT 1
+        ''', (article_key, article_key))
+        if cursor.fetchone():
+            return True, "not_evaluated" if topic is not None else "classifier_updated"
+        return True, "new_article"
+    
+    def stale_stages(self, entry, topic: str, topic_hash: str) -> list:
+        """The LLM stages ("relevance", "summary") of a cached accepted result that need redoing"""
+        article_key = self._get_article_key(entry)
+        if article_key in self._prefetched_keys:
+            return self._prefetched_stale.get((article_key, topic, topic_hash), [])
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT relevance_version, summary_version FROM article_cache 
+            WHERE article_key = ? AND topic = ? AND topic_hash = ? AND pipeline_version = ?
+        ''', (article_key, topic, topic_hash, self.pipeline_version))
+        row = cursor.fetchone()
+        return self._stale_stages(*row) if row else []
+    
+    def mark_article_rejected(self, entry, topic: str, topic_hash: str, verdict: str, reason: str = None):
+        """Record a negative verdict (e.g. "no_keywords" or "rejected") for a topic and topic_hash"""
+        article_key = self._get_article_key(entry)
+        self.conn.execute('''
+            INSERT OR REPLACE INTO article_verdicts 
+            (article_key, topic, topic_hash, pipeline_version, verdict, reason, processed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (article_key, topic, topic_hash, self.pipeline_version, verdict, reason, datetime.now()))
+        if article_key in self._prefetched_keys:
+            self._prefetched[(article_key, topic, topic_hash)] = (verdict, None)
+        self._record_write()
     
     def mark_article_processed(self, entry, result_data: Dict[str, Any], topic=None, topic_hash=None):
         """Mark article as processed for a given topic and topic_hash (for per-topic cache)"""
         article_key = self._get_article_key(entry)
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
         topic_val = topic or result_data.get("topic")
+        topic_hash_val = topic_hash or result_data.get("topic_hash") or ""
+        article_data = result_data.get("article_data") or {}
         matched_keywords = json.dumps(result_data.get("keywords_matched", []))
-        from_feed = None
-        if result_data.get("article_data"):
-            from_feed = result_data["article_data"].get("from_feed")
-        cursor.execute('''
+        ai_reasoning = result_data.get("ai_reasoning", article_data.get("ai_reasoning"))
+        # Same order as RESULT_COLUMNS, so the row doubles as the prefetched result
+        row = (
+            topic_val,
+            topic_hash_val,
+            getattr(entry, 'title', ''),
+            getattr(entry, 'link', ''),
+            article_data.get("summary"),
+            article_data.get("relevance_percent"),
+            ai_reasoning,
+            matched_keywords,
+            article_data.get("from_feed"),
+            article_timestamp(article_data),
+            details_json(article_data)
+        )
+        # The summary only has a version when a summary prompt produced it
+        summarised = article_data.get("has_llm_summary")
+        self.conn.execute('''
             INSERT OR REPLACE INTO article_cache 
-            (article_key, title, link, script_version, processed_at, result_json, topic, matched_keywords, from_feed)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (topic, topic_hash, title, link, summary, relevance_percent, ai_reasoning, matched_keywords, from_feed,
+             published_at, details_json, article_key, pipeline_version, relevance_version, summary_version,
+             processed_at, updated_seq, verdict)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'accepted')
         ''', (
+            *row,
             article_key,
-            getattr(entry, 'title', ''),
-            getattr(entry, 'link', ''),
-            self.script_version,
+            self.pipeline_version,
+            self.stage_versions["relevance"],
+            self.stage_versions["summary"] if summarised else None,
             datetime.now(),
-            json.dumps(result_data),
-            topic_val,
-            matched_keywords,
-            from_feed
+            self._next_change_seq()
         ))
-        conn.commit()
-        conn.close()
+        if any(article_data.get(field) for field in HTML_FIELDS):
+            self.conn.execute('''
+                INSERT OR REPLACE INTO article_html (article_key, summary_html, summary_original, updated_at)
+                VALUES (?, ?, ?, ?)
+            ''', (article_key, article_data.get("summary_html"), article_data.get("summary_original"), datetime.now()))
+        if article_key in self._prefetched_keys:
+            summary = article_data.get("summary")
+            summary_html = article_data.get("summary_html") if not summary or summary == "-" else None
+            self._prefetched[(article_key, topic_val, topic_hash_val)] = ("accepted", (*row, summary_html))
+            self._prefetched_stale.pop((article_key, topic_val, topic_hash_val), None)
+        self._record_write()
+    
+    def update_article_summary(self, article_key: str, topic: str, topic_hash: str, article_data: Dict[str, Any]):
+        """Store a new LLM summary for the cached result of an article (its _get_article_key) and topic.
+        
+        The row gets a new change number, so an incremental export picks up the summary.
+        """
+        self.conn.execute('''
+            UPDATE article_cache SET summary = ?, details_json = ?, summary_version = ?, updated_seq = ?
+            WHERE article_key = ? AND topic = ? AND topic_hash = ? AND pipeline_version = ?
+        ''', (
+            article_data.get("summary"), details_json(article_data), self.stage_versions["summary"],
+            self._next_change_seq(), article_key, topic, topic_hash, self.pipeline_version
+        ))
+        self._record_write()
+        # Prefetched rows of the article are out of date now; later lookups go to the database
+        self._prefetched_keys.discard(article_key)
     
     def get_cached_result(self, entry, topic=None, topic_hash=None) -> Optional[Dict[str, Any]]:
         """Get cached processing result for a given topic and topic_hash (for per-topic cache)"""
         article_key = self._get_article_key(entry)
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        if topic is not None and topic_hash is not None:
-            cursor.execute('''
-                SELECT result_json FROM article_cache 
-                WHERE article_key = ? AND topic = ? AND script_version = ?
-            ''', (article_key, topic, self.script_version))
+        if topic is not None and topic_hash is not None and article_key in self._prefetched_keys:
+            cached = self._prefetched.get((article_key, topic, topic_hash))
+            row = cached[1] if cached else None
         else:
-            cursor.execute('''
-                SELECT result_json FROM article_cache 
-                WHERE article_key = ? AND script_version = ?
-            ''', (article_key, self.script_version))
-        result = cursor.fetchone()
-        conn.close()
-        if result:
-            try:
-                return json.loads(result[0])
-            except json.JSONDecodeError:
-                return None
-        return None
+            cursor = self.conn.cursor()
+            if topic is not None and topic_hash is not None:
+                cursor.execute(f'''
+                    SELECT {RESULT_COLUMNS} FROM {RESULT_TABLES} 
+                    WHERE c.article_key = ? AND c.topic = ? AND c.topic_hash = ? AND c.pipeline_version = ?
+                ''', (article_key, topic, topic_hash, self.pipeline_version))
+            else:
+                cursor.execute(f'''
+                    SELECT {RESULT_COLUMNS} FROM {RESULT_TABLES} 
+                    WHERE c.article_key = ? AND c.pipeline_version = ?
+                    ORDER BY c.processed_at DESC
+                ''', (article_key, self.pipeline_version))
+            row = cursor.fetchone()
+        return _result_from_row(row) if row else None
+    
+    def get_article_identities(self) -> list:
+        """All stored (article_key, canonical_key, url_key, minhash, from_feed), oldest first"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT article_key, canonical_key, url_key, minhash, from_feed FROM article_identity
+            ORDER BY created_at
+        ''')
+        return cursor.fetchall()
+    
+    def store_article_identity(self, article_key: str, canonical_key: str, url_key: Optional[str],
+                               minhash: Optional[bytes], from_feed: Optional[str]):
+        """Record which article an entry is a copy of (its own key if it is the first copy)"""
+        self.conn.execute('''
+            INSERT OR REPLACE INTO article_identity (article_key, canonical_key, url_key, minhash, from_feed, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (article_key, canonical_key, url_key, minhash, from_feed, datetime.now()))
+        self._record_write()
+    
+    def get_llm_response(self, key: str) -> Optional[str]:
+        """Get a stored LLM response by its llm_tasks.response_key"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT response FROM llm_responses WHERE prompt_key = ?', (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def record_llm_calls(self, calls: Iterable[Dict[str, Any]]):
+        """Store the responses in llm_tasks call records and mark the ones answered from here as used"""
+        now = datetime.now()
+        for call in calls:
+            if not call.get("key"):
+                continue
+            if call["cached"]:
+                self.conn.execute('UPDATE llm_responses SET last_used_at = ? WHERE prompt_key = ?', (now, call["key"]))
+            else:
+                self.conn.execute('''
+                    INSERT OR REPLACE INTO llm_responses (prompt_key, call_type, response, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (call["key"], call["type"], call["response"], now, now))
+            self._record_write()
+    
+    def evict_llm_responses(self, max_entries=LLM_RESPONSE_CACHE_ENTRIES) -> int:
+        """Delete all but the max_entries most recently used LLM responses"""
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            DELETE FROM llm_responses WHERE prompt_key IN (
+                SELECT prompt_key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )
+        ''', (max(0, int(max_entries)),))
+        self.conn.commit()
+        return cursor.rowcount
+    
+    def get_embedding(self, key: str, model: str) -> Optional[bytes]:
+        """Get a stored embedding vector (raw float32 bytes)"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT vector FROM embeddings WHERE key = ? AND model = ?', (key, model))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def store_embedding(self, key: str, model: str, vector: bytes):
+        """Persist an embedding vector (raw float32 bytes)"""
+        self.conn.execute('''
+            INSERT OR REPLACE INTO embeddings (key, model, vector, created_at) VALUES (?, ?, ?, ?)
+        ''', (key, model, vector, datetime.now()))
+        self._record_write()
+    
+    def get_feed_validators(self, state_hash: str) -> Dict[str, Dict[str, Any]]:
+        """Get stored ETag/Last-Modified/body hash per feed url.
+        
+        Only feeds last fully processed under the same state_hash (stage versions +
+        topic config) are returned, so a config change forces a full re-read.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT url, etag, last_modified, body_hash FROM feed_cache
+            WHERE state_hash = ?
+        ''', (state_hash,))
+        rows = cursor.fetchall()
+        return {
+            row[0]: {"etag": row[1], "last_modified": row[2], "body_hash": row[3]}
+            for row in rows
+        }
+    
+    def update_feed_validators(self, url: str, etag: Optional[str], last_modified: Optional[str],
+                               body_hash: Optional[str], state_hash: str):
+        """Persist validators for a feed whose entries have all been processed"""
+        self.conn.execute('''
+            INSERT OR REPLACE INTO feed_cache 
+            (url, etag, last_modified, body_hash, state_hash, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (url, etag, last_modified, body_hash, state_hash, datetime.now()))
+        self._record_write()
+    
+    def get_cached_results_for_feed(self, url: str, topic_hashes: Dict[str, str]) -> list:
+        """Get current cached results for a feed (used when the feed is unchanged).
+        
+        topic_hashes maps topic name -> current topic hash; rows for older topic configs are ignored.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT c.article_key, {RESULT_COLUMNS} FROM {RESULT_TABLES} 
+            WHERE c.from_feed = ? AND c.pipeline_version = ?
+        ''', (url, self.pipeline_version))
+        rows = cursor.fetchall()
+        results = []
+        for article_key, *row in rows:
+            topic, topic_hash = row[0], row[1]
+            if topic_hashes.get(topic) != topic_hash:
+                continue
+            result = _result_from_row(row)
+            if result is not None:
+                result["article_key"] = article_key
+                results.append(result)
+        return results
+
+    def get_topic_results_since(self, topic: str, topic_hash: str, after_seq: int = 0) -> list:
+        """Get (updated_seq, article_key, result) for a topic's current results changed after after_seq, oldest first.
+        
+        Every insert or update of a result gives it a new change number (see _next_change_seq), so
+        this includes rows rewritten in place, such as a later LLM summary. Rows deleted since are
+        not reported here; get_topic_deleted_seq says when a topic last lost any.
+        """
+        self.flush()
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT c.updated_seq, c.article_key, {RESULT_COLUMNS} FROM {RESULT_TABLES}
+            WHERE c.pipeline_version = ? AND c.topic = ? AND c.topic_hash = ? AND c.updated_seq > ?
+            ORDER BY c.updated_seq
+        ''', (self.pipeline_version, topic, topic_hash, after_seq))
+        return [(seq, article_key, _result_from_row(row)) for seq, article_key, *row in cursor.fetchall()]
+    
+    def get_topic_deleted_seq(self, topic: str) -> int:
+        """The change number current when cached results of a topic were last deleted (0 if never)"""
+        return int(self.get_metadata(f"deleted_seq:{topic}") or 0)
+    
+    def get_metadata(self, key: str) -> Optional[str]:
+        """Get a value from cache_metadata"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT value FROM cache_metadata WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    def set_metadata(self, key: str, value: str):
+        """Store a value in cache_metadata"""
+        self.conn.execute('''
+            INSERT OR REPLACE INTO cache_metadata (key, value, updated_at) VALUES (?, ?, ?)
+        ''', (key, value, datetime.now()))
+        self._record_write()
+    
+    def get_llm_queue(self) -> list:
+        """Get the queued (feed_url, entry_json, queued_at) rows, oldest first"""
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT feed_url, entry_json, queued_at FROM llm_queue ORDER BY queued_at')
+        return cursor.fetchall()
+    
+    def replace_llm_queue(self, rows: Iterable[Tuple[str, str, str, Any]]):
+        """Replace the queue with (article_key, feed_url, entry_json, queued_at) rows"""
+        self.conn.execute('DELETE FROM llm_queue')
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO llm_queue (article_key, feed_url, entry_json, queued_at) VALUES (?, ?, ?, ?)
+        ''', rows)
+        self.conn.commit()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get statistics about the cache"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
         # Total articles in cache
         cursor.execute('SELECT COUNT(*) FROM article_cache')
         total_articles = cursor.fetchone()[0]
         
-        # Articles with current script version
-        cursor.execute('SELECT COUNT(*) FROM article_cache WHERE script_version = ?', (self.script_version,))
+        # Articles with current pipeline version
+        cursor.execute('SELECT COUNT(*) FROM article_cache WHERE pipeline_version = ?', (self.pipeline_version,))
         current_version_articles = cursor.fetchone()[0]
         
         # Articles by topic (for current version)
         cursor.execute('''
             SELECT topic, COUNT(*) FROM article_cache 
-            WHERE script_version = ? AND topic IS NOT NULL 
+            WHERE pipeline_version = ? 
             GROUP BY topic
-        ''', (self.script_version,))
+        ''', (self.pipeline_version,))
         articles_by_topic = dict(cursor.fetchall())
         
+        # Negative verdicts (for current version)
+        cursor.execute('SELECT COUNT(*) FROM article_verdicts WHERE pipeline_version = ?', (self.pipeline_version,))
+        cached_rejections = cursor.fetchone()[0]
+        
+        cursor.execute('SELECT COUNT(*) FROM llm_responses')
+        llm_responses = cursor.fetchone()[0]
+        
         # Cache file size
         cache_size_mb = self.db_file.stat().st_size / (1024 * 1024) if self.db_file.exists() else 0
         
-        conn.close()
-        
         return {
             "total_cached_articles": total_articles,
             "current_version_articles": current_version_articles,
             "outdated_articles": total_articles - current_version_articles,
             "articles_by_topic": articles_by_topic,
-            "current_script_version": self.script_version,
+            "cached_rejections": cached_rejections,
+            "llm_responses": llm_responses,
+            "current_pipeline_version": self.pipeline_version,
+            "stage_versions": self.stage_versions,
             "cache_file": str(self.db_file),
             "cache_size_mb": round(cache_size_mb, 2)
         }
@@ -207,39 +977,63 @@ class SQLiteProcessingCache:
         """Remove cache entries older than specified days"""
         cutoff_date = datetime.now() - timedelta(days=max_age_days)
         
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        self.flush()
+        cursor = self.conn.cursor()
         
         # Count entries to be deleted
         cursor.execute('SELECT COUNT(*) FROM article_cache WHERE processed_at < ?', (cutoff_date,))
         count_to_delete = cursor.fetchone()[0]
         
+        # Exports of these topics that include the rows can no longer simply be extended
+        cursor.execute('SELECT DISTINCT topic FROM article_cache WHERE processed_at < ?', (cutoff_date,))
+        for (topic,) in cursor.fetchall():
+            cursor.execute('''
+                INSERT OR REPLACE INTO cache_metadata (key, value, updated_at) VALUES (?, ?, ?)
+            ''', (f"deleted_seq:{topic}", str(self._next_change_seq()), datetime.now()))
+        
+        # Feeds losing cached articles must be fully re-read next run, otherwise
+        # entries still present in an unchanged feed would drop out of the output
+        cursor.execute('''
+            DELETE FROM feed_cache WHERE url IN (
+                SELECT DISTINCT from_feed FROM article_cache WHERE processed_at < ?
+            )
+        ''', (cutoff_date,))
+        
         # Delete old entries
         cursor.execute('DELETE FROM article_cache WHERE processed_at < ?', (cutoff_date,))
+        cursor.execute('DELETE FROM article_verdicts WHERE processed_at < ?', (cutoff_date,))
+        cursor.execute('DELETE FROM article_html WHERE article_key NOT IN (SELECT article_key FROM article_cache)')
+        # Articles that waited this long for the LLM are not worth assessing any more
+        cursor.execute('DELETE FROM llm_queue WHERE queued_at < ?', (cutoff_date,))
+        # Topic vectors are cheap to recompute, so they age out with everything else
+        cursor.execute('DELETE FROM embeddings WHERE created_at < ?', (cutoff_date,))
+        cursor.execute('DELETE FROM article_identity WHERE created_at < ?', (cutoff_date,))
+        cursor.execute('DELETE FROM llm_responses WHERE last_used_at < ?', (cutoff_date,))
         
-        conn.commit()
-        conn.close()
+        self.conn.commit()
         
         return count_to_delete
     
     def vacuum_database(self):
         """Optimize database by reclaiming unused space"""
-        conn = sqlite3.connect(self.db_file)
-        conn.execute('VACUUM')
-        conn.close()
+        self.flush()
+        self.conn.execute('VACUUM')
     
-    def get_articles_by_topic(self, topic: str, limit: Optional[int] = None) -> list:
-        """Get cached articles for a specific topic (useful for debugging)"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    def get_articles_by_topic(self, topic: str, limit: Optional[int] = None, min_relevance: Optional[int] = None) -> list:
+        """Get cached articles for a specific topic, newest first (useful for debugging)"""
+        cursor = self.conn.cursor()
         
         query = '''
-            SELECT title, link, processed_at, matched_keywords 
+            SELECT title, link, processed_at, matched_keywords, published_at, relevance_percent 
             FROM article_cache 
-            WHERE topic = ? AND script_version = ? 
-            ORDER BY processed_at DESC
+            WHERE topic = ? AND pipeline_version = ? 
         '''
-        params = [topic, self.script_version]
+        params = [topic, self.pipeline_version]
+        
+        if min_relevance is not None:
+            query += ' AND relevance_percent >= ?'
+            params.append(min_relevance)
+        query += ' ORDER BY published_at DESC'
         
         if limit:
             query += ' LIMIT ?'
@@ -247,14 +1041,15 @@ class SQLiteProcessingCache:
         
         cursor.execute(query, params)
         results = cursor.fetchall()
-        conn.close()
         
         return [
             {
                 "title": row[0],
                 "link": row[1], 
                 "processed_at": row[2],
-                "matched_keywords": json.loads(row[3]) if row[3] else []
+                "matched_keywords": json.loads(row[3]) if row[3] else [],
+                "published_at": row[4],
+                "relevance_percent": row[5]
             }
             for row in results
         ]
@@ -264,33 +1059,39 @@ class SQLiteProcessingCache:
         if not output_file:
             output_file = f"cache_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
         
-        cursor.execute('''
-            SELECT article_key, title, link, script_version, processed_at, result_json, topic
-            FROM article_cache
-            ORDER BY processed_at DESC
+        cursor.execute(f'''
+            SELECT c.article_key, c.pipeline_version, c.processed_at, h.summary_html, h.summary_original, {RESULT_COLUMNS}
+            FROM {RESULT_TABLES}
+            ORDER BY c.processed_at DESC
         ''')
         
-        results = cursor.fetchall()
-        conn.close()
+        results = []
+        for article_key, pipeline_version, processed_at, summary_html, summary_original, *row in cursor.fetchall():
+            result = _result_from_row(row)
+            if result is not None:
+                # A backup keeps the original summaries, not just the ones the frontend needs
+                result["article_data"].update(summary_html=summary_html, summary_original=summary_original)
+            results.append((article_key, pipeline_version, processed_at, result, row))
         
         export_data = {
             "export_date": datetime.now().isoformat(),
-            "script_version": self.script_version,
+            "pipeline_version": self.pipeline_version,
+            "stage_versions": self.stage_versions,
             "total_articles": len(results),
             "articles": [
                 {
-                    "article_key": row[0],
-                    "title": row[1],
-                    "link": row[2],
-                    "script_version": row[3],
-                    "processed_at": row[4],
-                    "result": json.loads(row[5]) if row[5] else None,
-                    "topic": row[6]
+                    "article_key": article_key,
+                    "title": row[2],
+                    "link": row[3],
+                    "pipeline_version": pipeline_version,
+                    "processed_at": processed_at,
+                    "result": result,
+                    "topic": row[0],
+                    "topic_hash": row[1]
                 }
-                for row in results
+                for article_key, pipeline_version, processed_at, result, row in results
             ]
         }
         
@@ -298,4 +1099,24 @@ class SQLiteProcessingCache:
         with open(output_path, 'w') as f:
             json.dump(export_data, f, indent=2, default=str)
         
-        return str(output_path)
\ No newline at end of file
+        return str(output_path)
+
+
+class LLMResponseReader:
+    """Read-only access to the llm_responses table, for LLM worker processes.
+    
+    Workers only look responses up; what they generate goes back to the main process in their
+    call records and is stored there with record_llm_calls.
+    """
+    
+    def __init__(self, db_file):
+        self.conn = sqlite3.connect(Path(Path(__file__).parent, db_file), timeout=30)
+    
+    def get_llm_response(self, key: str) -> Optional[str]:
+        """Get a stored LLM response by its llm_tasks.response_key"""
+        try:
+            row = self.conn.execute('SELECT response FROM llm_responses WHERE prompt_key = ?', (key,)).fetchone()
+        except sqlite3.OperationalError:
+            # Locked or busy: generating the answer again is always an option
+            return None
+        return row[0] if row else None
@@ -0,0 +1,318 @@
+import calendar
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+# Compact separators: the topic files are only ever read by the React app
+JSON_SEPARATORS = (",", ":")
+DEFAULT_SHARD_SIZE = 100  # Articles per topic file; the newest shard is what the frontend loads first
+
+
+def topic_filename(topic, shard=0):
+    """File name of one of a topic's shards, e.g. "Machine Learning" -> machine_learning.json, machine_learning.1.json, ..."""
+    slug = topic.lower().replace(' ', '_')
+    return f"{slug}.json" if shard == 0 else f"{slug}.{shard}.json"
+
+
+def facets_filename(topic):
+    """File name of a topic's facet index, e.g. "Machine Learning" -> machine_learning.facets.json"""
+    return f"{topic.lower().replace(' ', '_')}.facets.json"
+
+
+def article_date(article):
+    """Publication day of an article as YYYY-MM-DD in UTC (1970-01-01 if unknown)"""
+    return time.strftime("%Y-%m-%d", time.gmtime(article_timestamp(article)))
+
+
+def published_epoch(published_parsed) -> int:
+    """UTC epoch seconds of a feedparser published_parsed (a struct_time, or the list JSON turns it into), 0 if unknown"""
+    if not isinstance(published_parsed, (time.struct_time, list, tuple)) or len(published_parsed) < 6:
+        return 0
+    try:
+        return calendar.timegm(tuple(published_parsed[:6]) + (0, 0, 0))
+    except (ValueError, TypeError, OverflowError):
+        return 0
+
+
+def article_timestamp(article) -> int:
+    """Publish time of an article in epoch seconds, used as its sort key.
+
+    New articles carry it as published_ts from ingest; older cached ones only have published_parsed.
+    """
+    published_ts = article.get("published_ts")
+    if isinstance(published_ts, int) and not isinstance(published_ts, bool):
+        return published_ts
+    return published_epoch(article.get("published_parsed"))
+
+
+def compact_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """The subset of an article's cached data the frontend needs.
+
+    summary_original is dropped, summary_html is only kept when there is no usable summary
+    to show instead, and keyword_matches keeps just where each keyword was found rather
+    than another copy of the title and summary per keyword. The publish time is sent as the
+    published_ts integer rather than as published_parsed.
+    """
+    dropped = ("summary_original", "summary_html", "keyword_matches", "published_parsed")
+    compact = {key: value for key, value in article.items() if key not in dropped}
+    compact["published_ts"] = article_timestamp(article)
+    summary = article.get("summary")
+    if article.get("summary_html") and (not summary or summary == "-"):
+        compact["summary_html"] = article["summary_html"]
+    compact["keyword_matches"] = {
+        keyword: match.get("found_in", []) if isinstance(match, dict) else match
+        for keyword, match in (article.get("keyword_matches") or {}).items()
+    }
+    return compact
+
+
+def _relevance(article, missing):
+    """relevance_percent if the LLM gave one, otherwise the value the frontend sorts missing ones as"""
+    relevance = article.get("relevance_percent")
+    if isinstance(relevance, (int, float)) and not isinstance(relevance, bool):
+        return relevance
+    return missing
+
+
+def build_facets(articles: List[Dict[str, Any]], now=None) -> Dict[str, Any]:
+    """Facet index over a topic's articles, in the newest-first order they are written in.
+
+    An article's id is its position in that order (so shard n holds a contiguous id range).
+    keywords/sources/days map each filter value to the ids it selects and orders holds the
+    ids presorted for every sort mode of the web app except "recent", which is id order.
+    The heuristic order uses the generation time as "now" for its recency term.
+    """
+    now = time.time() if now is None else now
+    keywords, sources, days = {}, {}, {}
+    published = []
+    for article_id, article in enumerate(articles):
+        for keyword in article.get("matched_keywords") or []:
+            keywords.setdefault(keyword, []).append(article_id)
+        if article.get("from_feed"):
+            sources.setdefault(article["from_feed"], []).append(article_id)
+        days.setdefault(article_date(article), []).append(article_id)
+        published.append(article_timestamp(article))
+
+    def heuristic_score(article_id):
+        # Same weights as the web app: (2 x relevance) + keyword hits + recency (0-7 days)
+        article = articles[article_id]
+        hours_ago = (now - published[article_id]) / 3600
+        recency = max(0, 7 - min(7, hours_ago / 24))
+        return _relevance(article, 0) * 2 + len(article.get("matched_keywords") or []) + recency
+
+    # ids are already newest first, so stable sorts keep "then by date" tie-breaks for free
+    ids = range(len(articles))
+    orders = {
+        "keywords": sorted(ids, key=lambda i: -len(articles[i].get("matched_keywords") or [])),
+        "relevance": sorted(ids, key=lambda i: -_relevance(articles[i], -1)),
+        "least_relevant": sorted(ids, key=lambda i: _relevance(articles[i], 101)),
+        "heuristic": sorted(ids, key=lambda i: -heuristic_score(i)),
+        "recent_relevance": sorted(ids, key=lambda i: (-published[i], -_relevance(articles[i], -1))),
+    }
+    orders["relevance_recent"] = orders["relevance"]
+    return {
+        "total_articles": len(articles),
+        "keywords": keywords,
+        "sources": sources,
+        "days": days,
+        "orders": orders
+    }
+
+
+def write_json_atomic(path: Path, data):
+    """Write compact JSON to a temporary file and rename it over path, so readers never see a partial file"""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=JSON_SEPARATORS, default=str)
+    os.replace(tmp_path, path)
+
+
+class TopicWriter:
+    """Keeps the topic shards and topics/index.json up to date while a run is in progress.
+
+    Each topic's articles are written newest first in shards of shard_size articles
+    (<topic>.json, <topic>.1.json, ...), and index.json lists every shard with its url, count
+    and date range so the frontend can load the newest one and fetch older ones on demand.
+    Next to the shards, <topic>.facets.json holds the topic's facet index (see build_facets).
+
+    Articles are added as they are confirmed and flush() rewrites only the topics that changed,
+    so an interrupted run still leaves valid files. Until a feed has been finished in this run,
+    its articles from the previous output are kept, so those files don't lose articles either.
+
+    previous_topics limits which topics have their previous articles read back. The others keep
+    their shards and counts from the manifest untouched, unless articles are added to them, in
+    which case they are rewritten from the added articles alone.
+    """
+
+    def __init__(self, topics_dir: Path, topics: Iterable[str], keep_previous=True, shard_size=DEFAULT_SHARD_SIZE,
+                 previous_topics: Optional[Iterable[str]] = None):
+        self.topics_dir = Path(topics_dir)
+        self.topics_dir.mkdir(parents=True, exist_ok=True)
+        self.topics = list(topics)
+        self.shard_size = max(1, int(shard_size or DEFAULT_SHARD_SIZE))
+        self.shards: Dict[str, List[Dict[str, Any]]] = {}  # topic -> manifest entries of its written shards
+        self.articles: Dict[str, List[Dict[str, Any]]] = {topic: [] for topic in self.topics}
+        self.unloaded = set()  # Topics whose previous shards are listed in the manifest but not read
+        self.previous = self._load_previous(previous_topics) if keep_previous else {topic: [] for topic in self.topics}
+        self.finished_feeds = set()
+        self.dirty = set()
+
+    def _load_previous(self, previous_topics=None):
+        """Articles per topic from the last run's files (missing or unreadable files count as empty)"""
+        try:
+            with open(self.topics_dir / "index.json", "r") as f:
+                previous_shards = json.load(f).get("shards", {})
+        except (OSError, ValueError, AttributeError):
+            previous_shards = {}
+
+        previous = {}
+        for topic in self.topics:
+            if topic in previous_shards:
+                # Topics this run hasn't rewritten yet keep their existing shards in the manifest
+                self.shards[topic] = previous_shards[topic]
+            previous[topic] = []
+            if previous_topics is not None and topic not in previous_topics:
+                if topic in previous_shards:
+                    self.unloaded.add(topic)
+                continue
+            # Output from before sharding has a single file per topic
+            urls = [shard["url"] for shard in previous_shards.get(topic, [])] or [topic_filename(topic)]
+            for url in urls:
+                try:
+                    with open(self.topics_dir / url, "r") as f:
+                        previous[topic].extend(json.load(f).get("articles", []))
+                except (OSError, ValueError, AttributeError):
+                    continue
+        return previous
+
+    def add(self, topic, article):
+        """Add one article to a topic's output"""
+        self.articles[topic].append(compact_article(article))
+        self.unloaded.discard(topic)
+        self.dirty.add(topic)
+
+    def replace(self, topic, article):
+        """Swap an article added earlier in this run (same title and link) for an updated version"""
+        compact = compact_article(article)
+        key = (article.get("title"), article.get("link"))
+        self.articles[topic] = [
+            compact if (existing.get("title"), existing.get("link")) == key else existing
+            for existing in self.articles[topic]
+        ]
+        self.dirty.add(topic)
+
+    def rewrite(self, topic, keep_previous=True):
+        """Have the next flush rewrite a topic even if nothing was added, optionally without its previous articles"""
+        if not keep_previous:
+            self.previous[topic] = []
+        self.unloaded.discard(topic)
+        self.dirty.add(topic)
+
+    def finish_feed(self, url):
+        """Mark a feed as fully handled in this run, so its previous articles are no longer carried over"""
+        self.finished_feeds.add(url)
+        for topic, articles in self.previous.items():
+            if any(article.get("from_feed") == url for article in articles):
+                self.dirty.add(topic)
+
+    def _carried_over(self, topic):
+        """Previous articles of a topic that are still kept: feed not finished yet and not added again.
+
+        An article counts as added again when its title and link match, or its article_key does
+        (articles exported from the cache carry one, and keep it when their title or link changes).
+        """
+        previous = self.previous.get(topic, [])
+        if not previous:
+            return []
+        added = {(article.get("title"), article.get("link")) for article in self.articles[topic]}
+        added_keys = {article["article_key"] for article in self.articles[topic] if article.get("article_key")}
+        return [
+            article for article in previous
+            if article.get("from_feed") not in self.finished_feeds
+            and (article.get("title"), article.get("link")) not in added
+            and article.get("article_key") not in added_keys
+        ]
+
+    def _topic_articles(self, topic, include_previous):
+        """This run's articles for a topic, plus carried-over ones, newest first"""
+        articles = list(self.articles[topic])
+        if include_previous:
+            articles.extend(self._carried_over(topic))
+        articles.sort(key=article_timestamp, reverse=True)
+        return articles
+
+    def count(self, topic, include_previous=False):
+        """Number of articles a topic's file holds"""
+        if include_previous:
+            if topic in self.unloaded:
+                return sum(shard["count"] for shard in self.shards.get(topic, []))
+            return len(self.articles[topic]) + len(self._carried_over(topic))
+        return len(self.articles[topic])
+
+    def _write_topic(self, topic, articles, generated_at):
+        """Write a topic's articles as date-ordered shards and return their manifest entries"""
+        shards = []
+        # A topic with no articles still gets an (empty) first shard
+        for shard, start in enumerate(range(0, max(len(articles), 1), self.shard_size)):
+            shard_articles = articles[start:start + self.shard_size]
+            filename = topic_filename(topic, shard)
+            write_json_atomic(self.topics_dir / filename, {
+                "topic": topic,
+                "shard": shard,
+                "articles": shard_articles,
+                "total_articles": len(shard_articles),
+                "generated_at": generated_at
+            })
+            shards.append({
+                "url": filename,
+                "count": len(shard_articles),
+                "newest": article_date(shard_articles[0]) if shard_articles else None,
+                "oldest": article_date(shard_articles[-1]) if shard_articles else None
+            })
+
+        # Drop shards left over from a previous, longer write of this topic
+        shard = len(shards)
+        while (self.topics_dir / topic_filename(topic, shard)).exists():
+            (self.topics_dir / topic_filename(topic, shard)).unlink()
+            shard += 1
+
+        facets = build_facets(articles)
+        facets.update(topic=topic, generated_at=generated_at)
+        write_json_atomic(self.topics_dir / facets_filename(topic), facets)
+        return shards
+
+    def flush(self, final=False):
+        """Rewrite every changed topic's shards and the index.
+
+        With final=True all topics are written and only this run's articles are kept.
+        """
+        topics = self.topics if final else [topic for topic in self.topics if topic in self.dirty]
+        topics = [topic for topic in topics if topic not in self.unloaded]
+        if not topics:
+            return
+        generated_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+        for topic in topics:
+            articles = self._topic_articles(topic, include_previous=not final)
+            self.shards[topic] = self._write_topic(topic, articles, generated_at)
+        self.dirty.clear()
+
+        counts = {topic: self.count(topic, include_previous=not final) for topic in self.topics}
+        # Create topics index (and shard manifest) for React app
+        write_json_atomic(self.topics_dir / "index.json", {
+            "topics": self.topics,
+            "generated_at": generated_at,
+            "summary": {
+                "total_topics": len(self.topics),
+                "total_articles": sum(counts.values()),
+                "articles_by_topic": counts
+            },
+            "shard_size": self.shard_size,
+            "shards": {topic: self.shards[topic] for topic in self.topics if topic in self.shards},
+            "facets": {topic: facets_filename(topic) for topic in self.topics if topic in self.shards}
+        })
+
+    def close(self):
+        """Write the final files for this run"""
+        self.flush(final=True)
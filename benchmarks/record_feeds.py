@@ -0,0 +1,73 @@
+import json
+import shutil
+import time
+from pathlib import Path
+
+import requests
+
+from replay import BACKEND_DIR, DEFAULT_CORPUS_DIR, MANIFEST_NAME, corpus_filename
+from feed_fetcher import FeedFetcher
+from generate_news_digest import load_config
+
+# Response headers feedparser and the fetcher look at, kept so replays behave like the live feeds
+RECORDED_HEADERS = ("content-type", "content-encoding", "etag", "last-modified", "content-location")
+
+
+class RecordingFetcher(FeedFetcher):
+    """FeedFetcher that also keeps the raw body and headers of every response it downloads"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.responses = {}
+
+    def _download(self, url, headers) -> requests.Response:
+        response = super()._download(url, headers)
+        self.responses[url] = response
+        return response
+
+
+def record_feeds(config_dir=BACKEND_DIR, corpus_dir=DEFAULT_CORPUS_DIR):
+    """Download every feed in the config and store it as the benchmark corpus, replacing any previous one"""
+    config = load_config(Path(config_dir))
+    corpus_dir = Path(corpus_dir)
+    if corpus_dir.exists():
+        shutil.rmtree(corpus_dir)
+    corpus_dir.mkdir(parents=True)
+
+    fetcher = RecordingFetcher.from_config(config)
+    feeds = {}
+    for result in fetcher.fetch_all(config["feeds"]):
+        url = result["url"]
+        response = fetcher.responses.get(url)
+        if response is None:
+            feeds[url] = {"error": result["error"]}
+            print(f"  ✗ {url}: {result['error']}")
+            continue
+        filename = corpus_filename(url)
+        with open(corpus_dir / filename, "wb") as f:
+            f.write(response.content)
+        feeds[url] = {
+            "file": filename,
+            "status": response.status_code,
+            "headers": {key: value for key, value in response.headers.items() if key.lower() in RECORDED_HEADERS},
+            "entries": len(result["feed"].entries) if result["feed"] is not None else 0
+        }
+        print(f"  {'✓' if response.ok else '✗'} {url}: HTTP {response.status_code}, {feeds[url]['entries']} entries")
+
+    with open(corpus_dir / MANIFEST_NAME, "w") as f:
+        json.dump({
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+            # In config order, which is the order the pipeline gets them in
+            "feeds": {url: feeds[url] for url in config["feeds"] if url in feeds}
+        }, f, indent=2)
+    recorded = sum(1 for feed in feeds.values() if "file" in feed)
+    print(f"\nRecorded {recorded} of {len(config['feeds'])} feeds to {corpus_dir}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Record the configured feeds as the offline benchmark corpus.")
+    parser.add_argument("--config-dir", default=str(BACKEND_DIR), help="Directory holding config.yaml")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR), help="Directory to store the recorded feeds in")
+    args = parser.parse_args()
+    record_feeds(args.config_dir, args.corpus)
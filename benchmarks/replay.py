@@ -0,0 +1,138 @@
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import requests
+
+BENCHMARKS_DIR = Path(__file__).parent
+BACKEND_DIR = BENCHMARKS_DIR.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from feed_fetcher import FeedFetcher  # noqa: E402
+from entry_record import build_record  # noqa: E402
+
+DEFAULT_CORPUS_DIR = BENCHMARKS_DIR / "corpus"
+MANIFEST_NAME = "manifest.json"
+COPY_MARKER = "#copy"  # Scaled-up feeds are the recorded ones again under <url>#copy<n>
+
+
+def corpus_filename(url):
+    """File name a feed's recorded body is stored under"""
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:16] + ".xml"
+
+
+def load_manifest(corpus_dir=DEFAULT_CORPUS_DIR) -> Dict[str, Any]:
+    """The corpus manifest written by record_feeds.py ({"recorded_at", "feeds": {url: {...}}})"""
+    manifest_path = Path(corpus_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(
+            f"No recorded feeds in {corpus_dir}. Record them first with: python benchmarks/record_feeds.py"
+        )
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def scaled_feeds(urls: List[str], scale: int) -> List[str]:
+    """The feed list at scale times the recorded volume: every feed, then every feed again as copy 1, 2, ..."""
+    return [url if copy == 0 else f"{url}{COPY_MARKER}{copy}" for copy in range(scale) for url in urls]
+
+
+def split_copy(url):
+    """(recorded url, copy number) of a possibly scaled-up feed url"""
+    base, marker, copy = url.rpartition(COPY_MARKER)
+    if marker and copy.isdigit():
+        return base, int(copy)
+    return url, 0
+
+
+class ReplayFetcher(FeedFetcher):
+    """FeedFetcher that answers from the recorded corpus instead of the network.
+
+    Copies of a feed get a copy=<n> query parameter added to every entry link, so each copy's
+    entries are new articles to the cache while their text (and so keyword matching) stays the same.
+    """
+
+    def __init__(self, corpus_dir=DEFAULT_CORPUS_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus_dir = Path(corpus_dir)
+        self.recorded = load_manifest(corpus_dir)["feeds"]
+
+    def _download(self, url, headers) -> requests.Response:
+        recorded_url, _ = split_copy(url)
+        recording = self.recorded.get(recorded_url)
+        if recording is None or recording.get("error"):
+            raise requests.ConnectionError(f"{recorded_url} is not in the recorded corpus")
+
+        response = requests.Response()
+        response.url = url
+        response.status_code = recording["status"]
+        response.headers.update(recording.get("headers", {}))
+        if headers.get("If-None-Match") and headers["If-None-Match"] == response.headers.get("ETag"):
+            response.status_code = 304
+            response._content = b""
+            return response
+        with open(self.corpus_dir / recording["file"], "rb") as f:
+            response._content = f.read()
+        return response
+
+    def fetch(self, url, validators: Dict[str, Any] = None) -> Dict[str, Any]:
+        result = super().fetch(url, validators)
+        _, copy = split_copy(url)
+        if copy and result["feed"] is not None:
+            for entry in result["feed"].entries:
+                link = entry.get("link", "")
+                entry["link"] = f"{link}{'&' if '?' in link else '?'}copy={copy}"
+                # The record the fetcher built keyed the article by its original link
+                entry["record"] = build_record(entry)
+        return result
+
+
+class StubLLM:
+    """Deterministic stand-in for the GPT4All model, answering every prompt llm_tasks sends.
+
+    Verdicts and relevance scores are derived from a hash of the prompt, so a given corpus
+    always gets the same answers, and each generate() call sleeps for latency seconds to
+    simulate the model.
+    """
+
+    def __init__(self, latency=0.0, accept_ratio=0.5):
+        self.latency = latency
+        self.accept_ratio = accept_ratio
+        self.calls = 0
+
+    def _draw(self, prompt, salt=""):
+        """A number in [0, 1) fixed by the prompt"""
+        digest = hashlib.md5(f"{salt}{prompt}".encode("utf-8")).hexdigest()
+        return int(digest[:8], 16) / 0x100000000
+
+    def generate(self, prompt, max_tokens=200, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        accepted = self._draw(prompt) < self.accept_ratio
+        verdict = "YES" if accepted else "NO"
+        relevance = int(self._draw(prompt, "relevance") * 101)
+        summary = "A stub summary of the article for the benchmarks."
+
+        if "Task: Decide which of these topics" in prompt:
+            topics = [line[2:].split(":", 1)[0] for line in prompt.splitlines() if line.startswith("- ")]
+            return "\n".join(
+                f"{topic}: {'YES' if self._draw(prompt, topic) < self.accept_ratio else 'NO'} - stub verdict"
+                for topic in topics
+            )
+        if "Task: Assess this news article" in prompt:
+            lines = []
+            if "VERDICT:" in prompt:
+                lines += [f"VERDICT: {verdict}", "REASON: stub verdict"]
+            lines.append(f"RELEVANCE: {relevance}, stub score")
+            if "SUMMARY:" in prompt:
+                lines.append(f"SUMMARY: {summary}")
+            return "\n".join(lines)
+        if "Task: Rate how relevant" in prompt:
+            return f"{relevance} stub score"
+        if "Task: Create an extremely short" in prompt:
+            return summary
+        return f"{verdict} stub verdict"
@@ -0,0 +1,214 @@
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+from replay import BENCHMARKS_DIR, DEFAULT_CORPUS_DIR, ReplayFetcher, StubLLM, load_manifest, scaled_feeds
+import llm_tasks
+from entry_record import build_record
+from generate_news_digest import DigestPipeline, load_config
+from keyword_index import KeywordIndex
+from run_metrics import RunMetrics
+from sqlite_cache import SQLiteProcessingCache
+from topic_writer import TopicWriter, DEFAULT_SHARD_SIZE
+
+DEFAULT_SCALES = (1, 10, 100)  # Multiples of the recorded feed volume
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+REGRESSION_TOLERANCE = 0.20    # A benchmark counts as slower when its total time grows by more than this
+MIN_DIFFERENCE_S = 0.005       # ... and by more than this many seconds, so tiny totals don't flag on noise
+
+
+def benchmark_config(config: Dict[str, Any], feeds: List[str]) -> Dict[str, Any]:
+    """The pipeline config for a benchmark run: the real topics and LLM settings, no time limit, one LLM process"""
+    return {
+        **config,
+        "feeds": feeds,
+        "max_processing_time": 0,
+        # Worker processes would load the real model instead of the stub
+        "llm_workers": 1,
+        # Needs the embedding model
+        "semantic_prefilter": {"enabled": False},
+        # Scaled-up copies of a feed are near-duplicates of it by construction, and would send the LLM the same prompts
+        "duplicate_detection": {**(config.get("duplicate_detection") or {}), "near_duplicates": False},
+        "llm_response_cache": {"enabled": False}
+    }
+
+
+def time_hot_paths(fetcher, feeds, topics, metrics):
+    """Feed parsing, keyword matching and entry normalisation over every entry of the scaled corpus"""
+    keyword_index = KeywordIndex(topics)
+    entries = 0
+    # Feed by feed, so 100x the corpus is never held in memory at once
+    for url in feeds:
+        result = fetcher.fetch(url)
+        if result["feed"] is None:
+            continue
+        metrics.add_sample("feed_parse", result["parse_elapsed"])
+        for entry in result["feed"].entries:
+            entries += 1
+            with metrics.stage("keyword_match"):
+                keyword_index.match_entry(entry)
+            # The fetcher has already built entry["record"]; this times building it again from scratch
+            with metrics.stage("entry_record"):
+                build_record(entry)
+    return entries
+
+
+def time_cache_lookups(fetcher, feeds, cache, topic_hashes, metrics):
+    """The pipeline's per-feed prefetch and per-topic cache checks, against the cache a run filled"""
+    for url in feeds:
+        result = fetcher.fetch(url)
+        if result["feed"] is None:
+            continue
+        entries = result["feed"].entries
+        with metrics.stage("cache_prefetch"):
+            cache.prefetch(entries, topic_hashes)
+        for entry in entries:
+            for topic, topic_hash in topic_hashes.items():
+                with metrics.stage("cache_lookup"):
+                    should_process, reason = cache.should_process_article(entry, topic=topic, topic_hash=topic_hash)
+                    if not should_process and reason == "already_processed":
+                        cache.get_cached_result(entry, topic=topic, topic_hash=topic_hash)
+
+
+def time_json_output(matched, topics_dir, shard_size, metrics):
+    """Compacting, sharding and writing every matched article as the topic files and facet indexes"""
+    with metrics.stage("json_output"):
+        writer = TopicWriter(topics_dir, matched.keys(), keep_previous=False, shard_size=shard_size)
+        for topic, articles in matched.items():
+            for article in articles:
+                writer.add(topic, article)
+        writer.close()
+
+
+def run_pipeline(config, cache, topics_dir, corpus_dir, metrics, name):
+    """One full DigestPipeline run over the replayed feeds, with its console output discarded"""
+    writer = TopicWriter(topics_dir, config["topics"].keys(),
+                         shard_size=config.get("topic_shard_size", DEFAULT_SHARD_SIZE))
+    pipeline = DigestPipeline(config, cache, writer=writer)
+    pipeline.fetcher = ReplayFetcher(corpus_dir, max_workers=pipeline.fetcher.max_workers,
+                                     per_host_limit=pipeline.fetcher.per_host_limit)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with metrics.stage(name):
+            matched = pipeline.run()
+            writer.close()
+    return pipeline, matched
+
+
+def run_scale(config, recorded_feeds, scale, corpus_dir, llm_latency):
+    """Every benchmark at one multiple of the recorded feed volume"""
+    feeds = scaled_feeds(recorded_feeds, scale)
+    config = benchmark_config(config, feeds)
+    fetcher = ReplayFetcher(corpus_dir)
+    metrics = RunMetrics()
+    stub = StubLLM(latency=llm_latency)
+    llm_tasks.llm = stub
+
+    entries = time_hot_paths(fetcher, feeds, config["topics"], metrics)
+    with tempfile.TemporaryDirectory(prefix="newsfeeder-bench-") as work_dir:
+        work_dir = Path(work_dir)
+        cache = SQLiteProcessingCache(str(work_dir / "processing_cache.db"))
+        try:
+            # Cold: nothing cached, every keyword match goes to the (stub) LLM
+            pipeline, matched = run_pipeline(config, cache, work_dir / "topics", corpus_dir, metrics, "pipeline_cold")
+            llm_calls = stub.calls
+            # Warm: the same feeds again, answered from the cache
+            run_pipeline(config, cache, work_dir / "topics", corpus_dir, metrics, "pipeline_warm")
+            time_cache_lookups(fetcher, feeds, cache, pipeline.topic_hashes, metrics)
+            time_json_output(matched, work_dir / "json_output", config.get("topic_shard_size", DEFAULT_SHARD_SIZE),
+                             metrics)
+        finally:
+            cache.close()
+
+    return {
+        "counts": {
+            "feeds": len(feeds),
+            "entries": entries,
+            "articles_matched": sum(len(articles) for articles in matched.values()),
+            "llm_calls": llm_calls
+        },
+        "timings": metrics.report()["stages"]
+    }
+
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Print each benchmark next to its baseline and return the names of those that got slower"""
+    regressions = []
+    for scale, scale_results in results["scales"].items():
+        base = (baseline or {}).get("scales", {}).get(scale, {})
+        print(f"\n{scale} ({scale_results['counts']['feeds']} feeds, {scale_results['counts']['entries']} entries, "
+              f"{scale_results['counts']['llm_calls']} LLM calls)")
+        if base and base.get("counts") != scale_results["counts"]:
+            print(f"  ⚠️ Volumes differ from the baseline ({base.get('counts')}), the corpus or config has changed")
+        print(f"  {'benchmark':<20}{'count':>9}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'baseline s':>12}{'change':>9}")
+        for name, timing in scale_results["timings"].items():
+            base_total = base.get("timings", {}).get(name, {}).get("total_s")
+            line = f"  {name:<20}{timing['count']:>9}{timing['total_s']:>10.3f}{timing['p50_ms']:>10.3f}{timing['p95_ms']:>10.3f}"
+            if base_total:
+                change = timing["total_s"] / base_total - 1
+                slower = change > tolerance and timing["total_s"] - base_total > MIN_DIFFERENCE_S
+                line += f"{base_total:>12.3f}{change:>+8.0%}{' ⚠️' if slower else ''}"
+                if slower:
+                    regressions.append(f"{scale} {name}")
+            print(line)
+    return regressions
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, corpus_dir=DEFAULT_CORPUS_DIR, llm_latency=0.0):
+    """Run every benchmark at each scale against the recorded corpus"""
+    config = load_config()
+    manifest = load_manifest(corpus_dir)
+    recorded_feeds = [url for url, feed in manifest["feeds"].items() if "file" in feed]
+    results = {
+        "generated_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
+        "corpus_recorded_at": manifest.get("recorded_at"),
+        "llm_latency_s": llm_latency,
+        "python": sys.version.split()[0],
+        "scales": {}
+    }
+    for scale in scales:
+        print(f"Running benchmarks at {scale}x ({len(recorded_feeds) * scale} feeds)...")
+        started = time.perf_counter()
+        results["scales"][f"{scale}x"] = run_scale(config, recorded_feeds, scale, corpus_dir, llm_latency)
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Time the pipeline offline on the recorded feeds with a stub LLM.")
+    parser.add_argument("--scales", default=",".join(str(scale) for scale in DEFAULT_SCALES),
+                        help="Comma-separated multiples of the recorded feed volume")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds the stub LLM takes per generation")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_DIR), help="Directory of recorded feeds")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Relative slowdown of a benchmark's total time reported as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks([int(scale) for scale in args.scales.split(",")], Path(args.corpus), args.llm_latency)
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists() and not args.save_baseline:
+        with open(baseline_path, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("llm_latency_s") != results["llm_latency_s"]:
+            print(f"\n⚠️ Baseline was run with --llm-latency {baseline.get('llm_latency_s')}, pipeline times aren't comparable")
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to: {baseline_path}")
+    elif regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline: {', '.join(regressions)}")
+        sys.exit(1)
@@ -5,6 +5,8 @@ import './App.css';
 function App() {
   const [topicsIndex, setTopicsIndex] = useState(null);
   const [topicData, setTopicData] = useState({});
+  const [loadedShards, setLoadedShards] = useState({});
+  const [topicFacets, setTopicFacets] = useState({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -27,35 +29,99 @@ function App() {
       });
   }, []);
 
-  // Function to load a specific topic's data
+  // Shards of a topic listed in the index manifest, newest first
+  const getTopicShards = (topicName) => {
+    const shards = topicsIndex?.shards?.[topicName];
+    if (shards && shards.length > 0) {
+      return shards;
+    }
+    // Index without a manifest: a single file per topic
+    return [{ url: `${topicName.toLowerCase().replace(/ /g, '_')}.json` }];
+  };
+
+  const fetchShard = async (topicName, shard) => {
+    const response = await fetch(`${process.env.PUBLIC_URL}/topics/${shard.url}`);
+
+    if (!response.ok) {
+      throw new Error(`Failed to load ${topicName} data`);
+    }
+
+    const data = await response.json();
+    return data.articles;
+  };
+
+  // Facet index of a topic (keyword/source/day -> article ids, presorted orders), if the index lists one
+  const fetchFacets = async (topicName) => {
+    const url = topicsIndex?.facets?.[topicName];
+    if (!url) {
+      return null;
+    }
+    try {
+      const response = await fetch(`${process.env.PUBLIC_URL}/topics/${url}`);
+      return response.ok ? await response.json() : null;
+    } catch (err) {
+      // Filters fall back to scanning the loaded articles
+      console.error(`Error loading facets for ${topicName}:`, err);
+      return null;
+    }
+  };
+
+  // Function to load a specific topic's data (only its newest shard)
   const loadTopicData = async (topicName) => {
     if (topicData[topicName]) {
       return topicData[topicName]; // Already loaded
     }
 
     try {
-      const filename = topicName.toLowerCase().replace(' ', '_');
-      const response = await fetch(`${process.env.PUBLIC_URL}/topics/${filename}.json`);
-
-      if (!response.ok) {
-        throw new Error(`Failed to load ${topicName} data`);
-      }
-      
-      const data = await response.json();
+      const [articles, facets] = await Promise.all([
+        fetchShard(topicName, getTopicShards(topicName)[0]),
+        fetchFacets(topicName)
+      ]);
       
       // Update the topicData state with the new data
+      setTopicFacets(prev => ({ ...prev, [topicName]: facets }));
       setTopicData(prev => ({
         ...prev,
-        [topicName]: data.articles
+        [topicName]: articles
       }));
+      setLoadedShards(prev => ({ ...prev, [topicName]: 1 }));
       
-      return data.articles;
+      return articles;
     } catch (err) {
       console.error(`Error loading topic ${topicName}:`, err);
       throw err;
     }
   };
 
+  // Shards of a topic that have not been loaded yet
+  const getRemainingShards = (topicName) => {
+    return getTopicShards(topicName).slice(loadedShards[topicName] || 0);
+  };
+
+  // Function to load the next (older) shard of a topic on demand
+  const loadMoreTopicData = async (topicName) => {
+    const loaded = loadedShards[topicName] || 0;
+    const shards = getTopicShards(topicName);
+    if (loaded === 0 || loaded >= shards.length) {
+      return topicData[topicName];
+    }
+
+    try {
+      const articles = await fetchShard(topicName, shards[loaded]);
+
+      setTopicData(prev => ({
+        ...prev,
+        [topicName]: [...(prev[topicName] || []), ...articles]
+      }));
+      setLoadedShards(prev => ({ ...prev, [topicName]: loaded + 1 }));
+
+      return articles;
+    } catch (err) {
+      console.error(`Error loading older articles for ${topicName}:`, err);
+      throw err;
+    }
+  };
+
   if (loading) {
     return (
       <div className="bg-gray-50 min-h-screen flex items-center justify-center">
@@ -86,7 +152,10 @@ function App() {
       <NewsDigest 
         topicsIndex={topicsIndex}
         topicData={topicData}
+        topicFacets={topicFacets}
         loadTopicData={loadTopicData}
+        loadMoreTopicData={loadMoreTopicData}
+        getRemainingShards={getRemainingShards}
       />
     </div>
   );
@@ -1,4 +1,5 @@
-import React, { useState } from 'react';
+import React, { useState, useMemo } from 'react';
+import { getArticleTime, getDateRange, isInDateRange } from '../utils/dates';
 
 // Helper function to truncate HTML content
 const truncateHtml = (html, maxLength = 800) => {
@@ -37,53 +38,111 @@ const truncateHtml = (html, maxLength = 800) => {
   return truncated.replace(/<[^>]*$/g, '') + '...';
 };
 
-// Efficient date filtering utility
-const createDateMatcher = (filterType, customRange) => {
-  if (!filterType || filterType === 'all') return () => true;
-  
-  const now = new Date();
-  let cutoffDate;
-  
-  switch (filterType) {
-    case '24h':
-      cutoffDate = new Date(now.getTime() - (24 * 60 * 60 * 1000));
-      break;
-    case '48h':
-      cutoffDate = new Date(now.getTime() - (48 * 60 * 60 * 1000));
-      break;
-    case '7d':
-      cutoffDate = new Date(now.getTime() - (7 * 24 * 60 * 60 * 1000));
-      break;
-    case '30d':
-      cutoffDate = new Date(now.getTime() - (30 * 24 * 60 * 60 * 1000));
-      break;
-    case 'custom':
-      if (customRange && customRange.start && customRange.end) {
-        const start = new Date(customRange.start);
-        const end = new Date(customRange.end);
-        return (articleDate) => articleDate >= start && articleDate <= end;
-      }
-      return () => true;
-    default:
-      return () => true;
-  }
+const getRelevance = (article, missing) => (
+  typeof article.relevance_percent === 'number' ? article.relevance_percent : missing
+);
+
+// Heuristic scoring function
+const getHeuristicScore = (article, now = Date.now()) => {
+  // Weights
+  const wRel = 2;
+  const wKey = 1;
+  const wRec = 1;
+  // Relevance percent (0-100)
+  const rel = getRelevance(article, 0);
+  // Keyword hits
+  const keyHits = article.matched_keywords ? article.matched_keywords.length : 0;
+  // Recency: hours since published (lower is better)
+  const hoursAgo = (now - getArticleTime(article)) / (1000 * 60 * 60);
+  // Normalize recency: 0 = now, 1 = 1 day old, 2 = 2 days, cap at 7 days
+  const recencyNorm = Math.max(0, 7 - Math.min(7, hoursAgo / 24)); // 0-7, higher is newer
+  // Heuristic score
+  return (rel * wRel) + (keyHits * wKey) + (recencyNorm * wRec);
+};
+
+// Same structure as the <topic>.facets.json written by the backend, for output that predates it
+const buildFacets = (articles) => {
+  const keywords = {};
+  const sources = {};
+  const days = {};
+  articles.forEach((article, id) => {
+    (article.matched_keywords || []).forEach(keyword => {
+      (keywords[keyword] = keywords[keyword] || []).push(id);
+    });
+    if (article.from_feed) {
+      (sources[article.from_feed] = sources[article.from_feed] || []).push(id);
+    }
+  });
   
-  return (articleDate) => articleDate >= cutoffDate;
+  const times = articles.map(getArticleTime);
+  const byDate = (a, b) => times[b] - times[a];
+  const sortIds = (compare) => articles.map((_, id) => id).sort((a, b) => compare(a, b) || byDate(a, b));
+  const relevance = sortIds((a, b) => getRelevance(articles[b], -1) - getRelevance(articles[a], -1));
+  const now = Date.now();
+  return {
+    total_articles: articles.length,
+    keywords,
+    sources,
+    days,  // Left empty: dates are then checked per article
+    orders: {
+      keywords: sortIds((a, b) => (articles[b].matched_keywords || []).length - (articles[a].matched_keywords || []).length),
+      relevance,
+      least_relevant: sortIds((a, b) => getRelevance(articles[a], 101) - getRelevance(articles[b], 101)),
+      heuristic: articles.map((_, id) => id).sort((a, b) => getHeuristicScore(articles[b], now) - getHeuristicScore(articles[a], now)),
+      recent_relevance: sortIds((a, b) => byDate(a, b) || (getRelevance(articles[b], -1) - getRelevance(articles[a], -1))),
+      relevance_recent: relevance
+    }
+  };
 };
 
-// Convert published_parsed array to Date object efficiently
-const parseArticleDate = (article) => {
-  if (article.published_parsed && Array.isArray(article.published_parsed)) {
-    const [year, month, day, hour, minute, second] = article.published_parsed;
-    return new Date(year, month - 1, day, hour || 0, minute || 0, second || 0);
+// Ids of the loaded articles passing the keyword, source and date filters, using set operations over the facet ids
+const selectArticleIds = (facets, articles, activeFilters, activeSourceFilters, dateRange) => {
+  // Stage marks: 1 = keyword matched, 2 = and source matched, 3 = and date matched
+  const stage = new Uint8Array(articles.length);
+  activeFilters.forEach(keyword => {
+    (facets.keywords[keyword] || []).forEach(id => {
+      if (id < articles.length) stage[id] = 1;
+    });
+  });
+  activeSourceFilters.forEach(source => {
+    (facets.sources[source] || []).forEach(id => {
+      if (stage[id] === 1) stage[id] = 2;
+    });
+  });
+  if (!dateRange) {
+    return stage.map(mark => (mark === 2 ? 1 : 0));
   }
-  // Fallback to string parsing
-  return article.published ? new Date(article.published) : new Date(0);
+  
+  const checked = new Uint8Array(articles.length);
+  Object.entries(facets.days || {}).forEach(([day, ids]) => {
+    const [year, month, date] = day.split('-').map(Number);
+    // Undated articles (1970) may still have a parseable published string, so they are checked below
+    if (year <= 1970) return;
+    // Day buckets are UTC days, like published_ts
+    const dayStart = Date.UTC(year, month - 1, date);
+    const dayEnd = Date.UTC(year, month - 1, date + 1);
+    const before = dayEnd <= dateRange.start;
+    const after = dateRange.end !== null && dayStart > dateRange.end;
+    const inside = dayStart >= dateRange.start && (dateRange.end === null || dayEnd <= dateRange.end);
+    ids.forEach(id => {
+      if (id >= articles.length) return;
+      checked[id] = 1;
+      if (stage[id] !== 2 || before || after) return;
+      // Whole day inside the range, or the day the range starts/ends in: check the article itself
+      if (inside || isInDateRange(getArticleTime(articles[id]), dateRange)) stage[id] = 3;
+    });
+  });
+  // Articles not in any day bucket are checked individually
+  articles.forEach((article, id) => {
+    if (!checked[id] && stage[id] === 2 && isInDateRange(getArticleTime(article), dateRange)) stage[id] = 3;
+  });
+  return stage.map(mark => (mark === 3 ? 1 : 0));
 };
 
 const ArticleList = ({ 
   topic, 
   articles, 
+  facets,
   activeFilters, 
   activeSourceFilters, 
   activeDateFilter, 
@@ -95,101 +154,33 @@ const ArticleList = ({
   const [minRelevance, setMinRelevance] = useState(0); // 0-100
   const [showReason, setShowReason] = useState({}); // { [index]: boolean }
 
-  // Create date matcher once for efficiency
-  const isDateMatch = createDateMatcher(activeDateFilter, customDateRange);
+  // Facet index from the backend, or built once from the loaded articles for older output
+  const topicFacets = useMemo(() => facets || buildFacets(articles), [facets, articles]);
   
-  const filteredArticles = articles.filter(article => {
+  const selected = useMemo(() => {
     // If either filter type has no selections, show nothing
     if (activeFilters.size === 0 || activeSourceFilters.size === 0) {
-      return false;
+      return new Uint8Array(articles.length);
     }
-    
-    // Check keyword filters - at least one keyword must match
-    const keywordMatch = article.matched_keywords && 
-      article.matched_keywords.some(keyword => activeFilters.has(keyword));
-    
-    // Check source filters - source must be selected
-    const sourceMatch = article.from_feed && activeSourceFilters.has(article.from_feed);
-    
-    // Check date filter - convert date once and check
-    const dateMatch = isDateMatch(parseArticleDate(article));
-    
-    // Relevance filter
-    if (typeof article.relevance_percent === 'number' && article.relevance_percent < minRelevance) {
-      return false;
-    }
-    
-    // All conditions must be true (AND logic)
-    return keywordMatch && sourceMatch && dateMatch;
-  });
+    return selectArticleIds(
+      topicFacets, articles, activeFilters, activeSourceFilters, getDateRange(activeDateFilter, customDateRange)
+    );
+  }, [topicFacets, articles, activeFilters, activeSourceFilters, activeDateFilter, customDateRange]);
 
-  // Heuristic scoring function
-  const getHeuristicScore = (article) => {
-    // Weights
-    const wRel = 2;
-    const wKey = 1;
-    const wRec = 1;
-    // Relevance percent (0-100)
-    const rel = typeof article.relevance_percent === 'number' ? article.relevance_percent : 0;
-    // Keyword hits
-    const keyHits = article.matched_keywords ? article.matched_keywords.length : 0;
-    // Recency: hours since published (lower is better)
-    const publishedDate = parseArticleDate(article);
-    const now = new Date();
-    const hoursAgo = (now - publishedDate) / (1000 * 60 * 60);
-    // Normalize recency: 0 = now, 1 = 1 day old, 2 = 2 days, cap at 7 days
-    const recencyNorm = Math.max(0, 7 - Math.min(7, hoursAgo / 24)); // 0-7, higher is newer
-    // Heuristic score
-    return (rel * wRel) + (keyHits * wKey) + (recencyNorm * wRec);
+  // Walk the presorted ids for the sort mode (ids are already newest first for 'recent')
+  const order = (sortMode !== 'recent' && topicFacets.orders && topicFacets.orders[sortMode]) || null;
+  const sortedArticles = [];
+  const addIfSelected = (id) => {
+    if (id >= articles.length || !selected[id]) return;
+    const article = articles[id];
+    // Relevance filter
+    if (typeof article.relevance_percent === 'number' && article.relevance_percent < minRelevance) return;
+    sortedArticles.push(article);
   };
-
-  // Sort articles based on sortMode
-  let sortedArticles = [...filteredArticles];
-  if (sortMode === 'keywords') {
-    sortedArticles.sort((a, b) => {
-      const aHits = a.matched_keywords ? a.matched_keywords.length : 0;
-      const bHits = b.matched_keywords ? b.matched_keywords.length : 0;
-      // Descending by keyword hits,
-      if (bHits !== aHits) return bHits - aHits;
-      // Fallback: most recent first
-      return parseArticleDate(b) - parseArticleDate(a);
-    });
-  } else if (sortMode === 'relevance') {
-    sortedArticles.sort((a, b) => {
-      const aRel = typeof a.relevance_percent === 'number' ? a.relevance_percent : -1;
-      const bRel = typeof b.relevance_percent === 'number' ? b.relevance_percent : -1;
-      if (bRel !== aRel) return bRel - aRel;
-      return parseArticleDate(b) - parseArticleDate(a);
-    });
-  } else if (sortMode === 'least_relevant') {
-    sortedArticles.sort((a, b) => {
-      const aRel = typeof a.relevance_percent === 'number' ? a.relevance_percent : 101;
-      const bRel = typeof b.relevance_percent === 'number' ? b.relevance_percent : 101;
-      if (aRel !== bRel) return aRel - bRel;
-      return parseArticleDate(b) - parseArticleDate(a);
-    });
-  } else if (sortMode === 'heuristic') {
-    sortedArticles.sort((a, b) => getHeuristicScore(b) - getHeuristicScore(a));
-  } else if (sortMode === 'recent_relevance') {
-    // Sort by most recent, then by highest relevance within each date
-    sortedArticles.sort((a, b) => {
-      const dateDiff = parseArticleDate(b) - parseArticleDate(a);
-      if (dateDiff !== 0) return dateDiff;
-      const aRel = typeof a.relevance_percent === 'number' ? a.relevance_percent : -1;
-      const bRel = typeof b.relevance_percent === 'number' ? b.relevance_percent : -1;
-      return bRel - aRel;
-    });
-  } else if (sortMode === 'relevance_recent') {
-    // Sort by highest relevance, then by most recent within each relevance score
-    sortedArticles.sort((a, b) => {
-      const aRel = typeof a.relevance_percent === 'number' ? a.relevance_percent : -1;
-      const bRel = typeof b.relevance_percent === 'number' ? b.relevance_percent : -1;
-      if (bRel !== aRel) return bRel - aRel;
-      return parseArticleDate(b) - parseArticleDate(a);
-    });
+  if (order) {
+    order.forEach(addIfSelected);
   } else {
-    // Default: most recent first
-    sortedArticles.sort((a, b) => parseArticleDate(b) - parseArticleDate(a));
+    articles.forEach((_, id) => addIfSelected(id));
   }
 
   const ExternalLinkIcon = () => (
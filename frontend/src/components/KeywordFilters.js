@@ -53,6 +53,7 @@ const getSourceName = (feedUrl) => {
 
 const KeywordFilters = ({ 
   topic, 
+  facets,
   keywords, 
   sources, 
   activeFilters, 
@@ -179,6 +180,9 @@ const KeywordFilters = ({
                   `}
                 >
                   {keyword}
+                  {facets?.keywords?.[keyword] && (
+                    <span className="ml-1 opacity-70">{facets.keywords[keyword].length}</span>
+                  )}
                 </button>
               ))}
             </div>
@@ -240,6 +244,9 @@ const KeywordFilters = ({
                   `}
                 >
                   📰 {sourceNameFn(source)}
+                  {facets?.sources?.[source] && (
+                    <span className="ml-1 opacity-70">{facets.sources[source].length}</span>
+                  )}
                 </button>
               ))}
             </div>
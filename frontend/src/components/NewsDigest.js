@@ -54,7 +54,7 @@ const getSourceName = (feedUrl) => {
   }
 };
 
-const NewsDigest = ({ topicsIndex, topicData, loadTopicData }) => {
+const NewsDigest = ({ topicsIndex, topicData, topicFacets = {}, loadTopicData, loadMoreTopicData, getRemainingShards }) => {
   const [currentTab, setCurrentTab] = useState('');
   const [activeFilters, setActiveFilters] = useState({});
   const [allKeywordsUsed, setAllKeywordsUsed] = useState({});
@@ -63,6 +63,7 @@ const NewsDigest = ({ topicsIndex, topicData, loadTopicData }) => {
   const [activeDateFilter, setActiveDateFilter] = useState('all');
   const [customDateRange, setCustomDateRange] = useState({ start: null, end: null });
   const [loadingTopic, setLoadingTopic] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Initialize when topicsIndex changes
   useEffect(() => {
@@ -94,22 +95,31 @@ const NewsDigest = ({ topicsIndex, topicData, loadTopicData }) => {
   useEffect(() => {
     if (currentTab && topicData[currentTab]) {
       const articles = topicData[currentTab];
+      const facets = topicFacets[currentTab];
       
       // Extract keywords and sources for the current topic
-      const topicKeywords = new Set();
-      const topicSources = new Set();
-      
-      articles.forEach(article => {
-        if (article.matched_keywords) {
-          article.matched_keywords.forEach(keyword => topicKeywords.add(keyword));
-        }
-        if (article.from_feed) {
-          topicSources.add(article.from_feed);
-        }
-      });
-      
-      const keywordsArray = Array.from(topicKeywords).sort();
-      const sourcesArray = Array.from(topicSources).sort();
+      let keywordsArray;
+      let sourcesArray;
+      if (facets) {
+        // The facet index already lists every keyword and source of the topic
+        keywordsArray = Object.keys(facets.keywords).sort();
+        sourcesArray = Object.keys(facets.sources).sort();
+      } else {
+        const topicKeywords = new Set();
+        const topicSources = new Set();
+        
+        articles.forEach(article => {
+          if (article.matched_keywords) {
+            article.matched_keywords.forEach(keyword => topicKeywords.add(keyword));
+          }
+          if (article.from_feed) {
+            topicSources.add(article.from_feed);
+          }
+        });
+        
+        keywordsArray = Array.from(topicKeywords).sort();
+        sourcesArray = Array.from(topicSources).sort();
+      }
       
       // Update state for current topic
       setAllKeywordsUsed(prev => ({ ...prev, [currentTab]: keywordsArray }));
@@ -122,7 +132,7 @@ const NewsDigest = ({ topicsIndex, topicData, loadTopicData }) => {
         setActiveSourceFilters(prev => ({ ...prev, [currentTab]: new Set(sourcesArray) }));
       }
     }
-  }, [currentTab, topicData, activeFilters, activeSourceFilters]);
+  }, [currentTab, topicData, topicFacets, activeFilters, activeSourceFilters]);
 
   const handleTabChange = async (tabName) => {
     if (tabName !== currentTab) {
@@ -142,6 +152,17 @@ const NewsDigest = ({ topicsIndex, topicData, loadTopicData }) => {
     }
   };
 
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await loadMoreTopicData(currentTab);
+    } catch (error) {
+      console.error(`Failed to load older articles for ${currentTab}:`, error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleFilterToggle = (topic, keyword) => {
     setActiveFilters(prev => {
       const newFilters = { ...prev };
@@ -260,6 +281,7 @@ const NewsDigest = ({ topicsIndex, topicData, loadTopicData }) => {
           <>
             <KeywordFilters
               topic={currentTab}
+              facets={topicFacets[currentTab]}
               keywords={allKeywordsUsed[currentTab] || []}
               sources={allSourcesUsed[currentTab] || []}
               activeFilters={activeFilters[currentTab] || new Set()}
@@ -279,12 +301,34 @@ const NewsDigest = ({ topicsIndex, topicData, loadTopicData }) => {
             <ArticleList
               topic={currentTab}
               articles={topicData[currentTab] || []}
+              facets={topicFacets[currentTab]}
               activeFilters={activeFilters[currentTab] || new Set()}
               activeSourceFilters={activeSourceFilters[currentTab] || new Set()}
               activeDateFilter={activeDateFilter}
               customDateRange={customDateRange}
               getSourceName={getSourceName}
             />
+
+            {topicData[currentTab] && getRemainingShards && getRemainingShards(currentTab).length > 0 && (() => {
+              const remaining = getRemainingShards(currentTab);
+              const remainingCount = remaining.reduce((sum, shard) => sum + (shard.count || 0), 0);
+              return (
+                <div className="text-center mt-6">
+                  <button
+                    onClick={handleLoadMore}
+                    disabled={loadingMore}
+                    className={`px-6 py-3 rounded-lg font-semibold bg-white text-gray-700 hover:bg-blue-50 hover:text-blue-600 shadow-md hover:shadow-lg transition-all duration-200 ${
+                      loadingMore ? 'opacity-50 cursor-wait' : ''
+                    }`}
+                  >
+                    {loadingMore ? '⏳ Loading...' : `Load older articles${remaining[0].newest ? ` (from ${remaining[0].newest})` : ''}`}
+                  </button>
+                  {remainingCount > 0 && (
+                    <p className="text-sm text-gray-500 mt-2">{remainingCount} older articles not loaded yet</p>
+                  )}
+                </div>
+              );
+            })()}
           </>
         )}
         
@@ -1,4 +1,5 @@
 import React from 'react';
+import { getArticleTime, getDateRange, isInDateRange } from '../utils/dates';
 
 const TabNavigation = ({ 
   topicsIndex, 
@@ -11,37 +12,13 @@ const TabNavigation = ({
   onTabChange, 
   loadingTopic 
 }) => {
-  const isWithinDateRange = (publishedDate, dateFilter, customRange) => {
-    if (!dateFilter || dateFilter === 'all') return true;
-    if (!publishedDate) return false;
-    
-    const articleDate = new Date(publishedDate);
-    const now = new Date();
-    
-    if (dateFilter === 'custom' && customRange.start && customRange.end) {
-      return articleDate >= customRange.start && articleDate <= customRange.end;
-    }
-    
-    const timeRanges = {
-      '24h': 24 * 60 * 60 * 1000,
-      '48h': 48 * 60 * 60 * 1000,
-      '7d': 7 * 24 * 60 * 60 * 1000,
-      '30d': 30 * 24 * 60 * 60 * 1000
-    };
-    
-    if (timeRanges[dateFilter]) {
-      const cutoffTime = now.getTime() - timeRanges[dateFilter];
-      return articleDate.getTime() >= cutoffTime;
-    }
-    
-    return true;
-  };
-
   const getArticleCounts = (topic) => {
     const articles = topicData[topic] || [];
     const keywordFilters = activeFilters[topic] || new Set();
     const sourceFilters = activeSourceFilters[topic] || new Set();
-    const totalCount = articles.length;
+    const dateRange = getDateRange(activeDateFilter, customDateRange);
+    // Older shards may not be loaded yet, so the index has the real total
+    const totalCount = Math.max(articles.length, topicsIndex?.summary?.articles_by_topic?.[topic] || 0);
     
     // If no filters are active, no articles are shown
     if (keywordFilters.size === 0 && sourceFilters.size === 0) {
@@ -62,7 +39,7 @@ const TabNavigation = ({
       }
       
       // Check date filter
-      const dateMatch = isWithinDateRange(article.published, activeDateFilter, customDateRange);
+      const dateMatch = isInDateRange(getArticleTime(article), dateRange);
       
       // All active filter types must pass (AND logic)
       return keywordMatch && sourceMatch && dateMatch;
@@ -0,0 +1,32 @@
+// Date helpers shared by the article list and the tab counts
+
+// Publish time of an article in epoch milliseconds (0 if unknown).
+// The backend sends it as the published_ts integer; older output only has published_parsed (UTC) or the string
+export const getArticleTime = (article) => {
+  if (typeof article.published_ts === 'number' && article.published_ts > 0) {
+    return article.published_ts * 1000;
+  }
+  if (article.published_parsed && Array.isArray(article.published_parsed)) {
+    const [year, month, day, hour, minute, second] = article.published_parsed;
+    return Date.UTC(year, month - 1, day, hour || 0, minute || 0, second || 0);
+  }
+  return (article.published && Date.parse(article.published)) || 0;
+};
+
+// Start/end of a date filter in epoch milliseconds (end may be null), or null when every date passes
+export const getDateRange = (filterType, customRange) => {
+  if (!filterType || filterType === 'all') return null;
+  
+  const hours = { '24h': 24, '48h': 48, '7d': 7 * 24, '30d': 30 * 24 }[filterType];
+  if (hours) {
+    return { start: Date.now() - (hours * 60 * 60 * 1000), end: null };
+  }
+  if (filterType === 'custom' && customRange && customRange.start && customRange.end) {
+    return { start: new Date(customRange.start).getTime(), end: new Date(customRange.end).getTime() };
+  }
+  return null;
+};
+
+export const isInDateRange = (time, dateRange) => (
+  !dateRange || (time >= dateRange.start && (dateRange.end === null || time <= dateRange.end))
+);
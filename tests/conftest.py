@@ -0,0 +1,77 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# The backend is a folder of scripts importing each other as top-level modules
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+FEED_ETAG = '"fixture-v1"'
+FEED_LAST_MODIFIED = "Tue, 07 Oct 2025 10:00:00 GMT"
+
+
+class FeedServer(ThreadingHTTPServer):
+    """Serves the fixture feed, and records how many requests it was handling at once"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FeedHandler)
+        self.feed = (FIXTURES_DIR / "feed.xml").read_bytes()
+        self.delay = 0.0  # Seconds every response waits before it is sent
+        self.active = 0
+        self.peak = 0
+        self.requests = []  # Headers of every request, in the order they arrived
+        self.lock = threading.Lock()
+
+    def url(self, path="/feed.xml"):
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """/feed.xml honours If-None-Match / If-Modified-Since; /static.xml ignores them"""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(dict(self.headers))
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            time.sleep(server.delay)
+            conditional = self.path.startswith("/feed.xml")
+            if conditional and (self.headers.get("If-None-Match") == FEED_ETAG
+                                or self.headers.get("If-Modified-Since") == FEED_LAST_MODIFIED):
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(server.feed)))
+            if conditional:
+                self.send_header("ETag", FEED_ETAG)
+                self.send_header("Last-Modified", FEED_LAST_MODIFIED)
+            self.end_headers()
+            self.wfile.write(server.feed)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up (timeout test)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server():
+    server = FeedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
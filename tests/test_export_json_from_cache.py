@@ -0,0 +1,111 @@
+import json
+from datetime import datetime, timedelta
+
+import feedparser
+import pytest
+import yaml
+
+from export_json_from_cache import export_json_from_cache
+from generate_news_digest import get_topic_hash
+from sqlite_cache import SQLiteProcessingCache
+
+TOPIC = {"description": "Articles about AI", "keywords": ["llm", "openai"]}
+TOPIC_HASH = get_topic_hash(TOPIC)
+
+
+def make_entry(n):
+    return feedparser.FeedParserDict(
+        title=f"LLM story {n}", link=f"https://news.example.com/llm-{n}", summary=f"Summary {n}"
+    )
+
+
+def store(cache, entry, summary=None, relevance=70):
+    cache.mark_article_processed(entry, {
+        "article_data": {
+            "title": entry.title, "link": entry.link, "summary": summary or entry.summary,
+            "from_feed": "https://news.example.com/rss.xml", "matched_keywords": ["llm"],
+            "relevance_percent": relevance, "published_ts": 1759831200
+        },
+        "keywords_matched": ["llm"],
+        "ai_reasoning": "About LLMs"
+    }, topic="AI", topic_hash=TOPIC_HASH)
+    cache.flush()
+
+
+@pytest.fixture
+def export(tmp_path, capsys):
+    """Runs an incremental export into tmp_path and returns ({title: article}, the AI topic's status line)"""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(yaml.safe_dump({"topics": {"AI": TOPIC}}))
+
+    def run():
+        capsys.readouterr()
+        export_json_from_cache(tmp_path / "cache.db", config_path, tmp_path / "topics", incremental=True)
+        status = next(line.strip() for line in capsys.readouterr().out.splitlines() if line.strip().startswith("AI:"))
+        articles = json.loads((tmp_path / "topics" / "ai.json").read_text())["articles"]
+        assert len({article["link"] for article in articles}) == len(articles)
+        return {article["title"]: article for article in articles}, status
+    return run
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteProcessingCache(tmp_path / "cache.db")
+    yield cache
+    cache.close()
+
+
+def test_unchanged_topic_is_left_alone(cache, export):
+    store(cache, make_entry(1))
+    articles, status = export()
+    assert list(articles) == ["LLM story 1"]
+    assert status.startswith("AI: rebuilt 1")
+
+    _, status = export()
+    assert status == "AI: unchanged"
+
+
+def test_summary_update_is_exported(cache, export):
+    entries = [make_entry(1), make_entry(2)]
+    for entry in entries:
+        store(cache, entry)
+    export()
+
+    article_key = cache._get_article_key(entries[0])
+    cache.update_article_summary(article_key, "AI", TOPIC_HASH, {"summary": "A new LLM summary.", "has_llm_summary": True})
+    cache.flush()
+    articles, status = export()
+
+    assert status.startswith("AI: merged 1")
+    assert articles["LLM story 1"]["summary"] == "A new LLM summary."
+    assert articles["LLM story 2"]["summary"] == "Summary 2"
+
+
+def test_rewritten_last_row_is_exported(cache, export):
+    # INSERT OR REPLACE of the row with the highest rowid gives the new row that same rowid
+    entries = [make_entry(1), make_entry(2)]
+    for entry in entries:
+        store(cache, entry)
+    export()
+
+    store(cache, entries[1], relevance=95)
+    articles, status = export()
+
+    assert status.startswith("AI: merged 1")
+    assert len(articles) == 2
+    assert articles["LLM story 2"]["relevance_percent"] == 95
+
+
+def test_cleaned_out_rows_rebuild_the_topic(cache, export):
+    for entry in (make_entry(1), make_entry(2)):
+        store(cache, entry)
+    export()
+
+    old = datetime.now() - timedelta(days=40)
+    cache.conn.execute("UPDATE article_cache SET processed_at = ? WHERE title = 'LLM story 1'", (old,))
+    cache.conn.commit()
+    assert cache.clean_old_entries(max_age_days=30) == 1
+    articles, status = export()
+
+    assert status.startswith("AI: rebuilt 1")
+    assert list(articles) == ["LLM story 2"]
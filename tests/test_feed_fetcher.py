@@ -0,0 +1,110 @@
+from feed_fetcher import FeedFetcher, USER_AGENT
+
+from conftest import FEED_ETAG, FEED_LAST_MODIFIED
+
+
+def test_fetch_parses_feed(feed_server):
+    result = FeedFetcher().fetch(feed_server.url())
+
+    assert result["error"] is None
+    assert result["status"] == 200
+    assert not result["not_modified"]
+    assert [entry.title for entry in result["feed"].entries] == ["Python 3.14 released", "Rust in the kernel"]
+    assert result["etag"] == FEED_ETAG
+    assert result["last_modified"] == FEED_LAST_MODIFIED
+    assert result["body_hash"]
+    assert feed_server.requests[0]["User-Agent"] == USER_AGENT
+
+
+def test_fetch_normalises_entries(feed_server):
+    entry = FeedFetcher().fetch(feed_server.url())["feed"].entries[0]
+
+    record = entry["record"]
+    assert record["published_ts"] == 1759831200
+    assert record["summary_text"] == "The new Python release brings free-threading & faster startup."
+    assert record["summary_html"].startswith("<p>")
+    assert record["title_lower"] == "python 3.14 released"
+
+
+def test_etag_not_modified(feed_server):
+    fetcher = FeedFetcher()
+    first = fetcher.fetch(feed_server.url())
+
+    result = fetcher.fetch(feed_server.url(), {"etag": first["etag"], "body_hash": first["body_hash"]})
+
+    assert feed_server.requests[1]["If-None-Match"] == FEED_ETAG
+    assert result["status"] == 304
+    assert result["not_modified"]
+    assert result["feed"] is None
+    # Validators are carried over so they can be stored again
+    assert result["etag"] == FEED_ETAG
+    assert result["body_hash"] == first["body_hash"]
+
+
+def test_last_modified_not_modified(feed_server):
+    result = FeedFetcher().fetch(feed_server.url(), {"last_modified": FEED_LAST_MODIFIED})
+
+    assert feed_server.requests[0]["If-Modified-Since"] == FEED_LAST_MODIFIED
+    assert "If-None-Match" not in feed_server.requests[0]
+    assert result["status"] == 304
+    assert result["not_modified"]
+    assert result["feed"] is None
+
+
+def test_unchanged_body_skips_parsing(feed_server):
+    fetcher = FeedFetcher()
+    first = fetcher.fetch(feed_server.url("/static.xml"))
+
+    result = fetcher.fetch(feed_server.url("/static.xml"), {"body_hash": first["body_hash"]})
+
+    assert result["status"] == 200
+    assert result["not_modified"]
+    assert result["feed"] is None
+
+
+def test_changed_feed_is_parsed(feed_server):
+    result = FeedFetcher().fetch(feed_server.url(), {"etag": '"fixture-v0"', "body_hash": "stale"})
+
+    assert result["status"] == 200
+    assert not result["not_modified"]
+    assert len(result["feed"].entries) == 2
+    assert result["etag"] == FEED_ETAG
+
+
+def test_timeout_is_reported(feed_server):
+    feed_server.delay = 2.0
+
+    result = FeedFetcher(timeout=0.3).fetch(feed_server.url())
+
+    assert result["error"]
+    assert result["feed"] is None
+    assert result["elapsed"] < 1.5
+
+
+def test_connection_error_is_reported():
+    result = FeedFetcher(timeout=1).fetch("http://127.0.0.1:9/feed.xml")
+
+    assert result["error"]
+    assert result["feed"] is None
+
+
+def test_per_host_limit(feed_server):
+    feed_server.delay = 0.3
+    urls = [feed_server.url(f"/feed.xml?n={n}") for n in range(6)]
+
+    results = list(FeedFetcher(max_workers=8, per_host_limit=2).fetch_all(urls))
+
+    assert sorted(result["url"] for result in results) == sorted(urls)
+    assert all(result["status"] == 200 for result in results)
+    assert feed_server.peak == 2
+
+
+def test_hosts_are_limited_separately(feed_server):
+    feed_server.delay = 0.3
+    port = feed_server.server_address[1]
+    urls = [f"http://{host}:{port}/feed.xml?n={n}" for host in ("127.0.0.1", "localhost") for n in range(4)]
+
+    results = list(FeedFetcher(max_workers=8, per_host_limit=1).fetch_all(urls))
+
+    assert all(result["status"] == 200 for result in results)
+    assert feed_server.peak == 2
@@ -0,0 +1,39 @@
+import pytest
+
+from scheduler import AssessmentScheduler, ESTIMATE_KEY
+from sqlite_cache import SQLiteProcessingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteProcessingCache(tmp_path / "cache.db")
+    cache.set_metadata(ESTIMATE_KEY, "10.00")
+    yield cache
+    cache.close()
+
+
+def test_record_smooths_the_estimate(cache):
+    scheduler = AssessmentScheduler(cache)
+    scheduler.record(calls=10, elapsed=200.0)
+    assert scheduler.seconds_per_call == pytest.approx(15.0)
+
+
+def test_model_load_is_not_counted_per_call(cache):
+    # A cold run: 10 generations of 10s each, plus 60s loading the model first
+    scheduler = AssessmentScheduler(cache)
+    scheduler.record(calls=10, elapsed=160.0, load_seconds=60.0)
+    assert scheduler.seconds_per_call == pytest.approx(10.0)
+
+
+def test_model_load_in_every_worker(cache):
+    # Two workers load their own model in parallel (30s each), then share 10 generations of 10s
+    scheduler = AssessmentScheduler(cache, workers=2)
+    scheduler.record(calls=10, elapsed=80.0, load_seconds=60.0)
+    assert scheduler.seconds_per_call == pytest.approx(10.0)
+
+
+def test_run_without_generations_keeps_the_estimate(cache):
+    scheduler = AssessmentScheduler(cache)
+    scheduler.record(calls=0, elapsed=5.0)
+    scheduler.record(calls=3, elapsed=20.0, load_seconds=20.0)
+    assert scheduler.seconds_per_call == pytest.approx(10.0)
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import sqlite3
+
+import feedparser
+import pytest
+
+from sqlite_cache import SQLiteProcessingCache, SCHEMA_VERSION
+
+TOPIC_HASH = "topic-hash-v1"
+
+
+def make_entry(n):
+    return feedparser.FeedParserDict(
+        title=f"LLM story {n}", link=f"https://news.example.com/llm-{n}", summary=f"Summary {n}"
+    )
+
+
+def store(cache, entry, topic="AI", topic_hash=TOPIC_HASH, **article_data):
+    cache.mark_article_processed(entry, {
+        "article_data": {"title": entry.title, "link": entry.link, "summary": entry.summary,
+                         "matched_keywords": ["llm"], "relevance_percent": 70, **article_data},
+        "keywords_matched": ["llm"],
+        "ai_reasoning": "About LLMs"
+    }, topic=topic, topic_hash=topic_hash)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteProcessingCache(tmp_path / "cache.db")
+    yield cache
+    cache.close()
+
+
+def test_llm_summary_gets_a_new_change_number(cache):
+    entry = make_entry(1)
+    store(cache, entry)
+    store(cache, make_entry(2))
+    exported = cache.get_change_seq()
+
+    article_key = cache._get_article_key(entry)
+    cache.update_article_summary(article_key, "AI", TOPIC_HASH, {"summary": "A new LLM summary.", "has_llm_summary": True})
+
+    rows = cache.get_topic_results_since("AI", TOPIC_HASH, exported)
+    assert [(key, result["article_data"]["summary"]) for _, key, result in rows] == [(article_key, "A new LLM summary.")]
+    assert rows[0][0] > exported
+    assert cache.stale_stages(entry, "AI", TOPIC_HASH) == []
+
+
+def test_results_are_stored_in_typed_columns(cache):
+    entry = make_entry(1)
+    store(cache, entry, summary_html="<p>Summary <b>1</b></p>", summary_original="Summary 1",
+          published_ts=1759831200, keyword_matches={"llm": {"found_in": ["title"], "text": "LLM story 1"}})
+    cache.flush()
+
+    row = cache.conn.execute('''
+        SELECT published_at, relevance_percent, summary, matched_keywords, details_json, verdict FROM article_cache
+    ''').fetchone()
+    assert row[:4] == (1759831200, 70, "Summary 1", '["llm"]')
+    assert json.loads(row[4]) == {"keyword_matches": {"llm": ["title"]}}
+    assert row[5] == "accepted"
+    html = cache.conn.execute('SELECT summary_html, summary_original FROM article_html').fetchone()
+    assert html == ("<p>Summary <b>1</b></p>", "Summary 1")
+
+    article = cache.get_cached_result(entry, topic="AI", topic_hash=TOPIC_HASH)["article_data"]
+    assert article["summary"] == "Summary 1"
+    # The HTML is only joined in when there is no summary to show instead
+    assert "summary_html" not in article
+
+
+V1_SCHEMA = '''
+    CREATE TABLE article_cache (
+        article_key TEXT PRIMARY KEY, title TEXT, link TEXT, script_version TEXT, processed_at TIMESTAMP,
+        result_json TEXT, topic TEXT, matched_keywords TEXT, from_feed TEXT
+    );
+    CREATE TABLE cache_metadata (key TEXT PRIMARY KEY, value TEXT, updated_at TIMESTAMP);
+    CREATE INDEX idx_script_version ON article_cache(script_version);
+    CREATE INDEX idx_processed_at ON article_cache(processed_at);
+    CREATE INDEX idx_topic ON article_cache(topic);
+'''
+
+
+def make_v1_db(path):
+    """A cache as the original script wrote it: one row per article, keyed on a hash of the scripts"""
+    def v1_row(entry, script_version, processed_at, **article_data):
+        result = {
+            "topic": "AI",
+            "topic_hash": TOPIC_HASH,
+            "article_data": {
+                "title": entry.title, "link": entry.link, "summary": entry.summary,
+                "from_feed": "https://news.example.com/rss.xml", "published_parsed": [2025, 10, 7, 10, 0, 0, 1, 280, 0],
+                "matched_keywords": ["llm"], "relevance_percent": 70, "ai_reasoning": "About LLMs", **article_data
+            },
+            "keywords_matched": ["llm"],
+            "ai_reasoning": "About LLMs"
+        }
+        key = hashlib.md5(f"{entry.title}|{entry.link}".encode()).hexdigest()
+        return (key, entry.title, entry.link, script_version, processed_at, json.dumps(result), "AI", '["llm"]',
+                "https://news.example.com/rss.xml")
+
+    conn = sqlite3.connect(path)
+    conn.executescript(V1_SCHEMA)
+    conn.executemany('INSERT INTO article_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+        v1_row(make_entry(1), "script-v2", "2025-10-07 11:00:00", has_llm_summary=True),
+        v1_row(make_entry(2), "script-v2", "2025-10-07 11:00:01", summary="-", has_placeholder_summary=True,
+               summary_html="<p>Summary <b>2</b></p>", summary_original="Summary 2"),
+        # An older generation of results is left behind to age out
+        v1_row(make_entry(3), "script-v1", "2025-10-06 11:00:00"),
+    ])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def migrated_cache(tmp_path):
+    make_v1_db(tmp_path / "cache.db")
+    cache = SQLiteProcessingCache(tmp_path / "cache.db")
+    yield cache
+    cache.close()
+
+
+def test_v1_cache_migrates_to_current_schema(migrated_cache):
+    cache = migrated_cache
+    assert cache.get_metadata("schema_version") == str(SCHEMA_VERSION)
+
+    rows = cache.conn.execute('''
+        SELECT title, topic, topic_hash, pipeline_version, published_at, summary, relevance_percent, ai_reasoning,
+               matched_keywords, relevance_version, summary_version, updated_seq
+        FROM article_cache ORDER BY title
+    ''').fetchall()
+    current = (cache.pipeline_version, 1759831200)
+    assert [row[:3] for row in rows] == [(f"LLM story {n}", "AI", TOPIC_HASH) for n in (1, 2, 3)]
+    assert [row[3:5] for row in rows[:2]] == [current, current]
+    assert rows[2][3] == "script-v1"
+    assert rows[0][5:9] == ("Summary 1", 70, "About LLMs", '["llm"]')
+    # Only the newest generation is moved to the stage versions; a placeholder summary is left stale
+    assert rows[0][9:11] == (cache.stage_versions["relevance"], cache.stage_versions["summary"])
+    assert rows[1][9:11] == (cache.stage_versions["relevance"], "")
+    assert rows[2][9:11] == (None, None)
+    assert all(row[11] for row in rows)
+
+    details = json.loads(cache.conn.execute("SELECT details_json FROM article_cache WHERE title = 'LLM story 2'").fetchone()[0])
+    assert "summary_html" not in details and "published_parsed" in details
+    assert cache.conn.execute('SELECT summary_html FROM article_html').fetchall() == [("<p>Summary <b>2</b></p>",)]
+    # A placeholder summary is shown from the stored HTML
+    article = cache.get_cached_result(make_entry(2), topic="AI", topic_hash=TOPIC_HASH)["article_data"]
+    assert article["summary_html"] == "<p>Summary <b>2</b></p>"
+
+
+@pytest.mark.parametrize("prefetched", [False, True])
+def test_migrated_cache_miss_reasons(migrated_cache, prefetched):
+    cache = migrated_cache
+    entries = {n: make_entry(n) for n in (1, 2, 3, 4)}
+    if prefetched:
+        cache.prefetch(entries.values(), {"AI": TOPIC_HASH, "Python": "python-hash"})
+
+    assert cache.should_process_article(entries[1], topic="AI", topic_hash=TOPIC_HASH) == (False, "already_processed")
+    assert cache.should_process_article(entries[2], topic="AI", topic_hash=TOPIC_HASH) == (True, "stages_updated")
+    assert cache.stale_stages(entries[2], "AI", TOPIC_HASH) == ["summary"]
+    assert cache.should_process_article(entries[3], topic="AI", topic_hash=TOPIC_HASH) == (True, "classifier_updated")
+    assert cache.should_process_article(entries[4], topic="AI", topic_hash=TOPIC_HASH) == (True, "new_article")
+    assert cache.should_process_article(entries[1], topic="Python", topic_hash="python-hash") == (True, "not_evaluated")
+
+
+def test_topic_config_change_is_a_miss(migrated_cache):
+    # prefetch only keeps rows of the current topic hashes, and still knows the topic had rows
+    migrated_cache.prefetch([make_entry(1)], {"AI": "edited-topic-hash"})
+    assert migrated_cache.should_process_article(make_entry(1), topic="AI", topic_hash="edited-topic-hash") == \
+        (True, "topic_updated")
+
+    migrated_cache.prefetch([], {})
+    assert migrated_cache.should_process_article(make_entry(1), topic="AI", topic_hash="edited-topic-hash") == \
+        (True, "topic_updated")